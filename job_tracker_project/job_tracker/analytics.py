@@ -0,0 +1,74 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+# JobApplication üzerinde doğrudan çalışan analiz sorguları. Her fonksiyon tek bir
+# SQL sorgusu çalıştırır; sayfa istekleri bunlar yerine ApplicationStats satırını
+# okur, bu sorgular o satırı baştan hesaplarken (ApplicationStats.rebuild) kullanılır.
+
+
+def company_status_counts(queryset):
+    """Şirket -> {durum: sayı}; tek GROUP BY sorgusu"""
+    counts = {}
+    rows = queryset.order_by().values_list('company_name', 'status').annotate(count=Count('pk'))
+    for company_name, status, count in rows:
+        counts.setdefault(company_name, {})[status] = count
+    return counts
+
+
+def period_counts(queryset, trunc, key_format):
+    """
+    application_date'i `trunc` (TruncMonth, TruncWeek) ile kovalara ayırıp say.
+
+    Kova anahtarları yerel saate göre `key_format` ile biçimlenir.
+    """
+    rows = (
+        queryset.order_by()
+        .annotate(period=trunc('application_date', tzinfo=timezone.get_current_timezone()))
+        .values_list('period')
+        .annotate(count=Count('pk'))
+    )
+    return {period.strftime(key_format): count for period, count in rows if period is not None}
+
+
+def monthly_counts(queryset):
+    return period_counts(queryset, TruncMonth, '%Y-%m')
+
+
+def weekly_counts(queryset):
+    return period_counts(queryset, TruncWeek, '%Y-%m-%d')
+
+
+def recent_day_counts(queryset, days, today=None):
+    """
+    Bugün dahil son `days` günün başvuru (application_date) ve eklenme (created_at)
+    sayıları. İki tarih alanının tüm günleri koşullu sayımlarla tek sorguda hesaplanır.
+
+    Returns:
+        ({'YYYY-MM-DD': sayı}, {'YYYY-MM-DD': sayı}) - sıfır olan günler hariç
+    """
+    today = today or timezone.localdate()
+    current_timezone = timezone.get_current_timezone()
+    aggregates = {}
+
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        start = timezone.make_aware(datetime.combine(day, time.min), current_timezone)
+        end = start + timedelta(days=1)
+        aggregates[f'applied_{offset}'] = Count(
+            'pk', filter=Q(application_date__gte=start, application_date__lt=end)
+        )
+        aggregates[f'created_{offset}'] = Count('pk', filter=Q(created_at__gte=start, created_at__lt=end))
+
+    result = queryset.order_by().aggregate(**aggregates)
+
+    applied, created = {}, {}
+    for offset in range(days):
+        key = (today - timedelta(days=offset)).isoformat()
+        if result[f'applied_{offset}']:
+            applied[key] = result[f'applied_{offset}']
+        if result[f'created_{offset}']:
+            created[key] = result[f'created_{offset}']
+    return applied, created
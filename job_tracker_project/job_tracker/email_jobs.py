@@ -0,0 +1,465 @@
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.utils import timezone
+
+from .gmail_service import GmailService
+from .email_pipeline import EmailPipeline
+from .models import EmailProcessingLog, SeenEmail, SystemSettings, UserProfile
+
+_worker_lock = threading.Lock()
+_worker_thread = None
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class JobProgress:
+    """
+    İşin ilerlemesini EmailProcessingLog'a yazan yardımcı.
+
+    Her e-postada veritabanına yazmamak için kayıt en fazla
+    EMAIL_JOB_PROGRESS_INTERVAL saniyede bir güncellenir. Her kayıt aynı zamanda
+    heartbeat'tir; heartbeat'i eskiyen işler yeniden kuyruğa alınır.
+    """
+
+    def __init__(self, log):
+        self.log = log
+        self.interval = _setting('EMAIL_JOB_PROGRESS_INTERVAL', 2)
+        self._last_save = 0.0
+        self._pending_seen_ids = []
+
+    def mark_seen_later(self, message_id):
+        """İş başvurusu olmayan maili bir sonraki ilerleme kaydında SeenEmail'e yaz"""
+        self._pending_seen_ids.append(message_id)
+
+    def update(self, processed=None, total=None, found=None, last_message_id=None, force=False):
+        if processed is not None:
+            self.log.processed_emails = processed
+        if last_message_id is not None:
+            self.log.last_message_id = last_message_id
+        if total is not None:
+            self.log.total_emails = total
+        if found is not None:
+            self.log.job_applications_found = found
+
+        now = time.monotonic()
+        if not force and now - self._last_save < self.interval:
+            return
+
+        self.save()
+        self._last_save = now
+
+    def save(self):
+        # İş yeniden başlarsa aynı mailler tekrar analiz edilmesin
+        if self._pending_seen_ids:
+            SeenEmail.mark_seen(self.log.user, self._pending_seen_ids)
+            self._pending_seen_ids = []
+
+        self.log.heartbeat_at = timezone.now()
+        self.log.save(update_fields=[
+            'processed_emails', 'total_emails', 'job_applications_found', 'last_message_id', 'heartbeat_at'
+        ])
+
+
+def enqueue_job(user, job_type, csv_filename=''):
+    """
+    Kullanıcı için arka plan işi oluştur.
+
+    Aynı tipte kuyrukta veya çalışmakta olan bir iş varsa yenisi açılmaz,
+    mevcut iş döndürülür. İkinci değer işin yeni oluşturulup oluşturulmadığıdır.
+    Heartbeat'i eskimiş 'running' işler (ör. web süreci yeniden başladıysa) önce
+    kuyruğa geri alınır ve her durumda kuyruğu boşaltacak bir worker başlatılır.
+    """
+    requeue_stale_jobs()
+
+    job = EmailProcessingLog.objects.filter(
+        user=user,
+        job_type=job_type,
+        csv_filename=csv_filename,
+        status__in=[EmailProcessingLog.STATUS_QUEUED, EmailProcessingLog.STATUS_RUNNING],
+    ).order_by('-processed_at').first()
+
+    created = job is None
+    if created:
+        job = EmailProcessingLog.objects.create(
+            user=user,
+            job_type=job_type,
+            csv_filename=csv_filename,
+            status=EmailProcessingLog.STATUS_QUEUED,
+        )
+
+    if _setting('EMAIL_JOBS_RUN_IN_PROCESS', True):
+        ensure_worker_thread()
+
+    return job, created
+
+
+def get_active_job(user):
+    """Kullanıcının kuyrukta veya çalışmakta olan son işini döndür"""
+    return EmailProcessingLog.objects.filter(
+        user=user,
+        status__in=[EmailProcessingLog.STATUS_QUEUED, EmailProcessingLog.STATUS_RUNNING],
+    ).order_by('-processed_at').first()
+
+
+def requeue_stale_jobs():
+    """
+    Heartbeat'i EMAIL_JOB_STALE_SECONDS'tan eski 'running' işleri kuyruğa geri al.
+
+    Worker süreci öldüğünde yarım kalan işler bu sayede devam ettirilir. Deneme
+    hakkı dolan işler hatalı olarak kapatılır.
+    """
+    stale_before = timezone.now() - timedelta(seconds=_setting('EMAIL_JOB_STALE_SECONDS', 120))
+    max_attempts = _setting('EMAIL_JOB_MAX_ATTEMPTS', 3)
+
+    stale_jobs = EmailProcessingLog.objects.filter(
+        status=EmailProcessingLog.STATUS_RUNNING,
+        heartbeat_at__lt=stale_before,
+    )
+
+    failed = stale_jobs.filter(attempts__gte=max_attempts).update(
+        status=EmailProcessingLog.STATUS_FAILED,
+        success=False,
+        error_message="İş yanıt vermeyi bıraktı, deneme hakkı doldu.",
+        finished_at=timezone.now(),
+    )
+    requeued = stale_jobs.filter(attempts__lt=max_attempts).update(status=EmailProcessingLog.STATUS_QUEUED)
+
+    if requeued or failed:
+        print(f"Yarım kalan işler: {requeued} tekrar kuyruğa alındı, {failed} hatalı kapatıldı")
+    return requeued
+
+
+def claim_next_job():
+    """
+    Kuyruktaki en eski işi sahiplen.
+
+    Koşullu UPDATE sayesinde birden fazla worker aynı işi alamaz.
+    """
+    while True:
+        job = EmailProcessingLog.objects.filter(
+            status=EmailProcessingLog.STATUS_QUEUED
+        ).order_by('processed_at', 'id').first()
+
+        if job is None:
+            return None
+
+        now = timezone.now()
+        claimed = EmailProcessingLog.objects.filter(
+            pk=job.pk, status=EmailProcessingLog.STATUS_QUEUED
+        ).update(
+            status=EmailProcessingLog.STATUS_RUNNING,
+            started_at=now,
+            heartbeat_at=now,
+            attempts=F('attempts') + 1,
+        )
+
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def _heartbeat_loop(job_id, stop_event, interval):
+    """Uzun Gmail listeleme/çekme adımlarında da işin canlı görünmesi için heartbeat at"""
+    try:
+        while not stop_event.wait(interval):
+            EmailProcessingLog.objects.filter(pk=job_id).update(heartbeat_at=timezone.now())
+    finally:
+        connection.close()
+
+
+def run_job(job):
+    """Sahiplenilmiş işi çalıştır ve sonucunu kaydet"""
+    progress = JobProgress(job)
+    stop_heartbeat = threading.Event()
+    heartbeat = threading.Thread(
+        target=_heartbeat_loop,
+        args=(job.pk, stop_heartbeat, _setting('EMAIL_JOB_HEARTBEAT_INTERVAL', 15)),
+        name=f'email-job-heartbeat-{job.pk}',
+        daemon=True,
+    )
+    heartbeat.start()
+
+    try:
+        if job.job_type == 'csv':
+            result_message = run_csv_job(job, progress)
+        else:
+            result_message = run_sync_job(job, progress)
+
+        progress.save()
+        job.status = EmailProcessingLog.STATUS_COMPLETED
+        job.success = True
+        job.result_message = result_message
+    except Exception as e:
+        print(f"E-posta işi hatası (#{job.pk}): {str(e)}")
+        print(f"Hata detayı: {traceback.format_exc()}")
+
+        job.status = EmailProcessingLog.STATUS_FAILED
+        job.success = False
+        job.error_message = str(e)
+    finally:
+        stop_heartbeat.set()
+        heartbeat.join()
+
+    job.finished_at = timezone.now()
+    job.heartbeat_at = job.finished_at
+    job.save()
+    return job
+
+
+def _get_scan_settings(user):
+    settings_obj = SystemSettings.get_cached_user_settings(user)
+    if settings_obj:
+        return settings_obj.email_scan_days, settings_obj.email_scan_limit
+    # Fallback değerler
+    return 5, 50000
+
+
+def _update_profile(user, gmail_service=None, commit_checkpoint=True):
+    """
+    Kullanıcı profilindeki istatistikleri güncelle.
+
+    commit_checkpoint=False ise historyId checkpoint'i ilerletilmez; bir sonraki artımlı
+    senkronizasyon aynı değişiklikleri yeniden listeler, başarılı olanlar bilinen ID'lerle atlanır.
+    """
+    try:
+        profile, created = UserProfile.objects.get_or_create(user=user)
+        profile.update_application_count()
+
+        if gmail_service is not None:
+            profile.last_email_sync = timezone.now()
+            profile.save(update_fields=['last_email_sync'])
+
+            # Bir sonraki senkronizasyon sadece bu noktadan sonraki mailleri çeksin
+            if commit_checkpoint:
+                gmail_service.commit_history_checkpoint()
+    except Exception as profile_error:
+        print(f"Profil güncelleme hatası: {str(profile_error)}")
+
+
+def _load_resume_checkpoint(job):
+    """
+    İşin devam noktasını belirle.
+
+    Yeniden kuyruğa alınan iş kendi checkpoint'inden devam eder. Yeni bir iş ise
+    aynı tipteki bir önceki iş hatayla bittiyse onun checkpoint'ini devralır.
+    """
+    if job.last_message_id:
+        return
+
+    previous = EmailProcessingLog.objects.filter(
+        user=job.user, job_type=job.job_type, csv_filename=job.csv_filename
+    ).exclude(pk=job.pk).order_by('-processed_at', '-id').first()
+
+    if previous and previous.status == EmailProcessingLog.STATUS_FAILED and previous.last_message_id:
+        print(f"Önceki yarım kalan iş (#{previous.pk}) kaldığı yerden devam ettiriliyor")
+        job.last_message_id = previous.last_message_id
+        job.history_id = previous.history_id
+        job.save(update_fields=['last_message_id', 'history_id'])
+
+
+def run_sync_job(job, progress):
+    """Gmail'den kullanıcının e-postalarını çekip iş başvurularını akış halinde işle"""
+    user = job.user
+    scan_days, scan_limit = _get_scan_settings(user)
+    _load_resume_checkpoint(job)
+
+    gmail_service = GmailService(user=user)
+    pipeline = EmailPipeline(user, progress)
+
+    # Liste: sadece mesaj ID'leri (detaylar aşağıda akış halinde çekilir)
+    message_ids = gmail_service.list_message_ids(
+        days=scan_days,
+        max_results=scan_limit,
+        include_processed=True,
+        skip_known=False
+    )
+
+    # Checkpoint mesajı genelde zaten kayıtlı olduğundan bilinen ID'ler devam noktası bulunduktan sonra atılır
+    message_ids = pipeline.drop_known(pipeline.resume_after(message_ids, job.last_message_id))
+
+    if job.history_id:
+        # Devam eden çalışma, ilk çalışmanın başladığı historyId'yi korur; aradaki
+        # yeni mailler bir sonraki artımlı senkronizasyonda gelir
+        gmail_service.pending_history_id = job.history_id
+    elif gmail_service.pending_history_id:
+        job.history_id = str(gmail_service.pending_history_id)
+        job.save(update_fields=['history_id'])
+
+    if not message_ids:
+        if gmail_service.used_incremental_sync and not gmail_service.last_listed_count:
+            # Son senkronizasyondan beri yeni mail yok - checkpoint'i ilerlet
+            gmail_service.commit_history_checkpoint()
+            return "Son senkronizasyondan bu yana yeni e-posta yok."
+        if gmail_service.last_listed_count:
+            gmail_service.commit_history_checkpoint()
+            progress.update(total=gmail_service.last_listed_count, processed=gmail_service.last_listed_count)
+            return f"{gmail_service.last_listed_count} e-posta tarandı, yeni e-posta yok."
+        raise ValueError("E-posta bulunamadı.")
+
+    progress.update(total=len(message_ids), processed=0, found=0, force=True)
+    print(f"Toplam {len(message_ids)} e-posta işlenecek...")
+
+    # fetch → parse → prefilter → (CSV'ye yaz) → classify → persist
+    try:
+        with gmail_service.open_csv_writer() as csv_writer:
+            emails = gmail_service.fetch_emails(
+                pipeline.track(message_ids), prefilter=gmail_service.metadata_prefilter
+            )
+            pipeline.run(csv_writer.tee(emails))
+    finally:
+        gmail_service.report_fetch_stats()
+        gmail_service.mark_rejected_seen()
+
+    csv_filename = csv_writer.filename if csv_writer.row_count else ''
+    if csv_filename:
+        job.csv_filename = csv_filename
+        job.save(update_fields=['csv_filename'])
+
+    scanned_emails = max(gmail_service.last_listed_count, len(message_ids))
+    candidates = csv_writer.row_count
+    progress.update(processed=len(message_ids), total=scanned_emails, force=True)
+
+    # İndirilemeyen, kaydedilemeyen veya Gemini'nin karar veremediği mail varsa checkpoint
+    # ilerletilmez; aksi halde artımlı modda bu mailler bir daha listelenmez
+    failures = pipeline.failed_count + pipeline.detection_failed_count + gmail_service.fetch_failed_count
+    if failures:
+        print(f"{failures} e-posta işlenemedi, historyId checkpoint'i ilerletilmedi")
+    _update_profile(user, gmail_service, commit_checkpoint=not failures)
+
+    if not candidates:
+        # Tüm mailler metadata ön filtresinde elendi
+        return f"{scanned_emails} e-posta tarandı, iş başvurusu adayı bulunamadı."
+
+    result_message = (
+        f"{scanned_emails} e-posta tarandı ({candidates} aday), "
+        f"{pipeline.job_applications_found} yeni iş başvurusu bulundu. "
+        f"({pipeline.already_processed} zaten işlenmiş)"
+    )
+    template_summary = pipeline.template_summary()
+    if template_summary:
+        result_message += f"\n{template_summary}"
+    if csv_filename:
+        result_message += f"\nE-postalar CSV'ye kaydedildi: {csv_filename}"
+
+    print(f"Senkronizasyon tamamlandı: {pipeline.job_applications_found} yeni başvuru eklendi")
+    return result_message
+
+
+def run_csv_job(job, progress):
+    """Mevcut CSV dosyasındaki e-postaları işle"""
+    user = job.user
+    csv_filename = job.csv_filename
+
+    gmail_service = GmailService(user=user)
+    pipeline = EmailPipeline(user, progress)
+
+    # Önce sadece id sütunu taranır: toplam satır ve devam noktası. E-postalar ise
+    # işlendikçe parça parça okunur, dosyanın tamamı belleğe alınmaz.
+    _load_resume_checkpoint(job)
+    total_emails, skip = gmail_service.scan_csv(csv_filename, job.last_message_id)
+
+    if not total_emails:
+        raise ValueError(f"CSV dosyası bulunamadı veya okunamadı: {csv_filename}")
+
+    if skip is None:
+        if job.last_message_id:
+            print(f"Checkpoint mesajı ({job.last_message_id}) listede yok, baştan devam ediliyor")
+        skip = 0
+    else:
+        print(f"Checkpoint bulundu, {skip} mail atlanıyor (son mesaj: {job.last_message_id})")
+    emails = gmail_service.read_emails_from_csv(csv_filename, skip=skip)
+
+    progress.update(total=total_emails, processed=skip, found=0, force=True)
+    pipeline.listed_count = skip
+    print(f"CSV'den {total_emails - skip} e-posta işlenecek: {csv_filename}")
+
+    pipeline.run(pipeline.track(emails))
+
+    progress.update(processed=total_emails, force=True)
+    _update_profile(user)
+
+    print(f"CSV işleme tamamlandı: {pipeline.job_applications_found} yeni başvuru eklendi")
+    result_message = (
+        f"CSV'den {total_emails} e-posta işlendi, {pipeline.job_applications_found} yeni iş başvurusu bulundu. "
+        f"({pipeline.already_processed} zaten işlenmiş)"
+    )
+    template_summary = pipeline.template_summary()
+    if template_summary:
+        result_message += f"\n{template_summary}"
+    return result_message
+
+
+def run_worker(once=False, poll_interval=None, stop_event=None):
+    """
+    Kuyruktaki işleri sırayla çalıştıran worker döngüsü.
+
+    once=True ise kuyruk boşaldığında döner. Başlangıçta ve her boş turda
+    yarım kalmış işler kuyruğa geri alınır.
+    """
+    poll_interval = poll_interval if poll_interval is not None else _setting('EMAIL_JOB_POLL_INTERVAL', 2)
+    processed = 0
+
+    while stop_event is None or not stop_event.is_set():
+        close_old_connections()
+        requeue_stale_jobs()
+
+        job = claim_next_job()
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+
+        print(f"E-posta işi başladı: #{job.pk} ({job.get_job_type_display()}, {job.user.username})")
+        job = run_job(job)
+        processed += 1
+        print(f"E-posta işi bitti: #{job.pk} - {job.get_status_display()}")
+
+    return processed
+
+
+def _run_in_process_worker():
+    global _worker_thread
+
+    try:
+        while True:
+            run_worker(once=True)
+
+            # Thread kapanırken yeni iş eklendiyse onu da al
+            with _worker_lock:
+                if not EmailProcessingLog.objects.filter(status=EmailProcessingLog.STATUS_QUEUED).exists():
+                    _worker_thread = None
+                    return
+    finally:
+        connection.close()
+
+
+def ensure_worker_thread():
+    """
+    Web süreci içinde kuyruğu boşaltan bir daemon thread başlat (yoksa).
+
+    Ayrı bir worker (manage.py run_email_worker) kullanılıyorsa
+    EMAIL_JOBS_RUN_IN_PROCESS = False yapılmalıdır.
+    """
+    global _worker_thread
+
+    with _worker_lock:
+        if _worker_thread is not None and _worker_thread.is_alive():
+            return _worker_thread
+
+        # Ölmüş bir önceki worker'dan kalan işleri devral
+        requeue_stale_jobs()
+
+        _worker_thread = threading.Thread(
+            target=_run_in_process_worker, name='email-job-worker', daemon=True
+        )
+        _worker_thread.start()
+        return _worker_thread
@@ -0,0 +1,414 @@
+from collections import deque
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+
+from .gemini_pool import GeminiWorkerPool
+from .gemini_service import GeminiService
+from .models import ApplicationStats, GeminiResultCache, JobApplication, SeenEmail, SystemSettings, UserProfile
+from .search import get_search_backend
+
+
+class EmailPipeline:
+    """
+    E-posta işleme hattı: list → fetch → parse → prefilter → classify → persist.
+
+    Her aşama bir generator'dır; e-postalar geldikçe tek tek işlenir, bellekte
+    sadece uçuştaki birkaç e-posta bulunur. Her tamamlanan e-postadan sonra
+    mesaj ID'si checkpoint olarak işe (JobProgress) yazılır, böylece yarıda
+    kalan bir çalışma aynı noktadan devam ettirilebilir.
+    """
+
+    DEFAULT_JOB_INFO = {
+        'company_name': 'Bilinmeyen Şirket',
+        'position': 'Bilinmeyen Pozisyon',
+        'status': 'received'
+    }
+
+    def __init__(self, user, progress=None, concurrency=None, service_factory=GeminiService):
+        self.user = user
+        self.progress = progress
+        self.service_factory = service_factory
+        self.settings_obj = SystemSettings.get_cached_user_settings(user)
+        self.services = []
+        self.gemini_service = self._create_service()
+        self.concurrency = concurrency if concurrency is not None else getattr(settings, 'GEMINI_CONCURRENCY', 4)
+
+        # Batch modunda bir prompt'a konan e-posta sayısı kullanıcının email_batch_size ayarıdır
+        self.batch_size = 1
+        if self.gemini_service.analysis_mode == 'batch':
+            self.batch_size = max(1, self.settings_obj.email_batch_size if self.settings_obj else 10)
+
+        # İşlenmiş mesaj ID'leri tek sorguda yüklenir
+        self.known_ids = SeenEmail.get_known_message_ids(user)
+
+        self.listed_count = 0
+        self.job_applications_found = 0
+        self.already_processed = 0
+        self.failed_count = 0
+        self.detection_failed_count = 0
+        self.last_message_id = None
+
+        # persist aşamasının tamponu: bulk_create ile yazılmayı bekleyen başvurular
+        self.persist_batch_size = max(1, getattr(settings, 'JOB_APPLICATION_BULK_SIZE', 100))
+        self._pending_applications = []
+        self._pending_ids = set()
+        self._deferred_checkpoint = None
+
+    def _create_service(self):
+        """Sonuç cache'i kullanıcının gemini_cache_ttl ayarıyla çalışan Gemini servisi oluştur"""
+        service = self.service_factory()
+        if self.settings_obj:
+            service.cache_ttl = self.settings_obj.gemini_cache_ttl
+        self.services.append(service)
+        return service
+
+    def template_stats(self):
+        """Bu çalışmada şablon aranan ve şablondan çözülen e-posta sayısı (tüm worker servisleri)"""
+        lookups = sum(service.usage.get('template_lookups', 0) for service in self.services)
+        hits = sum(service.usage.get('template_hits', 0) for service in self.services)
+        return lookups, hits
+
+    def template_summary(self):
+        """Senkronizasyon sonucuna eklenecek şablon isabet oranı satırı"""
+        lookups, hits = self.template_stats()
+        if not lookups:
+            return ''
+        return f"Şablon isabeti: {hits}/{lookups} (%{hits * 100 / lookups:.0f}), {hits} model çağrısı atlandı"
+
+    @staticmethod
+    def resume_after(items, checkpoint_id, key=lambda item: item):
+        """
+        Checkpoint mesajı listede varsa ondan sonraki öğeleri döndür.
+
+        Checkpoint bulunamazsa (ör. mail silinmişse) liste olduğu gibi döner;
+        zaten işlenmiş mailler known_ids ile atlanır.
+        """
+        items = list(items)
+        if not checkpoint_id:
+            return items
+
+        for index, item in enumerate(items):
+            if key(item) == checkpoint_id:
+                print(f"Checkpoint bulundu, {index + 1} mail atlanıyor (son mesaj: {checkpoint_id})")
+                return items[index + 1:]
+
+        print(f"Checkpoint mesajı ({checkpoint_id}) listede yok, baştan devam ediliyor")
+        return items
+
+    def drop_known(self, message_ids):
+        """Daha önce işlenmiş/görülmüş mesaj ID'lerini detay indirmeden at"""
+        new_ids = [message_id for message_id in message_ids if message_id not in self.known_ids]
+        print(f"Daha önce işlenmiş/görülmüş {len(message_ids) - len(new_ids)} mail atlandı, "
+              f"{len(new_ids)} yeni mail işlenecek")
+        return new_ids
+
+    def track(self, items):
+        """Liste aşaması: tüketilen mesaj ID'lerini (veya CSV satırlarını) ilerleme için say"""
+        for item in items:
+            self.listed_count += 1
+            self._report_progress()
+            yield item
+
+    @classmethod
+    def analyze(cls, gemini_service, email_data):
+        """
+        Tek bir e-postayı Gemini ile analiz et.
+
+        (job_info, detection_failed) döndürür; iş başvurusu değilse job_info None.
+        """
+        is_job_email, job_info = gemini_service.analyze_email(
+            email_data.subject,
+            email_data.body,
+            email_data.sender
+        )
+
+        if not is_job_email:
+            return None, gemini_service.last_detection_failed
+
+        if not isinstance(job_info, dict):
+            print(f"Uyarı: job_info dictionary değil, tip: {type(job_info)}, değer: {job_info}")
+            job_info = dict(cls.DEFAULT_JOB_INFO)
+
+        return job_info, False
+
+    @classmethod
+    def analyze_group(cls, gemini_service, emails):
+        """
+        Bir grup e-postayı analiz et; message_id -> (job_info, detection_failed) döndür.
+
+        Tek e-postalık gruplar analyze ile, daha büyük gruplar batch modunda tek
+        prompt ile (GeminiService.analyze_batch) analiz edilir.
+        """
+        if len(emails) == 1:
+            return {emails[0].id: cls.analyze(gemini_service, emails[0])}
+
+        batch_results = gemini_service.analyze_batch(
+            [(email_data.id, email_data.subject, email_data.body, email_data.sender) for email_data in emails]
+        )
+
+        results = {}
+        for message_id, (is_job_email, job_info, detection_failed) in batch_results.items():
+            if not is_job_email:
+                results[message_id] = (None, detection_failed)
+            elif not isinstance(job_info, dict):
+                print(f"Uyarı: job_info dictionary değil, tip: {type(job_info)}, değer: {job_info}")
+                results[message_id] = (dict(cls.DEFAULT_JOB_INFO), False)
+            else:
+                results[message_id] = (job_info, False)
+        return results
+
+    def classify(self, emails):
+        """
+        Gemini ile sınıflandır; (email_data, job_info, detection_failed) üret.
+
+        E-postalar batch_size'lık gruplar halinde analiz edilir (batch modu dışında 1).
+        concurrency > 1 ise en fazla `concurrency` grup aynı anda analiz edilir;
+        sonuçlar yine de giriş sırasıyla üretilir (seri yol ile aynı davranış).
+        """
+        pool = GeminiWorkerPool(self._create_service, self.concurrency) if self.concurrency > 1 else None
+        window = self.concurrency * 2 if pool else 1
+        pending = deque()
+
+        try:
+            for group in self._groups(emails):
+                # Bilinen mailler analiz edilmez ama sıralarını korumak için grupta kalır
+                todo = [email_data for email_data in group if email_data.id not in self.known_ids]
+
+                if not todo:
+                    get_results = dict
+                elif pool:
+                    get_results = pool.submit(self.analyze_group, todo).result
+                else:
+                    get_results = partial(self.analyze_group, self.gemini_service, todo)
+
+                pending.append((group, {email_data.id for email_data in todo}, get_results))
+
+                if len(pending) >= window:
+                    yield from self._collect(*pending.popleft())
+
+            while pending:
+                yield from self._collect(*pending.popleft())
+        finally:
+            if pool:
+                pool.shutdown()
+
+    def _groups(self, emails):
+        group = []
+        for email_data in emails:
+            group.append(email_data)
+            if len(group) >= self.batch_size:
+                yield group
+                group = []
+        if group:
+            yield group
+
+    def _collect(self, group, todo_ids, get_results):
+        """Sıradaki grubun sonuçlarını al; bilinen veya hatalı mailler checkpoint'i ilerletip atlanır"""
+        try:
+            results = get_results()
+            group_error = None
+        except Exception as gemini_error:
+            results = {}
+            group_error = gemini_error
+
+        for email_data in group:
+            message_id = email_data.id
+            print(f"İşleniyor: {email_data.subject[:50]}...")
+
+            # Daha önce işlenmiş mi kontrol et (kullanıcı bazlı kontrol)
+            if message_id not in todo_ids:
+                self.already_processed += 1
+                print(f"  → Zaten işlenmiş, atlanıyor")
+                self._complete(message_id)
+                continue
+
+            if group_error is not None or message_id not in results:
+                print(f"  → Gemini analiz hatası: {str(group_error or 'yanıt yok')}")
+                self.failed_count += 1
+                self._complete(message_id)
+                continue
+
+            job_info, detection_failed = results[message_id]
+            if job_info is not None:
+                print(f"  → İş başvurusu tespit edildi!")
+            yield email_data, job_info, detection_failed
+
+    def persist(self, classified):
+        """
+        İş başvurularını kaydet, diğerlerini görüldü olarak işaretle; kaydedilen e-postaları üret.
+
+        Başvurular persist_batch_size'lık gruplar halinde tek transaction'da
+        bulk_create ile yazılır. Tampon boşalana kadar checkpoint ilerletilmez;
+        böylece yarıda kalan bir çalışma yazılmamış başvuruları atlamaz.
+        """
+        try:
+            for email_data, job_info, detection_failed in classified:
+                message_id = email_data.id
+
+                if job_info is None:
+                    print(f"  → İş başvurusu değil, atlanıyor")
+                    if detection_failed:
+                        self.detection_failed_count += 1
+                    elif self.progress:
+                        self.progress.mark_seen_later(message_id)
+                    self._complete(message_id)
+                    continue
+
+                if message_id in self._pending_ids:
+                    self._complete(message_id)
+                    continue
+
+                self._pending_applications.append((email_data, self._build_application(email_data, job_info)))
+                self._pending_ids.add(message_id)
+                self._complete(message_id)
+
+                if len(self._pending_applications) >= self.persist_batch_size:
+                    yield from self._save_pending_applications()
+
+            yield from self._save_pending_applications()
+        finally:
+            # Hata veya erken kapanışta tampondaki başvurular kaybolmasın
+            self._save_pending_applications()
+
+    def _build_application(self, email_data, job_info):
+        return JobApplication(
+            user=self.user,
+            company_name=job_info.get('company_name', 'Bilinmeyen Şirket'),
+            position=job_info.get('position', 'Bilinmeyen Pozisyon'),
+            email_sender=email_data.sender_email,
+            application_date=email_data.date,
+            status=job_info.get('status', 'received'),
+            email_subject=email_data.subject,
+            email_content=email_data.body[:1000],  # İlk 1000 karakter
+            gmail_message_id=email_data.id,
+            extracted_info=job_info
+        )
+
+    def _save_pending_applications(self):
+        """
+        Tampondaki başvuruları tek transaction'da bulk_create ile yaz.
+
+        Zaten kayıtlı olanlar (user, gmail_message_id) çakışmasıyla atlanır.
+        Toplu yazım hata verirse kayıtlar tek tek denenir; sadece hatalı olan
+        kaybedilir. Kaydedilen e-postaların listesini döndürür.
+        """
+        pending = self._pending_applications
+        if not pending:
+            return []
+        self._pending_applications = []
+        self._pending_ids = set()
+
+        try:
+            saved = self._bulk_insert(pending)
+        except Exception as save_error:
+            print(f"  → Toplu kayıt hatası, başvurular tek tek kaydediliyor: {str(save_error)}")
+            saved = []
+            for item in pending:
+                try:
+                    saved.extend(self._bulk_insert([item]))
+                except Exception as item_error:
+                    print(f"  → Kaydetme hatası: {str(item_error)}")
+                    self.failed_count += 1
+
+        for email_data, application in saved:
+            self.job_applications_found += 1
+            self.known_ids.add(email_data.id)
+            print(f"  → Kaydedildi: {application.company_name} - {application.position}")
+
+        # Checkpoint, tampon doluyken bekletilen son mesaja ilerler
+        if self._deferred_checkpoint is not None:
+            message_id, self._deferred_checkpoint = self._deferred_checkpoint, None
+            self._complete(message_id)
+
+        return [email_data for email_data, _ in saved]
+
+    def _bulk_insert(self, pending):
+        """Yeni başvuruları tek transaction'da yaz; daha önce kayıtlı olanlar sayılmaz"""
+        message_ids = [email_data.id for email_data, _ in pending]
+
+        with transaction.atomic():
+            existing = set(
+                JobApplication.objects.filter(user=self.user, gmail_message_id__in=message_ids)
+                .values_list('gmail_message_id', flat=True)
+            )
+            new = [(email_data, application) for email_data, application in pending if email_data.id not in existing]
+            JobApplication.objects.bulk_create(
+                [application for _, application in new], batch_size=self.persist_batch_size, ignore_conflicts=True
+            )
+
+            # ignore_conflicts ile atlanan satırlar (araya giren başka bir yazım) pk almaz ve bildirilmez;
+            # gerçekten yazılanlar yeniden okunup bizim created_at değerimizle eşleştirilir
+            stored = {
+                message_id: (pk, created_at)
+                for message_id, pk, created_at in JobApplication.objects.filter(
+                    user=self.user, gmail_message_id__in=[application.gmail_message_id for _, application in new]
+                ).values_list('gmail_message_id', 'pk', 'created_at')
+            }
+            inserted = []
+            for email_data, application in new:
+                pk, created_at = stored.get(application.gmail_message_id, (None, None))
+                if created_at == application.created_at:
+                    application.pk = pk
+                    inserted.append((email_data, application))
+
+            # bulk_create sinyal tetiklemez; istatistik satırı ve arama indeksi aynı transaction'da güncellenir
+            ApplicationStats.record(
+                self.user.id, added=[ApplicationStats.values_of(application) for _, application in inserted]
+            )
+            get_search_backend().index([application for _, application in inserted])
+
+        skipped = len(pending) - len(inserted)
+        if skipped:
+            print(f"  → {skipped} başvuru zaten kayıtlı, atlandı")
+        return inserted
+
+    def run(self, emails):
+        """Sınıflandırma ve kayıt aşamalarını e-posta akışı üzerinde çalıştır"""
+        for _ in self.persist(self.classify(emails)):
+            pass
+
+        # Toplu yazım post_save sinyalini tetiklemez; profil sayacı bir kez güncellenir
+        if self.job_applications_found:
+            self._update_profile_stats()
+
+        template_summary = self.template_summary()
+        if template_summary:
+            print(template_summary)
+
+        try:
+            evicted = GeminiResultCache.evict(getattr(settings, 'GEMINI_CACHE_MAX_ENTRIES', 50000))
+            if evicted:
+                print(f"Gemini cache'ten en az kullanılan {evicted} kayıt silindi")
+        except Exception as cache_error:
+            print(f"Gemini cache temizleme hatası: {str(cache_error)}")
+
+        if self.progress:
+            self.progress.update(found=self.job_applications_found, force=True)
+        return self
+
+    def _update_profile_stats(self):
+        try:
+            profile = UserProfile.objects.get(user=self.user)
+            profile.update_application_count()
+        except UserProfile.DoesNotExist:
+            pass
+        except Exception as profile_error:
+            print(f"Profil istatistik güncelleme hatası: {str(profile_error)}")
+
+    def _complete(self, message_id):
+        """E-posta tamamlandı: checkpoint'i ilerlet (yazılmamış başvuru varsa tampon boşalana kadar beklet)"""
+        if self._pending_applications:
+            self._deferred_checkpoint = message_id
+            return
+        self.last_message_id = message_id
+        self._report_progress()
+
+    def _report_progress(self):
+        if self.progress:
+            self.progress.update(
+                processed=self.listed_count,
+                found=self.job_applications_found,
+                last_message_id=self.last_message_id
+            )
@@ -0,0 +1,55 @@
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from typing import ClassVar
+
+
+def _text(value):
+    """CSV'den gelen boş (NaN) değerleri boş stringe çevir"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return str(value)
+
+
+@dataclass(slots=True)
+class EmailRecord:
+    """
+    Pipeline'ın kullandığı alanları tutan kompakt e-posta kaydı.
+
+    Ham Gmail payload'u (ekler dahil) tutulmaz. Gövde ayrıştırma anında
+    BODY_MAX_LENGTH karaktere kısaltılır; asıl uzunluk body_length'te saklanır.
+    """
+
+    # CSV body_full sütunu en fazla bu kadarını saklar (JobApplication.email_content 1000)
+    BODY_MAX_LENGTH: ClassVar[int] = 5000
+    PREVIEW_LENGTH: ClassVar[int] = 200
+
+    id: str
+    subject: str
+    sender: str
+    sender_email: str
+    date: datetime
+    body: str
+    body_length: int
+    is_read: bool
+
+    @classmethod
+    def create(cls, id, subject, sender, sender_email, date, body, is_read, body_length=None):
+        """Gövdeyi kısaltarak kayıt oluştur"""
+        body = _text(body)
+        return cls(
+            id=_text(id),
+            subject=_text(subject),
+            sender=_text(sender),
+            sender_email=_text(sender_email),
+            date=date,
+            body=body[:cls.BODY_MAX_LENGTH],
+            body_length=len(body) if body_length is None else int(body_length),
+            is_read=bool(is_read),
+        )
+
+    @property
+    def body_preview(self):
+        if self.body_length > self.PREVIEW_LENGTH:
+            return self.body[:self.PREVIEW_LENGTH] + '...'
+        return self.body
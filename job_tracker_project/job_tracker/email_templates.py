@@ -0,0 +1,127 @@
+import hashlib
+import re
+
+# Şablon iskeletinde maskelenen alanlar; yeni e-postada bu adlı gruplarla okunur
+TEMPLATE_FIELDS = ('company_name', 'position', 'location')
+
+# Gemini'nin "bulamadım" anlamında döndürdüğü değerler şablona dönüştürülmez
+UNKNOWN_VALUES = {'', 'bilinmiyor', 'bilinmeyen şirket', 'bilinmeyen pozisyon', 'unknown'}
+
+# Gövdenin şablona dahil edilen ilk dolu satır sayısı (LinkedIn post-processing ile aynı)
+BODY_LINES = 5
+
+# Konu iskeletinde en az bu kadar sabit karakter kalmalı; yoksa şablon her maile uyar
+MIN_SUBJECT_LITERAL_CHARS = 8
+
+
+def normalize_subject(subject):
+    return ' '.join(str(subject or '').split())
+
+
+def body_head(body):
+    """Gövdenin boşlukları normalize edilmiş ilk BODY_LINES dolu satırı"""
+    lines = [' '.join(line.split()) for line in str(body or '').splitlines() if line.strip()]
+    return '\n'.join(lines[:BODY_LINES])
+
+
+def _build_pattern(text, values):
+    """
+    Metni regex iskeletine çevir: alan değerleri adlandırılmış gruplara, URL ve
+    sayılar joker ifadelere dönüşür, geri kalan metin aynen eşleşmelidir.
+
+    (pattern, sabit karakter sayısı, bulunan alanlar) döndürür.
+    """
+    parts = [
+        f'(?P<f_{field}>{re.escape(value)})'
+        for field, value in sorted(values.items(), key=lambda item: -len(item[1]))
+    ]
+    parts += [r'(?P<url>https?://\S+)', r'(?P<number>\d+)']
+    token_re = re.compile('|'.join(parts), re.IGNORECASE)
+
+    pattern = []
+    found = set()
+    literal_chars = 0
+    position = 0
+
+    for match in token_re.finditer(text):
+        literal = text[position:match.start()]
+        pattern.append(re.escape(literal))
+        literal_chars += len(literal.strip())
+
+        kind = match.lastgroup
+        if kind == 'url':
+            pattern.append(r'\S+')
+        elif kind == 'number':
+            pattern.append(r'\d+')
+        else:
+            field = kind[2:]
+            # Aynı değer tekrar geçiyorsa ilk grubun aynısı olmalı
+            pattern.append(f'(?P={field})' if field in found else f'(?P<{field}>.+?)')
+            found.add(field)
+        position = match.end()
+
+    literal = text[position:]
+    pattern.append(re.escape(literal))
+    literal_chars += len(literal.strip())
+
+    return ''.join(pattern), literal_chars, found
+
+
+def build_template(sender_email, subject, body, job_info):
+    """
+    Gemini'nin etiketlediği bir e-postadan şablon çıkar.
+
+    Şirket ve pozisyon konu veya gövdenin ilk satırlarında birebir geçmiyorsa
+    (kural ile çıkarılamazsa) None döner.
+
+    Returns:
+        dict: fingerprint, subject_pattern, body_pattern veya None
+    """
+    values = {}
+    for field in TEMPLATE_FIELDS:
+        value = str(job_info.get(field) or '').strip()
+        if len(value) >= 2 and value.lower() not in UNKNOWN_VALUES:
+            values[field] = value
+
+    if 'company_name' not in values or 'position' not in values:
+        return None
+
+    subject_pattern, subject_literals, subject_fields = _build_pattern(normalize_subject(subject), values)
+    body_pattern, _, body_fields = _build_pattern(body_head(body), values)
+
+    if not {'company_name', 'position'} <= (subject_fields | body_fields):
+        return None
+    if subject_literals < MIN_SUBJECT_LITERAL_CHARS:
+        return None
+
+    fingerprint = hashlib.sha256(
+        '\x1f'.join([sender_email, subject_pattern, body_pattern]).encode('utf-8')
+    ).hexdigest()
+    return {'fingerprint': fingerprint, 'subject_pattern': subject_pattern, 'body_pattern': body_pattern}
+
+
+def match_template(templates, subject, body):
+    """
+    E-postaya uyan ilk şablonu ve yakalanan alan değerlerini döndür.
+
+    Returns:
+        (template, {alan: değer}) veya None
+    """
+    subject = normalize_subject(subject)
+    head = None
+
+    for template in templates:
+        subject_match = re.fullmatch(template.subject_pattern, subject, re.IGNORECASE)
+        if not subject_match:
+            continue
+
+        if head is None:
+            head = body_head(body)
+        body_match = re.fullmatch(template.body_pattern, head, re.IGNORECASE)
+        if not body_match:
+            continue
+
+        values = {**body_match.groupdict(), **subject_match.groupdict()}
+        return template, {field: value.strip() for field, value in values.items() if value}
+
+    return None
@@ -0,0 +1,157 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from google.api_core import exceptions as google_exceptions
+
+# Kota aşımı ve geçici sunucu hataları: tekrar denenebilir
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
+
+QUOTA_ERRORS = (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Kapasite kadar birikebilir, saniyede `refill_rate` kadar dolar. acquire()
+    yeterli token birikene kadar bekler.
+    """
+
+    def __init__(self, capacity, refill_rate):
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    def acquire(self, amount=1):
+        """amount kadar token al; yoksa birikene kadar bekle"""
+        amount = min(float(amount), self.capacity)
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                delay = (amount - self.tokens) / self.refill_rate
+
+            time.sleep(delay)
+
+    def adjust(self, amount):
+        """Tahmin ile gerçek kullanım arasındaki farkı düzelt (pozitif: iade, negatif: ek düşüm)"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class GeminiRateLimiter:
+    """
+    Bir API anahtarının dakikalık istek (RPM) ve token (TPM) kotasını uygulayan sınırlayıcı.
+
+    Aynı anahtarı kullanan tüm thread'ler aynı sınırlayıcıyı paylaşır (bkz.
+    get_rate_limiter). Kota hatası geldiğinde tüm istekler bir süre durdurulur.
+    """
+
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm, rpm / 60.0)
+        self.tokens = TokenBucket(tpm, tpm / 60.0)
+        self.quota_error_count = 0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, estimated_tokens):
+        """Bir istek ve tahmini token miktarı için slot al"""
+        with self._lock:
+            delay = self._paused_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        self.requests.acquire(1)
+        self.tokens.acquire(estimated_tokens)
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Yanıttaki gerçek token kullanımına göre kovayı düzelt"""
+        if actual_tokens:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+
+    def on_quota_error(self, delay):
+        """Kota hatasında tüm istekleri `delay` saniye durdur"""
+        with self._lock:
+            self.quota_error_count += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api_key, rpm, tpm):
+    """API anahtarı başına tek bir GeminiRateLimiter döndür"""
+    with _limiters_lock:
+        limiter = _limiters.get(api_key)
+        if limiter is None:
+            limiter = GeminiRateLimiter(rpm, tpm)
+            _limiters[api_key] = limiter
+        return limiter
+
+
+def generate_with_backoff(request_fn, rate_limiter, estimated_tokens, max_retries=5):
+    """
+    Gemini isteğini sınırlayıcı üzerinden çalıştır; kota ve geçici hatalarda
+    üstel geri çekilme (exponential backoff + jitter) ile tekrar dene.
+    """
+    for attempt in range(max_retries + 1):
+        rate_limiter.acquire(estimated_tokens)
+        try:
+            return request_fn()
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+
+            delay = min(2 ** attempt, 60) * random.uniform(0.5, 1.0)
+            if isinstance(e, QUOTA_ERRORS):
+                rate_limiter.on_quota_error(delay)
+            time.sleep(delay)
+
+
+class GeminiWorkerPool:
+    """
+    Gemini isteklerini sınırlı eşzamanlılıkla çalıştıran havuz.
+
+    GeminiService örnekleri durum taşıdığı için (last_detection_failed gibi) her
+    thread `service_factory` ile kendi servisini oluşturur. Görevler
+    fn(service, *args) şeklinde çağrılır.
+    """
+
+    def __init__(self, service_factory, concurrency=4):
+        self.service_factory = service_factory
+        self.concurrency = max(1, concurrency)
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='gemini-worker')
+
+    def _get_service(self):
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = self.service_factory()
+            self._local.service = service
+        return service
+
+    def submit(self, fn, *args):
+        return self._executor.submit(lambda: fn(self._get_service(), *args))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
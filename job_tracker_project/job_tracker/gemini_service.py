@@ -1,10 +1,15 @@
 import google.generativeai as genai
 import json
-import re
 import logging
 from typing import Dict, Any, Optional, Tuple
 from django.conf import settings
 
+from .gemini_pool import generate_with_backoff, get_rate_limiter
+from . import patterns
+from .email_templates import match_template
+from .keyword_matcher import KeywordMatcher
+from .models import EmailTemplate, GeminiResultCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -14,14 +19,129 @@ class GeminiService:
     iş başvuru sürecine göre sınıflandıran servis sınıfı.
     """
 
-    def __init__(self):
-        """Gemini AI servisini başlat"""
+    # Bildirim gönderen adresleri
+    NOTIFICATION_SENDERS = {
+        'jobalerts-noreply@linkedin.com',
+        'alert@indeed.com',
+        'noreply@glassdoor.com',
+        'alerts@monster.com',
+        'noreply@kariyer.net',
+        'bildirim@secretcv.com',
+        'notification@yenibiris.com',
+        'aday@e.kariyer.net'
+    }
+
+    # Konu ve içerik bazlı bildirim tespiti
+    NOTIFICATION_KEYWORDS = {
+        # Türkçe bildirim anahtar kelimeleri
+        'yeni iş ilanı', 'iş ilanı yayınlandı', 'size uygun iş',
+        'iş fırsatları', 'günlük iş özeti', 'haftalık özet',
+        'iş aramanız için', 'aradığınız iş', 'kariyer fırsatları',
+        'iş bildirimi', 'iş uyarısı', 'size özel iş','yeni başvuru güncellemeleri',
+        'başvurularınızın durumunu'
+
+        # İngilizce bildirim anahtar kelimeleri
+        'new job alert', 'job recommendations', 'daily job digest',
+        'weekly job summary', 'job opportunities for you',
+        'recommended jobs', 'job notifications', 'jobs you might like',
+        'job search alert', 'career opportunities', 'job posting alert'
+    }
+
+    # Güçlü iş başvuru göstergeleri
+    JOB_APPLICATION_INDICATORS = {
+        # Türkçe göstergeler
+        'başvurunuz', 'başvuru', 'mülakat', 'görüşme', 'pozisyon',
+        'iş başvurusu', 'cv', 'özgeçmiş', 'kariyer', 'insan kaynakları',
+        'hr', 'işe alım', 'değerlendirme', 'aday', 'başvuru durumu',
+        'işe başlama', 'teklif', 'kabul', 'red', 'maalesef',
+        'tebrikler', 'seçildiniz', 'işe alındınız',
+        'ön görüşme', 'ikinci görüşme', 'telefon görüşmesi',
+        'online görüşme', 'video mülakat', 'yüz yüze görüşme',
+        'işe alım süreci', 'aday değerlendirme', 'referans kontrolü',
+        'iş başlangıcı', 'deneme süresi', 'iş sözleşmesi',
+        'çalışma şartları', 'ücret teklifi', 'iş teklif mektubu',
+        'iş onayı', 'iş daveti', 'işe giriş tarihi', 'iş teklifi kabulü',
+        'iş teklifi reddi',
+
+        # İngilizce göstergeler
+        'application', 'interview', 'position', 'job application',
+        'resume', 'cv', 'career', 'human resources', 'hiring',
+        'evaluation', 'candidate', 'application status', 'employment',
+        'offer', 'accepted', 'rejected', 'unfortunately',
+        'congratulations', 'selected', 'hired', 'recruiting',
+        'talent', 'opportunity', 'role',
+        'screening', 'shortlisted', 'assessment', 'test task',
+        'reference check', 'background check', 'job start',
+        'trial period', 'employment contract', 'job offer letter',
+        'salary offer', 'work conditions', 'start date',
+        'onboarding', 'phone interview', 'video interview',
+        'final interview', 'job confirmation', 'offer acceptance',
+        'offer rejection'
+    }
+
+    # Geçerli iş başvuru gönderen adresleri
+    VALID_JOB_SENDERS = {
+        'jobs-noreply@linkedin.com',
+        'indeedapply@indeed.com',
+        'noreply@glassdoor.com',
+        'careers@monster.com'
+    }
+
+    # Test/deneme içerik kalıpları
+    TEST_PATTERNS = ['deneme', 'test', 'demo', 'asdf', 'qwerty', 'dedede']
+
+    # Kural tabanlı ön filtrelerin matcher'ları; sınıf yüklenirken bir kez hazırlanır
+    NOTIFICATION_MATCHER = KeywordMatcher(NOTIFICATION_KEYWORDS)
+    JOB_INDICATOR_MATCHER = KeywordMatcher(JOB_APPLICATION_INDICATORS)
+    TEST_PATTERN_MATCHER = KeywordMatcher(TEST_PATTERNS)
+
+    MODEL_NAME = "gemini-2.0-flash-exp"
+
+    # Prompt'lar veya yanıt formatı değiştiğinde artırılmalı; eski cache kayıtları geçersiz olur
+    PROMPT_VERSION = 1
+
+    # Durum sınıflandırmasının kabul ettiği değerler
+    CLASSIFICATION_STATUSES = ['received', 'reviewing', 'interview', 'offer', 'rejected']
+
+    # Birleşik ve batch analiz prompt'larının ortak kuralları
+    UNIFIED_ANALYSIS_RULES = """
+        === 1. İŞ BAŞVURUSU MU? (`is_job`) ===
+        - Başvuru onayı, durum güncellemesi, mülakat daveti, test görevi, iş teklifi veya ret bildirimi ise: true
+        - İş ilanı bildirimi (job alert), reklam, haber bülteni, anket veya alakasız bir konu ise: false
+        - Belirli bir adaya yazılmış ve spesifik bir süreci ilerleten mailler true, herkese gönderilebilecek genel içerikler false.
+
+        === 2. DURUM (`status`) - en spesifik olandan en genele ===
+        - 'offer': Net iş teklifi, maaş, sözleşme, "ekibimize katıldınız", "job offer", "welcome to the team".
+        - 'interview': Görüşme planlaması, müsaitlik sorulması, mülakat daveti, case study, teknik değerlendirme.
+        - 'rejected': "maalesef", "üzülerek", "unfortunately", "başka bir adayla ilerleme kararı aldık".
+        - 'pending': Başvuru beklemeye alındı, "havuzumuza ekledik", "on hold", "keep your CV on file".
+        - 'reviewing': Başvuru aktif olarak inceleniyor, "değerlendirme aşamasındadır", "under review", "shortlisted".
+        - 'received': Sadece başvurunun alındığına dair otomatik onay, "application received", "thank you for applying".
+
+        === 3. BİLGİLER ===
+        - `company_name`: Konu, metnin başı, imza veya gönderen domain'inden; "A.Ş.", "Ltd.", "Holding" eklerini temizle.
+        - `position`: Unvanı kısaltmadan TAMAMEN al ("Software Engineer", "Ürün Yöneticisi").
+        - `location`: Şehir/ülke veya "Remote", "Hybrid"; birden fazla ise ilkini al.
+        - `application_source`: Gönderen adresinden; linkedin.com → "LinkedIn", indeed.com → "Indeed", kariyer.net → "Kariyer.net", değilse şirket adı, emin değilsen "Direct Application".
+        - Bir bilgiyi kesin olarak bulamazsan tahmin yürütme, "Bilinmiyor" yaz.
+    """
+
+    def __init__(self, cache_ttl=None, use_templates=None):
+        """
+        Gemini AI servisini başlat
+
+        Args:
+            cache_ttl: Sonuç cache'inin geçerlilik süresi (dakika); 0 cache'i kapatır.
+                Verilmezse GEMINI_CACHE_TTL kullanılır.
+            use_templates: Öğrenilmiş e-posta şablonları kullanılsın mı.
+                Verilmezse EMAIL_TEMPLATES_ENABLED kullanılır.
+        """
         try:
             genai.configure(api_key=settings.GEMINI_API_KEY)
 
             # Gemini 2.0 Flash Exp modelini kullan (main.py'deki gibi)
             self.model = genai.GenerativeModel(
-                model_name="gemini-2.0-flash-exp",
+                model_name=self.MODEL_NAME,
                 generation_config={
                     "temperature": 0.1,
                     "top_p": 0.8,
@@ -30,11 +150,140 @@ class GeminiService:
                     "response_mime_type": "application/json",  # JSON formatı zorla
                 }
             )
+            # Son is_job_application_email çağrısı hata ile mi sonuçlandı (kesin karar değil)
+            self.last_detection_failed = False
+
+            # Aynı API anahtarını kullanan tüm servisler RPM/TPM kotasını paylaşır
+            self.rate_limiter = get_rate_limiter(
+                settings.GEMINI_API_KEY,
+                rpm=getattr(settings, 'GEMINI_RPM', 10),
+                tpm=getattr(settings, 'GEMINI_TPM', 1000000)
+            )
+            self.max_retries = getattr(settings, 'GEMINI_MAX_RETRIES', 5)
+
+            # 'separate': tespit + durum + bilgi çıkarma için üç ayrı çağrı, 'unified': tek çağrı
+            self.analysis_mode = getattr(settings, 'GEMINI_ANALYSIS_MODE', 'separate')
+            self.usage = {
+                'calls': 0, 'prompt_tokens': 0, 'output_tokens': 0, 'cache_hits': 0,
+                'template_lookups': 0, 'template_hits': 0,
+            }
+            self.cache_ttl = cache_ttl if cache_ttl is not None else settings.GEMINI_CACHE_TTL
+            self.use_templates = (
+                use_templates if use_templates is not None else getattr(settings, 'EMAIL_TEMPLATES_ENABLED', True)
+            )
             logger.info("Gemini servisi başarıyla başlatıldı")
         except Exception as e:
             logger.error(f"Gemini servisi başlatılırken hata: {str(e)}")
             raise
 
+    def _generate(self, prompt: str, generation_config=None):
+        """
+        Modeli hız sınırlayıcı üzerinden çağırır, kota hatalarında geri çekilip tekrar dener.
+
+        Args:
+            prompt: Model girdisi
+            generation_config: İsteğe özel üretim ayarları
+
+        Returns:
+            Modelin yanıtı
+        """
+        max_output_tokens = getattr(generation_config, 'max_output_tokens', None) or 1024
+        # Kaba tahmin: ~4 karakter = 1 token
+        estimated_tokens = len(prompt) // 4 + max_output_tokens
+
+        def request():
+            if generation_config is None:
+                return self.model.generate_content(prompt)
+            return self.model.generate_content(prompt, generation_config=generation_config)
+
+        response = generate_with_backoff(request, self.rate_limiter, estimated_tokens, self.max_retries)
+
+        usage = getattr(response, 'usage_metadata', None)
+        self.rate_limiter.settle(estimated_tokens, getattr(usage, 'total_token_count', 0))
+
+        self.usage['calls'] += 1
+        self.usage['prompt_tokens'] += getattr(usage, 'prompt_token_count', 0) or 0
+        self.usage['output_tokens'] += getattr(usage, 'candidates_token_count', 0) or 0
+        return response
+
+    def _cache_get(self, kind: str, subject: str, body: str, sender_email: str):
+        """
+        Kalıcı cache'ten önceki model sonucunu getirir.
+
+        Returns:
+            Cache'lenmiş sonuç, yoksa/süresi dolmuşsa veya cache kapalıysa None
+        """
+        if not self.cache_ttl:
+            return None
+
+        try:
+            key = GeminiResultCache.make_key(kind, self.MODEL_NAME, self.PROMPT_VERSION, subject, body, sender_email)
+            result = GeminiResultCache.lookup(key, self.cache_ttl)
+        except Exception as e:
+            logger.warning(f"Gemini cache okuma hatası: {str(e)}")
+            return None
+
+        if result is not None:
+            self.usage['cache_hits'] += 1
+            logger.info(f"Gemini cache isabeti ({kind}): {subject[:50]}...")
+        return result
+
+    def _cache_set(self, kind: str, subject: str, body: str, sender_email: str, result) -> None:
+        """Başarılı model sonucunu kalıcı cache'e yazar (hata analizi bozmaz)"""
+        if not self.cache_ttl:
+            return
+
+        try:
+            key = GeminiResultCache.make_key(kind, self.MODEL_NAME, self.PROMPT_VERSION, subject, body, sender_email)
+            GeminiResultCache.store(key, kind, self.MODEL_NAME, result)
+        except Exception as e:
+            logger.warning(f"Gemini cache yazma hatası: {str(e)}")
+
+    def _resolve_from_template(self, subject: str, body: str, sender_email: str) -> Optional[Dict[str, Any]]:
+        """
+        E-posta öğrenilmiş bir şablona uyuyorsa iş bilgisini model çağırmadan çıkarır.
+
+        Returns:
+            Optional[Dict]: Şablondan çıkarılan iş bilgisi, uyan şablon yoksa None
+        """
+        if not self.use_templates:
+            return None
+
+        self.usage['template_lookups'] += 1
+        try:
+            matched = match_template(EmailTemplate.for_sender(sender_email), subject, body)
+            if matched is None:
+                return None
+
+            template, values = matched
+            template.record_hit()
+        except Exception as e:
+            logger.warning(f"Şablon eşleştirme hatası: {str(e)}")
+            return None
+
+        self.usage['template_hits'] += 1
+        job_info = self._validate_and_complete_job_info({**values, 'application_source': template.application_source})
+        job_info['status'] = template.status
+        job_info = self._post_process_linkedin_info(job_info, subject, body, sender_email)
+
+        logger.info(
+            f"İş bilgisi şablondan çıkarıldı: {job_info['company_name']} - {job_info['position']} - Durum: {job_info['status']}")
+        return job_info
+
+    def _learn_template(self, subject: str, body: str, sender_email: str, job_info: Dict[str, Any]) -> None:
+        """Modelin etiketlediği e-postadan şablon öğrenir (hata analizi bozmaz)"""
+        if not self.use_templates:
+            return
+
+        try:
+            template = EmailTemplate.learn(sender_email, subject, body, job_info)
+        except Exception as e:
+            logger.warning(f"Şablon öğrenme hatası: {str(e)}")
+            return
+
+        if template:
+            logger.info(f"Yeni e-posta şablonu öğrenildi ({sender_email}): {template.subject_pattern[:80]}")
+
     def _is_notification_email(self, sender_email: str, subject: str, body: str) -> bool:
         """
         E-postanın bildirim/alert maili olup olmadığını kontrol eder.
@@ -47,46 +296,18 @@ class GeminiService:
         Returns:
             bool: True ise bildirim maili (atlanmalı), False ise devam edilmeli
         """
-        # Bildirim gönderen adresleri
-        notification_senders = {
-            'jobalerts-noreply@linkedin.com',
-            'alert@indeed.com',
-            'noreply@glassdoor.com',
-            'alerts@monster.com',
-            'noreply@kariyer.net',
-            'bildirim@secretcv.com',
-            'notification@yenibiris.com',
-            'aday@e.kariyer.net'
-        }
-
         # Gönderen adres kontrolü
-        if sender_email.lower() in notification_senders:
+        if sender_email.lower() in self.NOTIFICATION_SENDERS:
             logger.info(f"Bildirim adresi tespit edildi, mail atlanıyor: {sender_email}")
             return True
 
-        # Konu ve içerik bazlı bildirim tespiti
-        notification_keywords = {
-            # Türkçe bildirim anahtar kelimeleri
-            'yeni iş ilanı', 'iş ilanı yayınlandı', 'size uygun iş',
-            'iş fırsatları', 'günlük iş özeti', 'haftalık özet',
-            'iş aramanız için', 'aradığınız iş', 'kariyer fırsatları',
-            'iş bildirimi', 'iş uyarısı', 'size özel iş','yeni başvuru güncellemeleri',
-            'başvurularınızın durumunu'
-
-            # İngilizce bildirim anahtar kelimeleri
-            'new job alert', 'job recommendations', 'daily job digest',
-            'weekly job summary', 'job opportunities for you',
-            'recommended jobs', 'job notifications', 'jobs you might like',
-            'job search alert', 'career opportunities', 'job posting alert'
-        }
-
         combined_text = f"{subject} {body}".lower()
 
         # Bildirim anahtar kelimesi kontrolü
-        for keyword in notification_keywords:
-            if keyword in combined_text:
-                logger.info(f"Bildirim içeriği tespit edildi, mail atlanıyor: {keyword}")
-                return True
+        keyword = self.NOTIFICATION_MATCHER.search(combined_text)
+        if keyword:
+            logger.info(f"Bildirim içeriği tespit edildi, mail atlanıyor: {keyword}")
+            return True
 
         return False
 
@@ -102,45 +323,13 @@ class GeminiService:
         Returns:
             bool: True ise iş başvuru göstergeleri var, False ise yok
         """
-        # Güçlü iş başvuru göstergeleri
-        strong_indicators = {
-            # Türkçe göstergeler
-            'başvurunuz', 'başvuru', 'mülakat', 'görüşme', 'pozisyon',
-            'iş başvurusu', 'cv', 'özgeçmiş', 'kariyer', 'insan kaynakları',
-            'hr', 'işe alım', 'değerlendirme', 'aday', 'başvuru durumu',
-            'işe başlama', 'teklif', 'kabul', 'red', 'maalesef',
-            'tebrikler', 'seçildiniz', 'işe alındınız',
-            'ön görüşme', 'ikinci görüşme', 'telefon görüşmesi',
-            'online görüşme', 'video mülakat', 'yüz yüze görüşme',
-            'işe alım süreci', 'aday değerlendirme', 'referans kontrolü',
-            'iş başlangıcı', 'deneme süresi', 'iş sözleşmesi',
-            'çalışma şartları', 'ücret teklifi', 'iş teklif mektubu',
-            'iş onayı', 'iş daveti', 'işe giriş tarihi', 'iş teklifi kabulü',
-            'iş teklifi reddi',
-
-            # İngilizce göstergeler
-            'application', 'interview', 'position', 'job application',
-            'resume', 'cv', 'career', 'human resources', 'hiring',
-            'evaluation', 'candidate', 'application status', 'employment',
-            'offer', 'accepted', 'rejected', 'unfortunately',
-            'congratulations', 'selected', 'hired', 'recruiting',
-            'talent', 'opportunity', 'role',
-            'screening', 'shortlisted', 'assessment', 'test task',
-            'reference check', 'background check', 'job start',
-            'trial period', 'employment contract', 'job offer letter',
-            'salary offer', 'work conditions', 'start date',
-            'onboarding', 'phone interview', 'video interview',
-            'final interview', 'job confirmation', 'offer acceptance',
-            'offer rejection'
-        }
-
         combined_text = f"{subject} {body}".lower()
 
         # En az bir güçlü gösterge olmalı
-        indicator_count = sum(1 for indicator in strong_indicators if indicator in combined_text)
+        indicator = self.JOB_INDICATOR_MATCHER.search(combined_text)
 
         # Eğer hiç gösterge yoksa, muhtemelen iş başvurusu değildir
-        if indicator_count == 0:
+        if indicator is None:
             logger.info(f"İş başvuru göstergesi bulunamadı: {subject[:30]}...")
             return False
 
@@ -150,14 +339,43 @@ class GeminiService:
             return False
 
         # Test/deneme içeriklerini filtrele
-        test_patterns = ['deneme', 'test', 'demo', 'asdf', 'qwerty', 'dedede']
-        if any(pattern in combined_text for pattern in test_patterns):
+        if self.TEST_PATTERN_MATCHER.search(combined_text):
             logger.info(f"Test içeriği tespit edildi: {subject}")
             return False
 
-        logger.info(f"İş başvuru göstergeleri bulundu ({indicator_count} adet)")
+        logger.info(f"İş başvuru göstergesi bulundu: {indicator}")
         return True
 
+    @classmethod
+    def is_rejected_by_metadata(cls, sender: str, subject: str) -> bool:
+        """
+        Sadece gönderen ve konuya bakarak, içerik indirilmeden elenebilecek mailleri tespit eder.
+
+        is_job_application_email'deki kural tabanlı filtrelerin konu ile kesinleşen
+        kısmını uygular: bildirim göndereni, konuda bildirim anahtar kelimesi, çok kısa
+        konu veya konuda test kalıbı. Bu durumlarda içerik ne olursa olsun sonuç False olur.
+
+        Args:
+            sender: Gönderen bilgisi (From header'ı)
+            subject: E-posta konusu
+
+        Returns:
+            bool: True ise mail kesin olarak iş başvurusu değil (atlanmalı)
+        """
+        sender_email = cls._extract_email_from_sender(sender)
+        subject_lower = subject.lower()
+
+        if sender_email in cls.NOTIFICATION_SENDERS:
+            return True
+
+        if cls.NOTIFICATION_MATCHER.search(subject_lower):
+            return True
+
+        if len(subject.strip()) < 3:
+            return True
+
+        return cls.TEST_PATTERN_MATCHER.search(subject_lower) is not None
+
     def _is_valid_job_sender(self, sender_email: str) -> bool:
         """
         E-posta adresinin geçerli iş başvuru kaynağı olup olmadığını kontrol eder.
@@ -168,40 +386,14 @@ class GeminiService:
         Returns:
             bool: True ise geçerli kaynak, False ise değil
         """
-        # Geçerli iş başvuru gönderen adresleri
-        valid_job_senders = {
-            'jobs-noreply@linkedin.com',
-            'indeedapply@indeed.com',
-            'noreply@glassdoor.com',
-            'careers@monster.com'
-        }
-
-        # Şirket domain'lerinden gelen mailler için pattern
-        company_patterns = [
-            r'.*@.*\.com',
-            r'.*careers@.*',
-            r'.*hr@.*',
-            r'.*hiring@.*',
-            r'.*jobs@.*',
-            r'.*recruitment@.*',
-            r'.*talent@.*',
-            r'.*@peoplise\.com',
-            r'.*@.*inside-pmi\.com',
-            r'^noreply@.*'
-        ]
-
         sender_lower = sender_email.lower()
 
         # Bilinen geçerli adresler
-        if sender_lower in valid_job_senders:
+        if sender_lower in self.VALID_JOB_SENDERS:
             return True
 
-        # Şirket pattern kontrolü
-        for pattern in company_patterns:
-            if re.match(pattern, sender_lower):
-                return True
-
-        return False
+        # Şirket domain'lerinden gelen mailler için pattern kontrolü
+        return patterns.JOB_SENDER_RE.match(sender_lower) is not None
 
     def is_job_application_email(self, subject: str, body: str, sender: str) -> bool:
         """
@@ -215,30 +407,25 @@ class GeminiService:
         Returns:
             bool: True ise iş başvuru maili, False ise değil
         """
+        self.last_detection_failed = False
+
         try:
             # Sender e-mail adresini çıkar
             sender_email = self._extract_email_from_sender(sender)
 
-            # 1. Bildirim maili kontrolü (öncelikli)
-            if self._is_notification_email(sender_email, subject, body):
-                logger.info(f"Bildirim maili tespit edildi, atlanıyor: {sender_email}")
-                return False
-
-            # 2. İş başvuru göstergelerini kontrol et (yeni eklenen)
-            if not self._has_job_application_indicators(subject, body, sender_email):
-                logger.info(f"İş başvuru göstergesi yok, atlanıyor: {subject[:30]}...")
-                return False
+            # 1-3. Kural tabanlı kontroller
+            rule_result = self._apply_rule_filters(subject, body, sender_email)
+            if rule_result is not None:
+                return rule_result
 
-            # 3. Geçerli kaynak kontrolü (isteğe bağlı - çok kısıtlayıcı olmamak için)
-            # Belirli kaynaklardan geliyorsa doğrudan kabul et
-            if sender_email in ['jobs-noreply@linkedin.com', 'indeedapply@indeed.com']:
-                logger.info(f"Geçerli iş başvuru kaynağı: {sender_email}")
-                return True
+            cached = self._cache_get('detection', subject, body, sender_email)
+            if cached is not None:
+                return cached
 
             # 4. Gemini AI ile akıllı analiz
             prompt = self._create_job_detection_prompt(subject, body, sender_email)
 
-            response = self.model.generate_content(
+            response = self._generate(
                 prompt,
                 generation_config=genai.GenerationConfig(
                     temperature=0.05,  # Daha düşük sıcaklık - daha tutarlı sonuçlar
@@ -257,13 +444,216 @@ class GeminiService:
             else:
                 logger.info(f"İş başvuru maili değil: {subject[:50]}...")
 
+            self._cache_set('detection', subject, body, sender_email, is_job_email)
             return is_job_email
 
         except Exception as e:
             logger.error(f"İş başvuru tespiti hatası: {str(e)}")
             # Hata durumunda False döndür (güvenlik için)
+            self.last_detection_failed = True
+            return False
+
+    def _apply_rule_filters(self, subject: str, body: str, sender_email: str) -> Optional[bool]:
+        """
+        Gemini'ye gitmeden önceki kural tabanlı kontroller.
+
+        Returns:
+            Optional[bool]: False ise kesin iş başvurusu değil, True ise güvenilir kaynak,
+            None ise karar modele bırakılmalı
+        """
+        # 1. Bildirim maili kontrolü (öncelikli)
+        if self._is_notification_email(sender_email, subject, body):
+            logger.info(f"Bildirim maili tespit edildi, atlanıyor: {sender_email}")
+            return False
+
+        # 2. İş başvuru göstergelerini kontrol et (yeni eklenen)
+        if not self._has_job_application_indicators(subject, body, sender_email):
+            logger.info(f"İş başvuru göstergesi yok, atlanıyor: {subject[:30]}...")
             return False
 
+        # 3. Geçerli kaynak kontrolü (isteğe bağlı - çok kısıtlayıcı olmamak için)
+        # Belirli kaynaklardan geliyorsa doğrudan kabul et
+        if sender_email in ['jobs-noreply@linkedin.com', 'indeedapply@indeed.com']:
+            logger.info(f"Geçerli iş başvuru kaynağı: {sender_email}")
+            return True
+
+        return None
+
+    def analyze_email(self, subject: str, body: str, sender: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        E-postanın iş başvurusu olup olmadığını belirler, öyleyse bilgilerini çıkarır.
+
+        analysis_mode 'separate' ise is_job_application_email ve extract_job_info kullanılır;
+        diğer modlarda ('unified', 'batch') tespit, durum ve bilgi çıkarma tek model çağrısında yapılır.
+        Öğrenilmiş bir şablona (EmailTemplate) uyan e-postalar model çağrılmadan çözülür.
+
+        Args:
+            subject: E-posta konusu
+            body: E-posta içeriği
+            sender: Gönderen bilgisi
+
+        Returns:
+            Tuple[bool, Optional[Dict]]: (iş başvurusu mu, iş bilgisi veya None)
+        """
+        self.last_detection_failed = False
+        sender_email = self._extract_email_from_sender(sender)
+
+        rule_result = self._apply_rule_filters(subject, body, sender_email)
+        if rule_result is False:
+            return False, None
+
+        job_info = self._resolve_from_template(subject, body, sender_email)
+        if job_info is not None:
+            return True, job_info
+
+        if self.analysis_mode == 'separate':
+            if not self.is_job_application_email(subject, body, sender):
+                return False, None
+            job_info = self.extract_job_info(subject, body, sender)
+            self._learn_template(subject, body, sender_email, job_info)
+            return True, job_info
+
+        return self._analyze_unified(subject, body, sender_email, rule_result)
+
+    def _analyze_unified(self, subject: str, body: str, sender_email: str,
+                         rule_result: Optional[bool]) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Kural filtreleri ve şablon aramasından geçmiş tek bir e-postayı tek model çağrısıyla analiz eder.
+
+        Hata durumunda last_detection_failed işaretlenir.
+        """
+        self.last_detection_failed = False
+        result = self._cache_get('analysis', subject, body, sender_email)
+        try:
+            if result is None:
+                prompt = self._create_unified_analysis_prompt(subject, body, sender_email)
+                response = self._generate(prompt)
+                result = json.loads(self._clean_json_response(response.text.strip()))
+                self._cache_set('analysis', subject, body, sender_email, result)
+        except Exception as e:
+            logger.error(f"Birleşik analiz hatası: {str(e)}")
+            self.last_detection_failed = True
+            if rule_result:
+                return True, self._create_default_job_info(subject, body, sender_email)
+            return False, None
+
+        is_job_email, job_info = self._build_analysis_result(result, rule_result, subject, body, sender_email)
+        if is_job_email:
+            self._learn_template(subject, body, sender_email, job_info)
+        return is_job_email, job_info
+
+    def analyze_batch(self, items) -> Dict[str, Tuple[bool, Optional[Dict[str, Any]], bool]]:
+        """
+        Birden fazla e-postayı tek prompt ile analiz eder (batch modu).
+
+        Kural tabanlı filtrelerden geçen e-postalar tek istekte gönderilir, model
+        mesaj ID'sine göre anahtarlanmış bir JSON dizisi döndürür. Yanıtta eksik veya
+        bozuk olan e-postalar tek tek (yalnızca model çağrısıyla) yeniden analiz edilir.
+
+        Args:
+            items: (message_id, subject, body, sender) demetleri
+
+        Returns:
+            Dict: message_id -> (iş başvurusu mu, iş bilgisi veya None, tespit hatalı mı)
+        """
+        results = {}
+        candidates = []
+
+        for message_id, subject, body, sender in items:
+            sender_email = self._extract_email_from_sender(sender)
+            rule_result = self._apply_rule_filters(subject, body, sender_email)
+            if rule_result is False:
+                results[message_id] = (False, None, False)
+                continue
+
+            job_info = self._resolve_from_template(subject, body, sender_email)
+            if job_info is not None:
+                results[message_id] = (True, job_info, False)
+                continue
+
+            # Birleşik analizle aynı yanıt formatı olduğu için cache kayıtları ortaktır
+            cached = self._cache_get('analysis', subject, body, sender_email)
+            if cached is not None:
+                results[message_id] = (*self._build_analysis_result(cached, rule_result, subject, body, sender_email), False)
+            else:
+                candidates.append((message_id, subject, body, sender, sender_email, rule_result))
+
+        parsed = {}
+        if len(candidates) > 1:
+            try:
+                prompt = self._create_batch_analysis_prompt(candidates)
+                response = self._generate(
+                    prompt,
+                    generation_config=genai.GenerationConfig(max_output_tokens=150 * len(candidates) + 100)
+                )
+                parsed = self._parse_batch_response(response.text)
+            except Exception as e:
+                logger.warning(f"Batch analiz hatası, e-postalar tek tek analiz edilecek: {str(e)}")
+
+            logger.info(f"Batch analiz: {len(parsed)}/{len(candidates)} e-posta yanıtlandı")
+
+        for message_id, subject, body, sender, sender_email, rule_result in candidates:
+            result = parsed.get(str(message_id))
+
+            if result is None:
+                # Yanıtta olmayan e-posta için tekli çağrıya dön (kurallar ve şablon zaten uygulandı)
+                is_job_email, job_info = self._analyze_unified(subject, body, sender_email, rule_result)
+                results[message_id] = (is_job_email, job_info, self.last_detection_failed)
+            else:
+                self._cache_set('analysis', subject, body, sender_email, result)
+                is_job_email, job_info = self._build_analysis_result(result, rule_result, subject, body, sender_email)
+                if is_job_email:
+                    self._learn_template(subject, body, sender_email, job_info)
+                results[message_id] = (is_job_email, job_info, False)
+
+        return results
+
+    def _parse_batch_response(self, response_text: str) -> Dict[str, Dict[str, Any]]:
+        """Batch yanıtındaki JSON dizisini mesaj ID'sine göre sözlüğe çevirir"""
+        response = patterns.JSON_FENCE_START_RE.sub('', response_text.strip())
+        response = patterns.JSON_FENCE_END_RE.sub('', response.strip())
+
+        # İlk [ ile son ] arasını al
+        first_bracket = response.find('[')
+        last_bracket = response.rfind(']')
+        if first_bracket != -1 and last_bracket > first_bracket:
+            response = response[first_bracket:last_bracket + 1]
+
+        entries = json.loads(response)
+        if isinstance(entries, dict):
+            entries = next((value for value in entries.values() if isinstance(value, list)), [])
+
+        return {
+            str(entry['id']): entry
+            for entry in entries
+            if isinstance(entry, dict) and entry.get('id') is not None
+        }
+
+    def _build_analysis_result(self, result: Dict[str, Any], rule_result: Optional[bool], subject: str,
+                               body: str, sender_email: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """Birleşik/batch yanıtındaki tek bir e-postanın sonucunu doğrulayıp iş bilgisine çevirir"""
+        is_job_email = rule_result or str(result.get('is_job', '')).strip().lower() in ['true', 'yes', 'evet', '1', 'job']
+        if not is_job_email:
+            logger.info(f"İş başvuru maili değil: {subject[:50]}...")
+            return False, None
+
+        status = str(result.get('status', '')).strip().lower()
+        if status not in self.CLASSIFICATION_STATUSES:
+            logger.warning(f"Geçersiz durum tespiti: '{status}'. Varsayılan 'received' kullanılacak.")
+            status = 'received'
+
+        job_info = {
+            key: str(result[key]) if result.get(key) is not None else ''
+            for key in ('company_name', 'position', 'location', 'application_source')
+        }
+        job_info = self._validate_and_complete_job_info(job_info)
+        job_info['status'] = status
+        job_info = self._post_process_linkedin_info(job_info, subject, body, sender_email)
+
+        logger.info(
+            f"İş bilgisi tek çağrıda çıkarıldı: {job_info['company_name']} - {job_info['position']} - Durum: {status}")
+        return True, job_info
+
     # BU YENİ FONKSİYONU SINIFINIZA EKLEYİN
     def classify_email_status(self, subject: str, body: str) -> str:
         """
@@ -277,9 +667,13 @@ class GeminiService:
             str: Sınıflandırılmış durum ('received', 'interview', 'rejected', 'offer', 'reviewing')
         """
         try:
+            cached = self._cache_get('status', subject, body, '')
+            if cached is not None:
+                return cached
+
             prompt = self._create_status_classification_prompt(subject, body)
 
-            response = self.model.generate_content(
+            response = self._generate(
                 prompt,
                 generation_config=genai.GenerationConfig(
                     temperature=0.0,  # Durum tespiti için netlik önemli
@@ -291,10 +685,9 @@ class GeminiService:
             status = response.text.strip().lower()
 
             # Olası bir hataya karşı geçerli durumlar listesi
-            valid_statuses = ['received', 'reviewing', 'interview', 'offer', 'rejected']
-
-            if status in valid_statuses:
+            if status in self.CLASSIFICATION_STATUSES:
                 logger.info(f"E-posta durumu başarıyla sınıflandırıldı: {status}")
+                self._cache_set('status', subject, body, '', status)
                 return status
             else:
                 logger.warning(f"Geçersiz durum tespiti: '{status}'. Varsayılan 'received' kullanılacak.")
@@ -356,6 +749,10 @@ class GeminiService:
         try:
             sender_email = self._extract_email_from_sender(sender)
 
+            cached = self._cache_get('extraction', subject, body, sender_email)
+            if cached is not None:
+                return cached
+
             # ADIM 1: Önce e-postanın durumunu yeni fonksiyonla sınıflandır.
             status = self.classify_email_status(subject, body)
 
@@ -363,7 +760,7 @@ class GeminiService:
             prompt = self._create_job_extraction_prompt(subject, body, sender_email, status)
 
             # API çağrısı
-            response = self.model.generate_content(prompt)
+            response = self._generate(prompt)
             result_text = response.text.strip()
 
             logger.info(f"Gemini ham yanıtı: {result_text[:200]}...")
@@ -387,6 +784,7 @@ class GeminiService:
 
                 logger.info(
                     f"İş bilgisi başarıyla çıkarıldı: {job_info['company_name']} - {job_info['position']} - Durum: {job_info['status']}")
+                self._cache_set('extraction', subject, body, sender_email, job_info)
                 return job_info
 
             except json.JSONDecodeError as e:
@@ -401,7 +799,7 @@ class GeminiService:
             default_info['status'] = 'received'  # Genel hata durumunda en güvenli varsayılan
             return default_info
 
-    def create_job_detection_prompt(self, subject: str, body: str, sender_email: str) -> str:
+    def _create_job_detection_prompt(self, subject: str, body: str, sender_email: str) -> str:
         """Geliştirilmiş iş başvuru tespiti için prompt oluşturur"""
         return f"""
                         Sen bir e-posta analiz uzmanısın. Temel görevin, bu e-postanın bir kişinin yaptığı GERÇEK bir iş başvuru sürecinin parçası mı, yoksa genel bir bildirim/reklam/pazarlama e-postası mı olduğunu belirlemek.
@@ -497,11 +895,69 @@ class GeminiService:
         }}
         """
 
+    def _create_unified_analysis_prompt(self, subject: str, body: str, sender_email: str) -> str:
+        """Tespit, durum sınıflandırma ve bilgi çıkarmayı tek çağrıda yapan prompt"""
+        return f"""
+        Sen bir iş başvurusu analiz uzmanısın. Aşağıdaki e-postayı tek seferde analiz et: önce bir kişinin yaptığı GERÇEK bir iş başvuru sürecinin parçası olup olmadığını belirle, öyleyse durumunu sınıflandır ve temel iş bilgilerini çıkar.
+
+        === E-POSTA BİLGİLERİ ===
+        Gönderen: {sender_email}
+        Konu: {subject}
+        İçerik: {body[:1500]}
+
+{self.UNIFIED_ANALYSIS_RULES}
+        === ÇIKTI ===
+        SADECE aşağıdaki JSON'u döndür, hiçbir ek açıklama ekleme. `is_job` false ise diğer alanları "Bilinmiyor" bırak.
+
+        {{
+            "is_job": true,
+            "status": "received | reviewing | interview | offer | rejected | pending",
+            "company_name": "çıkarılan_şirket_adı",
+            "position": "çıkarılan_tam_pozisyon_adı",
+            "location": "çıkarılan_konum_bilgisi",
+            "application_source": "çıkarılan_başvuru_kaynağı"
+        }}
+        """
+
+    def _create_batch_analysis_prompt(self, candidates) -> str:
+        """Birden fazla e-postayı tek seferde analiz eden, mesaj ID'sine göre JSON dizisi isteyen prompt"""
+        email_blocks = "\n".join(
+            f"""
+        === E-POSTA (id: {message_id}) ===
+        Gönderen: {sender_email}
+        Konu: {subject}
+        İçerik: {body[:1500]}
+        """
+            for message_id, subject, body, sender, sender_email, rule_result in candidates
+        )
+
+        return f"""
+        Sen bir iş başvurusu analiz uzmanısın. Aşağıdaki {len(candidates)} e-postanın HER BİRİNİ ayrı ayrı analiz et: bir kişinin yaptığı GERÇEK bir iş başvuru sürecinin parçası olup olmadığını belirle, öyleyse durumunu sınıflandır ve temel iş bilgilerini çıkar.
+{self.UNIFIED_ANALYSIS_RULES}
+        === E-POSTALAR ===
+        {email_blocks}
+
+        === ÇIKTI ===
+        SADECE aşağıdaki formatta bir JSON dizisi döndür, hiçbir ek açıklama ekleme. Her e-posta için bir eleman olmalı ve `id` alanı e-postanın id değeriyle AYNEN eşleşmeli. `is_job` false ise diğer alanları "Bilinmiyor" bırak.
+
+        [
+            {{
+                "id": "e-posta_id",
+                "is_job": true,
+                "status": "received | reviewing | interview | offer | rejected | pending",
+                "company_name": "çıkarılan_şirket_adı",
+                "position": "çıkarılan_tam_pozisyon_adı",
+                "location": "çıkarılan_konum_bilgisi",
+                "application_source": "çıkarılan_başvuru_kaynağı"
+            }}
+        ]
+        """
+
     def _clean_json_response(self, response: str) -> str:
         """Gemini response'unu temizle (main.py'den)"""
         # ```json bloklarını kaldır
-        response = re.sub(r'^```json\s*', '', response.strip(), flags=re.MULTILINE)
-        response = re.sub(r'\s*```$', '', response.strip(), flags=re.MULTILINE)
+        response = patterns.JSON_FENCE_START_RE.sub('', response.strip())
+        response = patterns.JSON_FENCE_END_RE.sub('', response.strip())
 
         # İlk { ile son } arasını al
         first_brace = response.find('{')
@@ -522,13 +978,8 @@ class GeminiService:
         if not job_info.get('position') or job_info.get('position') == 'Bilinmiyor':
 
             # Konu başlığından pozisyon çıkarma
-            subject_position_patterns = [
-                r'(.+?)\s+başvurunuz',  # "Data Scientist başvurunuz"
-                r'şirketindeki\s+(.+?)\s+başvurunuz',  # "şirketindeki AI Engineer başvurunuz"
-            ]
-
-            for pattern in subject_position_patterns:
-                match = re.search(pattern, subject, re.IGNORECASE)
+            for pattern in patterns.LINKEDIN_SUBJECT_POSITION_RES:
+                match = pattern.search(subject)
                 if match:
                     position_candidate = match.group(1).strip()
                     if self._is_valid_position(position_candidate):
@@ -548,13 +999,8 @@ class GeminiService:
 
         # Eğer LLM şirket bulamadıysa, kendi analiz et
         if not job_info.get('company_name') or job_info.get('company_name') == 'Bilinmiyor':
-            linkedin_subject_patterns = [
-                r'başvurunuz\s+(.+?)\s+şirketine',  # "başvurunuz Chippin şirketine"
-                r'(.+?)\s+şirketindeki',  # "Robopine şirketindeki"
-            ]
-
-            for pattern in linkedin_subject_patterns:
-                match = re.search(pattern, subject, re.IGNORECASE)
+            for pattern in patterns.LINKEDIN_SUBJECT_COMPANY_RES:
+                match = pattern.search(subject)
                 if match:
                     company_raw = match.group(1).strip()
                     company_clean = self._clean_company_name(company_raw)
@@ -641,21 +1087,16 @@ class GeminiService:
         position = position_raw.strip()
 
         # Özel düzeltmeler
-        position = re.sub(r'\(Al\)', '(AI)', position)  # (Al) → (AI)
-        position = re.sub(r'\bAl\b', 'AI', position)  # Al → AI
+        position = patterns.POSITION_AL_PAREN_RE.sub('(AI)', position)  # (Al) → (AI)
+        position = patterns.POSITION_AL_WORD_RE.sub('AI', position)  # Al → AI
 
         # Gereksiz karakterleri temizle
-        position = re.sub(r'[*\-•→←↑↓]+', '', position).strip()
-        position = re.sub(r'\s+', ' ', position)  # Çoklu boşlukları temizle
+        position = patterns.POSITION_SYMBOLS_RE.sub('', position).strip()
+        position = patterns.WHITESPACE_RE.sub(' ', position)  # Çoklu boşlukları temizle
 
         # Başındaki/sonundaki gereksiz kelimeleri temizle
-        clean_patterns = [
-            r'^(pozisyon|position|role|job|iş)\s*:?\s*',
-            r'\s*(pozisyon|position|role|job|iş)\s*$'
-        ]
-
-        for pattern in clean_patterns:
-            position = re.sub(pattern, '', position, flags=re.IGNORECASE).strip()
+        for pattern in patterns.POSITION_AFFIX_RES:
+            position = pattern.sub('', position).strip()
 
         return position
 
@@ -672,8 +1113,7 @@ class GeminiService:
             company = company.title()
 
         # Gereksiz kelimeleri temizle (sonunda)
-        company = re.sub(r'\s+(şirketi|company|ltd\.?|inc\.?|corp\.?|şti\.?|a\.ş\.?|san\.?tic\.?)$',
-                         '', company, flags=re.IGNORECASE).strip()
+        company = patterns.COMPANY_SUFFIX_RE.sub('', company).strip()
 
         # Platform isimlerini engelle
         platform_names = ['linkedin', 'indeed', 'glassdoor', 'kariyer.net', 'monster']
@@ -739,11 +1179,11 @@ class GeminiService:
 
         return None
 
-    def _extract_email_from_sender(self, sender: str) -> str:
+    @staticmethod
+    def _extract_email_from_sender(sender: str) -> str:
         """Sender stringinden e-posta adresini çıkarır"""
         # E-posta pattern'i ile çıkar
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        match = re.search(email_pattern, sender)
+        match = patterns.EMAIL_ADDRESS_RE.search(sender)
 
         if match:
             return match.group(0).lower()
@@ -797,13 +1237,8 @@ class GeminiService:
             application_source = 'LinkedIn'
 
             # Konu başlığından şirket çıkarma
-            linkedin_patterns = [
-                r'başvurunuz\s+(.+?)\s+şirketine\s+gönderildi',
-                r'başvurunuz\s+(.+?)\s+şirketine',
-            ]
-
-            for pattern in linkedin_patterns:
-                match = re.search(pattern, subject, re.IGNORECASE)
+            for pattern in patterns.LINKEDIN_DEFAULT_COMPANY_RES:
+                match = pattern.search(subject)
                 if match:
                     company_raw = match.group(1).strip()
                     company_clean = self._clean_company_name(company_raw)
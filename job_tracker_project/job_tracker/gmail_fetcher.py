@@ -0,0 +1,313 @@
+import json
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from googleapiclient.errors import HttpError
+
+# Tekrar denenebilir HTTP durum kodları (kota aşımı ve geçici sunucu hataları)
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# Gmail kullanıcı/proje kotası aşımını 429 yerine bu nedenlerle 403 olarak da döndürür
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+
+def is_retryable_error(error):
+    """Hata kota aşımı veya geçici sunucu hatası mı (429/5xx ya da rateLimitExceeded'li 403)"""
+    if not isinstance(error, HttpError):
+        return False
+    if error.resp.status in RETRYABLE_STATUSES:
+        return True
+    if error.resp.status != 403:
+        return False
+
+    try:
+        details = json.loads(error.content).get('error', {}).get('errors', [])
+    except (ValueError, AttributeError):
+        return False
+    return any(isinstance(detail, dict) and detail.get('reason') in RATE_LIMIT_REASONS for detail in details)
+
+
+class AdaptiveRateLimiter:
+    """
+    429/5xx yanıtlarına göre istekler arası aralığı ayarlayan hız sınırlayıcı.
+
+    Kısıtlama (throttle) geldiğinde aralık katlanarak büyür, başarılı
+    yanıtlarda yavaş yavaş küçülür (AIMD). Tüm thread'ler aynı limiter'ı paylaşır.
+    """
+
+    def __init__(self, min_interval=0.0, max_interval=8.0, backoff_factor=2.0, recovery_factor=0.9):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.recovery_factor = recovery_factor
+        self.interval = min_interval
+        self.throttle_count = 0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Bir sonraki istek slotuna kadar bekle"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def on_success(self):
+        """Başarılı yanıtta aralığı yavaşça küçült"""
+        with self._lock:
+            self.interval = self.interval * self.recovery_factor
+            if self.interval < max(self.min_interval, 0.001):
+                self.interval = self.min_interval
+
+    def on_throttle(self):
+        """429/5xx yanıtında aralığı büyüt"""
+        with self._lock:
+            self.throttle_count += 1
+            self.interval = min(self.max_interval, max(self.interval * self.backoff_factor, 0.05))
+
+
+def execute_with_backoff(request_fn, rate_limiter, max_retries=5):
+    """
+    Gmail API isteğini hız sınırlayıcı üzerinden çalıştır, kota (429/403) ve 5xx hatalarında
+    üstel geri çekilme (exponential backoff + jitter) ile tekrar dene.
+    """
+    for attempt in range(max_retries + 1):
+        rate_limiter.wait()
+        try:
+            result = request_fn()
+            rate_limiter.on_success()
+            return result
+        except HttpError as e:
+            if not is_retryable_error(e) or attempt == max_retries:
+                raise
+            rate_limiter.on_throttle()
+        except (TimeoutError, ConnectionError):
+            if attempt == max_retries:
+                raise
+            rate_limiter.on_throttle()
+
+        time.sleep(min(2 ** attempt, 32) * random.uniform(0.5, 1.0))
+
+
+class BaseMessageFetcher:
+    """Mesaj çekme motorları için ortak istatistikler ve raporlama"""
+
+    # format='metadata' isteklerinde sadece bu header'lar istenir
+    METADATA_HEADERS = ['From', 'Subject', 'Date']
+
+    def __init__(self, message_format='full', rate_limiter=None, max_retries=5):
+        self.message_format = message_format
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.max_retries = max_retries
+
+        # İstatistikler
+        self.fetched_count = 0
+        self.failed_count = 0
+        self.round_trips = 0
+        self.bytes_downloaded = 0
+        self.elapsed = 0.0
+        self._stats_lock = threading.Lock()
+
+    def _count_round_trip(self):
+        with self._stats_lock:
+            self.round_trips += 1
+
+    def _build_request(self, service, message_id):
+        """messages().get isteğini oluştur; yanıt gövdesinin boyutunu sayacak şekilde sar"""
+        params = {'userId': 'me', 'id': message_id, 'format': self.message_format}
+        if self.message_format == 'metadata':
+            params['metadataHeaders'] = self.METADATA_HEADERS
+
+        request = service.users().messages().get(**params)
+        postproc = request.postproc
+
+        def counting_postproc(resp, content):
+            with self._stats_lock:
+                self.bytes_downloaded += len(content or b'')
+            return postproc(resp, content)
+
+        request.postproc = counting_postproc
+        return request
+
+    def fetch(self, message_ids):
+        """(message_id, message) çiftlerini liste sırasıyla üret; hatalı mesajlar için message None"""
+        raise NotImplementedError
+
+    @property
+    def throughput(self):
+        """Saniye başına çekilen mesaj sayısı"""
+        return self.fetched_count / self.elapsed if self.elapsed > 0 else 0.0
+
+    def describe(self):
+        return self.__class__.__name__
+
+    def report(self):
+        """Çekme işleminin özetini yazdır"""
+        print(
+            f"Mail detayları çekildi ({self.message_format}, {self.describe()}): "
+            f"{self.fetched_count} başarılı, {self.failed_count} hatalı, {self.round_trips} HTTP isteği, "
+            f"{self.bytes_downloaded / 1024:.0f} KB, {self.elapsed:.1f} sn, "
+            f"{self.throughput:.1f} mesaj/sn (kısıtlama: {self.rate_limiter.throttle_count})"
+        )
+
+
+class ConcurrentMessageFetcher(BaseMessageFetcher):
+    """
+    Gmail mesaj detaylarını sınırlı eşzamanlılıkla çeken motor.
+
+    Aynı anda en fazla `concurrency` adet messages().get isteği uçuşta olur.
+    googleapiclient servis nesneleri thread-safe olmadığı için her thread
+    `service_factory` ile kendi servisini oluşturur. Sonuçlar liste sırasıyla
+    döndürülür.
+    """
+
+    def __init__(self, service_factory, concurrency=8, message_format='full', rate_limiter=None, max_retries=5):
+        super().__init__(message_format, rate_limiter, max_retries)
+        self.service_factory = service_factory
+        self.concurrency = max(1, concurrency)
+        self._local = threading.local()
+
+    def _get_service(self):
+        """Thread'e özel Gmail servis nesnesini döndür"""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = self.service_factory()
+            self._local.service = service
+        return service
+
+    def fetch_message(self, message_id):
+        """Tek bir mesajı retry/backoff ile çek"""
+        service = self._get_service()
+
+        def request():
+            self._count_round_trip()
+            return self._build_request(service, message_id).execute()
+
+        return execute_with_backoff(request, self.rate_limiter, self.max_retries)
+
+    def fetch(self, message_ids):
+        """
+        Mesajları eşzamanlı çek ve (message_id, message) çiftlerini sırayla üret.
+
+        Bellek kullanımı sınırlı kalsın diye en fazla 2 * concurrency istek
+        önceden kuyruğa alınır.
+        """
+        start = time.monotonic()
+        window = self.concurrency * 2
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='gmail-fetch')
+        pending = deque()
+
+        try:
+            for message_id in message_ids:
+                pending.append((message_id, executor.submit(self.fetch_message, message_id)))
+                if len(pending) >= window:
+                    yield self._collect(*pending.popleft())
+
+            while pending:
+                yield self._collect(*pending.popleft())
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self.elapsed += time.monotonic() - start
+
+    def _collect(self, message_id, future):
+        try:
+            message = future.result()
+            self.fetched_count += 1
+            return message_id, message
+        except Exception as e:
+            self.failed_count += 1
+            print(f"E-posta detay hatası (ID: {message_id}): {str(e)}")
+            return message_id, None
+
+    def describe(self):
+        return f"eşzamanlı, {self.concurrency} istek"
+
+
+class BatchMessageFetcher(BaseMessageFetcher):
+    """
+    messages().get çağrılarını tek bir multipart batch HTTP isteğinde paketler.
+
+    Her batch en fazla `batch_size` (Gmail sınırı: 100) mesaj içerir. Batch içindeki
+    tek bir mesajın hatası tüm batch'i düşürmez: kota/5xx hatası alan mesajlar bir sonraki
+    denemede tekrar gönderilir, diğer hatalar sadece o mesaj için None döner.
+    """
+
+    MAX_BATCH_SIZE = 100
+
+    def __init__(self, service, batch_size=10, message_format='full', rate_limiter=None, max_retries=5):
+        super().__init__(message_format, rate_limiter, max_retries)
+        self.service = service
+        self.batch_size = max(1, min(batch_size, self.MAX_BATCH_SIZE))
+
+    def fetch(self, message_ids):
+        start = time.monotonic()
+        chunk = []
+
+        try:
+            for message_id in message_ids:
+                chunk.append(message_id)
+                if len(chunk) >= self.batch_size:
+                    yield from self._fetch_chunk(chunk)
+                    chunk = []
+
+            if chunk:
+                yield from self._fetch_chunk(chunk)
+        finally:
+            self.elapsed += time.monotonic() - start
+
+    def _fetch_chunk(self, message_ids):
+        """Bir batch'i çalıştır, yanıtları mesaj ID'lerine göre ayır ve sırayla döndür"""
+        results = {}
+        remaining = list(message_ids)
+
+        for attempt in range(self.max_retries + 1):
+            retry_ids = []
+
+            def callback(request_id, response, exception):
+                if exception is None:
+                    results[request_id] = response
+                elif is_retryable_error(exception) and attempt < self.max_retries:
+                    retry_ids.append(request_id)
+                else:
+                    print(f"E-posta detay hatası (ID: {request_id}): {str(exception)}")
+                    results[request_id] = None
+
+            def execute_batch():
+                retry_ids.clear()
+                batch = self.service.new_batch_http_request(callback=callback)
+                for message_id in remaining:
+                    batch.add(self._build_request(self.service, message_id), request_id=message_id)
+                self._count_round_trip()
+                batch.execute()
+
+            try:
+                execute_with_backoff(execute_batch, self.rate_limiter, self.max_retries)
+            except Exception as e:
+                print(f"Batch isteği hatası ({len(remaining)} mesaj): {str(e)}")
+                break
+
+            if not retry_ids:
+                remaining = []
+                break
+
+            # Sadece kısıtlanan mesajları tekrar gönder
+            self.rate_limiter.on_throttle()
+            remaining = list(retry_ids)
+            time.sleep(min(2 ** attempt, 32) * random.uniform(0.5, 1.0))
+
+        for message_id in message_ids:
+            message = results.get(message_id)
+            if message is None:
+                self.failed_count += 1
+            else:
+                self.fetched_count += 1
+            yield message_id, message
+
+    def describe(self):
+        return f"batch, {self.batch_size} mesaj/istek"
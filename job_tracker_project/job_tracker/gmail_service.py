@@ -1,27 +1,114 @@
 import base64
+import codecs
 import email
-import re
+import html
 import csv
-import pandas as pd
+import itertools
+import operator
 from datetime import datetime, timedelta
 from email.mime.text import MIMEText
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 import os
 import json
 from django.conf import settings
-import time
 from .utils import get_system_setting
+from .gemini_service import GeminiService
+from .models import SeenEmail
+from . import patterns
+from .email_record import EmailRecord
+from .html_text import html_chunks_to_text, html_to_text
+from .gmail_fetcher import (
+    AdaptiveRateLimiter, BatchMessageFetcher, ConcurrentMessageFetcher, execute_with_backoff
+)
+
+
+class EmailCsvWriter:
+    """
+    E-postaları geldikçe CSV'ye satır satır yazan yazıcı.
+
+    Tüm listeyi bellekte tutmadan pipeline içinde kullanılabilir; hiç satır
+    yazılmadan kapatılırsa dosya silinir.
+    """
+
+    FIELDNAMES = ['id', 'subject', 'sender', 'sender_email', 'date', 'is_read',
+                  'body_preview', 'body_full', 'body_length']
+
+    def __init__(self, path):
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.row_count = 0
+        self._file = open(path, 'w', newline='', encoding='utf-8-sig')  # utf-8-sig Excel için
+        self._writer = csv.DictWriter(self._file, fieldnames=self.FIELDNAMES)
+        self._writer.writeheader()
+
+    def write(self, email_data):
+        self._writer.writerow({
+            'id': email_data.id,
+            'subject': email_data.subject,
+            'sender': email_data.sender,
+            'sender_email': email_data.sender_email,
+            'date': email_data.date.strftime('%Y-%m-%d %H:%M:%S'),
+            'is_read': email_data.is_read,
+            'body_preview': email_data.body_preview,
+            'body_full': email_data.body[:5000],  # İlk 5000 karakter (Excel limiti için)
+            'body_length': email_data.body_length,
+        })
+        self.row_count += 1
+
+    def tee(self, emails):
+        """E-postaları CSV'ye yazarken aynen bir sonraki aşamaya aktar"""
+        for email_data in emails:
+            self.write(email_data)
+            yield email_data
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        if not self.row_count:
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 class GmailService:
     SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
+    # Gövde parçasından en fazla bu kadar metin çıkarılır; link ve boşluk temizliği sonrası
+    # EmailRecord.BODY_MAX_LENGTH'i doldurmaya yetecek pay bırakılır
+    BODY_TEXT_LIMIT = EmailRecord.BODY_MAX_LENGTH * 2
+
+    # Gövde parçaları base64'ten bu büyüklükte (byte) bloklar halinde çözülür
+    DECODE_CHUNK_BYTES = 16 * 1024
+
+    # CSV'den EmailRecord'a çevrilen sütunlar (body_preview body_full'dan yeniden üretildiği için okunmaz)
+    CSV_RECORD_COLUMNS = ('id', 'subject', 'sender', 'sender_email', 'date', 'is_read', 'body_full')
+
     def __init__(self, user=None):
         self.service = None
+        self.credentials = None
         self.user = user
+        self.fetch_concurrency = getattr(settings, 'GMAIL_FETCH_CONCURRENCY', 8)
+        self.fetch_mode = getattr(settings, 'GMAIL_FETCH_MODE', 'concurrent')
+        self.metadata_prefilter = getattr(settings, 'GMAIL_METADATA_PREFILTER', True)
+        self.last_fetcher = None
+        self.metadata_fetcher = None
+        self.fetch_stats = self._empty_fetch_stats()
+        self.rejected_message_ids = []
+        self.last_listed_count = 0
+
+        # Artımlı senkronizasyon (historyId) durumu
+        self.used_incremental_sync = False
+        self.pending_history_id = None
+        self.rate_limiter = AdaptiveRateLimiter()
         self.authenticate()
 
         # Kullanıcıya özel ayarları al
@@ -93,9 +180,15 @@ class GmailService:
             with open(token_path, 'w') as token:
                 token.write(creds.to_json())
 
-        self.service = build('gmail', 'v1', credentials=creds)
+        self.credentials = creds
+        self.service = self._build_service()
 
-    def get_recent_emails(self, days=None, max_results=None, include_processed=True, save_to_csv=True):
+    def _build_service(self):
+        """Yeni bir Gmail servis nesnesi oluştur (thread başına bir tane gerekir)"""
+        return build('gmail', 'v1', credentials=self.credentials, cache_discovery=False)
+
+    def get_recent_emails(self, days=None, max_results=None, include_processed=True, save_to_csv=True,
+                          incremental=True, skip_known=True):
         """
         Son X günün gelen e-postalarını getir ve CSV'ye kaydet
 
@@ -104,168 +197,460 @@ class GmailService:
             max_results: Maksimum mail sayısı (default: settings'ten)
             include_processed: True ise tüm mailler, False ise sadece okunmamış mailler
             save_to_csv: True ise CSV'ye kaydet
+            incremental: True ise kayıtlı historyId'den sonra gelen mailleri history API ile getir,
+                checkpoint yoksa veya süresi dolmuşsa tarih aralığı taramasına dön
+            skip_known: True ise daha önce işlenmiş/görülmüş mesaj ID'leri detay indirilmeden atlanır
+        """
+        try:
+            message_ids = self.list_message_ids(days, max_results, include_processed, incremental, skip_known)
+
+            # Mail detaylarını çek (önce metadata ön filtresi, sonra sadece adaylar için tam içerik)
+            emails = []
+            processed_count = 0
+
+            for email_data in self.fetch_emails(message_ids, prefilter=self.metadata_prefilter):
+                emails.append(email_data)
+                processed_count += 1
+
+                if processed_count % 50 == 0:  # Her 50 mailde rapor
+                    print(f"İşlenen mail: {processed_count}/{len(message_ids)}")
+
+            self.report_fetch_stats()
+            self.mark_rejected_seen()
+
+            print(f"TOPLAM İŞLENEN MAIL: {len(emails)}")
+
+            # CSV'ye kaydet
+            if save_to_csv and emails:
+                csv_filename = self.save_emails_to_csv(emails)
+                print(f"E-postalar CSV'ye kaydedildi: {csv_filename}")
+                return emails, csv_filename
+
+            return emails, None
+
+        except Exception as e:
+            print(f"Gmail API hatası: {str(e)}")
+            return [], None
+
+    def list_message_ids(self, days=None, max_results=None, include_processed=True, incremental=True,
+                         skip_known=True):
+        """
+        Senkronize edilecek mesaj ID'lerini listele (detay indirmeden).
+
+        Parametreler get_recent_emails ile aynıdır. Sadece ID'ler tutulduğu için
+        50 bin maillik taramada bile liste küçük kalır. Hatalar yukarı iletilir.
         """
         days = days or self.default_days
         max_results = max_results or self.default_max_results
 
-        try:
-            # Tarih filtresi oluştur - sadece gelen kutusundaki mailleri al
-            after_date = datetime.now() - timedelta(days=days)
-            query = f'in:inbox category:primary after:{after_date.strftime("%Y/%m/%d")}'
+        all_messages = None
+        self.used_incremental_sync = False
+        history_id = self.get_history_checkpoint() if incremental else None
+
+        if history_id:
+            print(f"Artımlı senkronizasyon: historyId {history_id} sonrası değişiklikler alınıyor...")
+            all_messages = self._list_history_messages(history_id, max_results, include_processed)
+
+            if all_messages is None:
+                print("historyId checkpoint'inin süresi dolmuş, tarih aralığı taramasına geçiliyor")
+            else:
+                self.used_incremental_sync = True
+
+        if all_messages is None:
+            # Tarama başlamadan önceki historyId bir sonraki artımlı senkronizasyonun başlangıcı olur
+            self.pending_history_id = self._get_current_history_id()
+            all_messages = self._list_window_messages(days, max_results, include_processed)
+
+        self.last_listed_count = len(all_messages)
+
+        # Daha önce işlenmiş (başvuru kaydı olan) veya görülmüş mailleri indirmeden at
+        if skip_known and self.user:
+            all_messages = self._drop_known_messages(all_messages)
+
+        return [m['id'] for m in all_messages]
+
+    def _drop_known_messages(self, messages):
+        """Kullanıcının bilinen mesaj ID'lerini tek sorguyla yükleyip listeden çıkar"""
+        known_ids = SeenEmail.get_known_message_ids(self.user)
+        new_messages = [m for m in messages if m['id'] not in known_ids]
+
+        print(f"Daha önce işlenmiş/görülmüş {len(messages) - len(new_messages)} mail atlandı, "
+              f"{len(new_messages)} yeni mail işlenecek")
+        return new_messages
+
+    def _list_window_messages(self, days, max_results, include_processed):
+        """Tarih aralığındaki gelen kutusu mesajlarını sayfalama ile listele"""
+        # Tarih filtresi oluştur - sadece gelen kutusundaki mailleri al
+        after_date = datetime.now() - timedelta(days=days)
+        query = f'in:inbox category:primary after:{after_date.strftime("%Y/%m/%d")}'
+
+        # include_processed=False ise sadece okunmamış mailleri al
+        if not include_processed:
+            query += ' is:unread'
+
+        print(f"Gmail sorgusu: {query}")
+        print(f"Tarih aralığı: {after_date.strftime('%Y-%m-%d')} - {datetime.now().strftime('%Y-%m-%d')}")
+        print(f"Maksimum mail (istenen): {max_results}")
+        print(f"Tüm mailler dahil: {'Evet' if include_processed else 'Hayır (sadece okunmamış)'}")
+
+        # Tüm mesajları topla (pagination ile)
+        all_messages = []
+        next_page_token = None
+        page_count = 0
+        total_available = 0
+
+        while len(all_messages) < max_results:
+            page_count += 1
+            print(f"Sayfa {page_count} yükleniyor...")
+
+            # Gmail API isteği
+            request_params = {
+                'userId': 'me',
+                'q': query,
+                'maxResults': min(500, max_results - len(all_messages))  # Gmail max 500
+            }
+
+            if next_page_token:
+                request_params['pageToken'] = next_page_token
 
-            # include_processed=False ise sadece okunmamış mailleri al
-            if not include_processed:
-                query += ' is:unread'
+            results = execute_with_backoff(
+                lambda: self.service.users().messages().list(**request_params).execute(),
+                self.rate_limiter
+            )
 
-            print(f"Gmail sorgusu: {query}")
-            print(f"Tarih aralığı: {after_date.strftime('%Y-%m-%d')} - {datetime.now().strftime('%Y-%m-%d')}")
-            print(f"Maksimum mail (istenen): {max_results}")
-            print(f"Tüm mailler dahil: {'Evet' if include_processed else 'Hayır (sadece okunmamış)'}")
+            messages = results.get('messages', [])
+            all_messages.extend(messages)
 
-            # Tüm mesajları topla (pagination ile)
-            all_messages = []
-            next_page_token = None
-            page_count = 0
+            total_available = results.get('resultSizeEstimate', len(all_messages))
+            print(f"Sayfa {page_count}: {len(messages)} mail - Toplam: {len(all_messages)}/{total_available}")
 
-            while len(all_messages) < max_results:
-                page_count += 1
-                print(f"Sayfa {page_count} yükleniyor...")
+            # Sonraki sayfa var mı?
+            next_page_token = results.get('nextPageToken')
+            if not next_page_token or not messages:
+                print("Tüm sayfalar yüklendi!")
+                break
 
-                # Gmail API isteği
-                request_params = {
-                    'userId': 'me',
-                    'q': query,
-                    'maxResults': min(500, max_results - len(all_messages))  # Gmail max 500
-                }
+        print(f"TOPLAM BULUNAN MAIL: {len(all_messages)}")
+        print(f"Gmail'de mevcut toplam: {total_available}")
 
-                if next_page_token:
-                    request_params['pageToken'] = next_page_token
+        return all_messages
 
-                results = self.service.users().messages().list(**request_params).execute()
+    def _list_history_messages(self, start_history_id, max_results, include_processed):
+        """
+        start_history_id'den sonra gelen kutusuna eklenen mesajları history API ile listele.
 
-                messages = results.get('messages', [])
-                all_messages.extend(messages)
+        Returns:
+            list: Mesaj listesi ([{'id': ...}]) veya checkpoint süresi dolmuşsa (404) None
+        """
+        all_messages = []
+        seen_ids = set()
+        next_page_token = None
+        latest_history_id = start_history_id
+        # max_results dolarsa checkpoint sadece listesi tamamen alınan son history kaydına ilerler
+        last_consumed_id = start_history_id
+        truncated = False
+
+        while not truncated:
+            request_params = {
+                'userId': 'me',
+                'startHistoryId': start_history_id,
+                'historyTypes': ['messageAdded'],
+                'labelId': 'INBOX',
+                'maxResults': 500
+            }
 
-                total_available = results.get('resultSizeEstimate', len(all_messages))
-                print(f"Sayfa {page_count}: {len(messages)} mail - Toplam: {len(all_messages)}/{total_available}")
+            if next_page_token:
+                request_params['pageToken'] = next_page_token
 
-                # Sonraki sayfa var mı?
-                next_page_token = results.get('nextPageToken')
-                if not next_page_token or not messages:
-                    print("Tüm sayfalar yüklendi!")
+            try:
+                results = execute_with_backoff(
+                    lambda: self.service.users().history().list(**request_params).execute(),
+                    self.rate_limiter
+                )
+            except HttpError as e:
+                if e.resp.status == 404:
+                    return None
+                raise
+
+            latest_history_id = results.get('historyId', latest_history_id)
+
+            for record in results.get('history', []):
+                if len(all_messages) >= max_results:
+                    truncated = True
                     break
 
-                # Rate limit için kısa bekleme
-                time.sleep(0.5)
+                for added in record.get('messagesAdded', []):
+                    message = added.get('message', {})
+                    message_id = message.get('id')
 
-            print(f"TOPLAM BULUNAN MAIL: {len(all_messages)}")
-            print(f"Gmail'de mevcut toplam: {total_available}")
+                    if not message_id or message_id in seen_ids:
+                        continue
+                    if not self._matches_sync_labels(message.get('labelIds', []), include_processed):
+                        continue
 
-            # Mail detaylarını çek
-            emails = []
-            processed_count = 0
+                    seen_ids.add(message_id)
+                    all_messages.append({'id': message_id})
 
-            # Batch halinde işle (API rate limit için)
-            for i in range(0, len(all_messages), self.batch_size):
-                batch = all_messages[i:i + self.batch_size]
+                last_consumed_id = record.get('id', last_consumed_id)
 
-                for message in batch:
-                    email_data = self.get_email_details(message['id'])
-                    if email_data:
-                        emails.append(email_data)
-                        processed_count += 1
+            next_page_token = results.get('nextPageToken')
+            if not next_page_token:
+                break
 
-                        if processed_count % 50 == 0:  # Her 50 mailde rapor
-                            print(f"İşlenen mail: {processed_count}/{len(all_messages)}")
+        # Limit dolduysa kalan kayıtlar bir sonraki senkronizasyonda bu noktadan itibaren gelir
+        self.pending_history_id = last_consumed_id if truncated else latest_history_id
+        print(f"Artımlı senkronizasyon: {len(all_messages)} yeni mail bulundu (historyId: {self.pending_history_id})")
+        if truncated:
+            print(f"Mail limitine ({max_results}) ulaşıldı, kalan değişiklikler bir sonraki senkronizasyonda alınacak")
 
-                # Batch'ler arası kısa bekleme (rate limit için)
-                if i + self.batch_size < len(all_messages):
-                    time.sleep(0.3)
+        return all_messages
 
-            print(f"TOPLAM İŞLENEN MAIL: {len(emails)}")
+    def _matches_sync_labels(self, label_ids, include_processed):
+        """History kaydındaki mesajın 'in:inbox category:primary' sorgusuna uyup uymadığını kontrol et"""
+        if 'INBOX' not in label_ids:
+            return False
 
-            # CSV'ye kaydet
-            if save_to_csv and emails:
-                csv_filename = self.save_emails_to_csv(emails)
-                print(f"E-postalar CSV'ye kaydedildi: {csv_filename}")
-                return emails, csv_filename
+        # Kategoriler açıksa sadece birincil (CATEGORY_PERSONAL) sekme
+        categories = [label for label in label_ids if label.startswith('CATEGORY_')]
+        if categories and 'CATEGORY_PERSONAL' not in categories:
+            return False
 
-            return emails, None
+        if not include_processed and 'UNREAD' not in label_ids:
+            return False
+
+        return True
 
+    def _get_current_history_id(self):
+        """Posta kutusunun güncel historyId değerini getir"""
+        try:
+            profile = execute_with_backoff(
+                lambda: self.service.users().getProfile(userId='me').execute(),
+                self.rate_limiter
+            )
+            return profile.get('historyId')
         except Exception as e:
-            print(f"Gmail API hatası: {str(e)}")
-            return [], None
+            print(f"historyId alınamadı: {str(e)}")
+            return None
+
+    def get_history_checkpoint(self):
+        """Kullanıcının kayıtlı Gmail historyId checkpoint'ini döndür"""
+        if not self.user or not hasattr(self.user, 'profile'):
+            return None
+        return self.user.profile.gmail_history_id or None
+
+    def commit_history_checkpoint(self):
+        """
+        Son senkronizasyonda elde edilen historyId'yi kullanıcı profiline kaydet.
+        E-postalar başarıyla işlendikten sonra çağrılmalı.
+        """
+        if not self.pending_history_id or not self.user or not hasattr(self.user, 'profile'):
+            return False
+
+        profile = self.user.profile
+        profile.gmail_history_id = str(self.pending_history_id)
+        profile.save(update_fields=['gmail_history_id'])
+        return True
+
+    @property
+    def fetch_failed_count(self):
+        """Son fetch_emails çağrısında indirilemeyen mesaj sayısı (metadata ve tam içerik aşamaları)"""
+        return sum(fetcher.failed_count for fetcher in (self.metadata_fetcher, self.last_fetcher) if fetcher)
+
+    def _create_fetcher(self, message_format='full'):
+        """Ayarlara göre mesaj çekme motorunu oluştur"""
+        if self.fetch_mode == 'batch':
+            # email_batch_size kadar messages().get çağrısı tek HTTP isteğinde gider
+            return BatchMessageFetcher(
+                self.service,
+                batch_size=self.batch_size,
+                message_format=message_format,
+                rate_limiter=self.rate_limiter
+            )
+
+        return ConcurrentMessageFetcher(
+            self._build_service,
+            concurrency=self.fetch_concurrency,
+            message_format=message_format,
+            rate_limiter=self.rate_limiter
+        )
+
+    @staticmethod
+    def _empty_fetch_stats():
+        return {
+            'metadata': {'fetched': 0, 'bytes': 0, 'skipped': 0},
+            'full': {'fetched': 0, 'bytes': 0, 'skipped': 0},
+        }
+
+    def fetch_emails(self, message_ids, prefilter=False):
+        """
+        Mesaj ID'lerinin detaylarını çek ve ayrıştırılmış EmailRecord'ları sırayla üret.
+
+        prefilter=True ise iki aşamalı çalışır: önce tüm mesajlar için format='metadata'
+        (From/Subject/Date) çekilip kural tabanlı filtreler uygulanır, tam içerik
+        (format='full') sadece filtreyi geçen adaylar için indirilir.
+        """
+        self.fetch_stats = self._empty_fetch_stats()
+        self.rejected_message_ids = []
+        self.metadata_fetcher = None
+
+        if prefilter:
+            message_ids = self._prefilter_by_metadata(message_ids)
+
+        fetcher = self._create_fetcher()
+        self.last_fetcher = fetcher
+        full_stats = self.fetch_stats['full']
+
+        try:
+            for message_id, message in fetcher.fetch(message_ids):
+                if not message:
+                    full_stats['skipped'] += 1
+                    continue
+
+                email_data = self.parse_message(message)
+                if not email_data:
+                    full_stats['skipped'] += 1
+                    continue
+
+                full_stats['fetched'] += 1
+                yield email_data
+        finally:
+            full_stats['bytes'] = fetcher.bytes_downloaded
+
+    def _prefilter_by_metadata(self, message_ids):
+        """Birinci aşama: sadece header'ları çek, içeriğe gerek kalmadan elenebilecek mailleri at"""
+        fetcher = self._create_fetcher(message_format='metadata')
+        self.metadata_fetcher = fetcher
+        metadata_stats = self.fetch_stats['metadata']
+
+        try:
+            for message_id, message in fetcher.fetch(message_ids):
+                if not message:
+                    metadata_stats['skipped'] += 1
+                    continue
+
+                metadata_stats['fetched'] += 1
+                headers = message.get('payload', {}).get('headers', [])
+                subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
+                sender = next((h['value'] for h in headers if h['name'] == 'From'), '')
+
+                if GeminiService.is_rejected_by_metadata(sender, subject):
+                    metadata_stats['skipped'] += 1
+                    self.rejected_message_ids.append(message_id)
+                    continue
+
+                yield message_id
+        finally:
+            metadata_stats['bytes'] = fetcher.bytes_downloaded
+
+    def mark_rejected_seen(self):
+        """Metadata ön filtresinde elenen mailleri bir daha indirilmesin diye kaydet"""
+        if self.user and self.rejected_message_ids:
+            SeenEmail.mark_seen(self.user, self.rejected_message_ids)
+            self.rejected_message_ids = []
+
+    def report_fetch_stats(self):
+        """Aşama bazında indirilen veri ve atlanan mail sayılarını yazdır"""
+        if self.metadata_fetcher:
+            self.metadata_fetcher.report()
+        if self.last_fetcher:
+            self.last_fetcher.report()
+
+        for phase, stats in self.fetch_stats.items():
+            print(
+                f"Aşama '{phase}': {stats['fetched']} mail, {stats['bytes'] / 1024:.0f} KB indirildi, "
+                f"{stats['skipped']} mail atlandı"
+            )
+
+    def open_csv_writer(self):
+        """Kullanıcının CSV klasöründe yeni bir akışlı CSV yazıcısı aç"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return EmailCsvWriter(os.path.join(self.csv_folder, f"gmail_emails_{timestamp}.csv"))
 
     def save_emails_to_csv(self, emails):
         """E-postaları CSV dosyasına kaydet"""
         try:
-            # Dosya adı (tarih ve saat ile)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            csv_filename = f"gmail_emails_{timestamp}.csv"
-            csv_path = os.path.join(self.csv_folder, csv_filename)
+            with self.open_csv_writer() as writer:
+                for email_data in emails:
+                    writer.write(email_data)
+
+            print(f"CSV dosyası oluşturuldu: {writer.path}")
+            print(f"Toplam satır: {writer.row_count}")
 
-            # CSV için veri hazırla
-            csv_data = []
-            for email_data in emails:
-                csv_row = {
-                    'id': email_data['id'],
-                    'subject': email_data['subject'],
-                    'sender': email_data['sender'],
-                    'sender_email': email_data['sender_email'],
-                    'date': email_data['date'].strftime('%Y-%m-%d %H:%M:%S'),
-                    'is_read': email_data['is_read'],
-                    'body_preview': email_data['body_preview'],
-                    'body_full': email_data['body'][:5000],  # İlk 5000 karakter (Excel limiti için)
-                    'body_length': len(email_data['body']),
-                }
-                csv_data.append(csv_row)
-
-            # Pandas ile CSV'ye kaydet (Türkçe karakterler için)
-            df = pd.DataFrame(csv_data)
-            df.to_csv(csv_path, index=False, encoding='utf-8-sig')  # utf-8-sig Excel için
-
-            print(f"CSV dosyası oluşturuldu: {csv_path}")
-            print(f"Toplam satır: {len(csv_data)}")
-
-            return csv_filename
+            return writer.filename if writer.row_count else None
 
         except Exception as e:
             print(f"CSV kaydetme hatası: {str(e)}")
             return None
 
-    def read_emails_from_csv(self, csv_filename):
-        """CSV dosyasından e-postaları oku"""
-        try:
-            csv_path = os.path.join(self.csv_folder, csv_filename)
+    @staticmethod
+    def _csv_columns(header, columns):
+        """Sütunların başlıktaki sıraları; eksik sütun varsa ValueError"""
+        missing = [column for column in columns if column not in header]
+        if missing:
+            raise ValueError(f"CSV'de eksik sütunlar: {', '.join(missing)}")
+        return [header.index(column) for column in columns]
 
-            if not os.path.exists(csv_path):
-                print(f"CSV dosyası bulunamadı: {csv_path}")
-                return []
+    def read_emails_from_csv(self, csv_filename, skip=0):
+        """
+        CSV dosyasındaki e-postaları EmailRecord olarak sırayla üret.
 
-            # Pandas ile oku
-            df = pd.read_csv(csv_path, encoding='utf-8-sig')
+        Dosya satır satır okunur, bellekte tutulan tek şey o anki satırdır. İlk `skip`
+        satır kayda çevrilmeden atlanır. Dosya yoksa hiçbir şey üretilmez; okuma
+        hataları çağırana iletilir.
+        """
+        csv_path = os.path.join(self.csv_folder, csv_filename)
+
+        if not os.path.exists(csv_path):
+            print(f"CSV dosyası bulunamadı: {csv_path}")
+            return
+
+        count = 0
+        with open(csv_path, newline='', encoding='utf-8-sig') as csv_file:
+            reader = csv.reader(csv_file)
+            header = next(reader, [])
+            record_values = operator.itemgetter(*self._csv_columns(header, self.CSV_RECORD_COLUMNS))
+            # Eski CSV'lerde body_length yok; uzunluk kısaltılmış gövdeden hesaplanır
+            length_index = header.index('body_length') if 'body_length' in header else None
+
+            for row in itertools.islice(reader, skip, None):
+                message_id, subject, sender, sender_email, date, is_read, body = record_values(row)
+                body_length = row[length_index] if length_index is not None else ''
+                yield EmailRecord.create(
+                    id=message_id,
+                    subject=subject,
+                    sender=sender,
+                    sender_email=sender_email,
+                    # EmailCsvWriter'ın '%Y-%m-%d %H:%M:%S' biçimi; strptime'dan çok daha hızlı
+                    date=datetime.fromisoformat(date),
+                    body=body,
+                    is_read=is_read == 'True',
+                    body_length=int(body_length) if body_length else None,
+                )
+                count += 1
+
+        print(f"CSV'den {count} e-posta okundu: {csv_filename}")
+
+    def scan_csv(self, csv_filename, checkpoint_id=None):
+        """
+        CSV'yi kayıt oluşturmadan tara: (satır sayısı, checkpoint mesajının satır numarası).
 
-            # DataFrame'i dict formatına çevir
-            emails = []
-            for _, row in df.iterrows():
-                email_data = {
-                    'id': row['id'],
-                    'subject': row['subject'],
-                    'sender': row['sender'],
-                    'sender_email': row['sender_email'],
-                    'date': datetime.strptime(row['date'], '%Y-%m-%d %H:%M:%S'),
-                    'is_read': row['is_read'],
-                    'body_preview': row['body_preview'],
-                    'body': row['body_full'],
-                }
-                emails.append(email_data)
+        Satır numarası 1'den başlar, yani devam ederken atlanacak satır sayısıdır. Checkpoint
+        verilmemişse ya da dosyada yoksa None döner. Dosya yoksa (0, None).
+        """
+        csv_path = os.path.join(self.csv_folder, csv_filename)
+        if not os.path.exists(csv_path):
+            return 0, None
 
-            print(f"CSV'den {len(emails)} e-posta okundu: {csv_filename}")
-            return emails
+        row_count = 0
+        checkpoint_position = None
+        with open(csv_path, newline='', encoding='utf-8-sig') as csv_file:
+            reader = csv.reader(csv_file)
+            id_index, = self._csv_columns(next(reader, []), ('id',))
+            for row_count, row in enumerate(reader, 1):
+                if checkpoint_position is None and checkpoint_id and row[id_index] == checkpoint_id:
+                    checkpoint_position = row_count
 
-        except Exception as e:
-            print(f"CSV okuma hatası: {str(e)}")
-            return []
+        return row_count, checkpoint_position
 
     def get_latest_csv_file(self):
         """En son oluşturulmuş CSV dosyasını getir"""
@@ -298,9 +683,10 @@ class GmailService:
             # Dosya oluşturma tarihi
             creation_time = datetime.fromtimestamp(os.path.getctime(csv_path))
 
-            # Satır sayısı (başlık hariç)
-            df = pd.read_csv(csv_path, encoding='utf-8-sig')
-            row_count = len(df)
+            # Satır sayısı (başlık hariç); dosyanın tamamı belleğe alınmaz
+            row_count, _ = self.scan_csv(csv_filename)
+            with open(csv_path, newline='', encoding='utf-8-sig') as csv_file:
+                columns = next(csv.reader(csv_file), [])
 
             return {
                 'filename': csv_filename,
@@ -308,7 +694,7 @@ class GmailService:
                 'size_mb': round(file_size_mb, 2),
                 'created_at': creation_time,
                 'row_count': row_count,
-                'columns': list(df.columns)
+                'columns': columns
             }
 
         except Exception as e:
@@ -318,12 +704,25 @@ class GmailService:
     def get_email_details(self, message_id):
         """Belirli bir e-postanın detaylarını getir"""
         try:
-            message = self.service.users().messages().get(
-                userId='me',
-                id=message_id,
-                format='full'
-            ).execute()
+            message = execute_with_backoff(
+                lambda: self.service.users().messages().get(
+                    userId='me',
+                    id=message_id,
+                    format='full'
+                ).execute(),
+                self.rate_limiter
+            )
+        except Exception as e:
+            print(f"E-posta detay hatası (ID: {message_id}): {str(e)}")
+            return None
 
+        return self.parse_message(message)
+
+    def parse_message(self, message):
+        """Gmail API'den gelen tam (format='full') mesajı kompakt EmailRecord'a çevir (ham payload tutulmaz)"""
+        message_id = message.get('id')
+
+        try:
             headers = message['payload'].get('headers', [])
 
             # Header bilgilerini çıkar
@@ -343,37 +742,35 @@ class GmailService:
             # Ek bilgiler
             sender_email = self.extract_sender_email(sender)
 
-            return {
-                'id': message_id,
-                'subject': subject,
-                'sender': sender,
-                'sender_email': sender_email,
-                'date': email_date,
-                'body': body,
-                'body_preview': body[:200] + '...' if len(body) > 200 else body,
-                'raw_message': message,
-                'is_read': 'UNREAD' not in message.get('labelIds', [])
-            }
+            return EmailRecord.create(
+                id=message_id,
+                subject=subject,
+                sender=sender,
+                sender_email=sender_email,
+                date=email_date,
+                body=body,
+                is_read='UNREAD' not in message.get('labelIds', [])
+            )
         except Exception as e:
             print(f"E-posta detay hatası (ID: {message_id}): {str(e)}")
             return None
 
     def extract_email_body(self, payload):
-        """E-posta içeriğini çıkar - Geliştirilmiş versiyon"""
-        body = ""
+        """
+        E-posta içeriğini çıkar.
 
+        Gövde parçası mimeType/size metadata'sından seçilir; sadece o parça,
+        Content-Type charset'i ile ve BODY_TEXT_LIMIT dolana kadar çözülür.
+        """
         try:
-            if 'parts' in payload:
-                # Multipart email - öncelik sırasına göre işle
-                body = self._extract_from_multipart(payload['parts'])
-            elif payload.get('body') and 'data' in payload['body']:
-                # Single part email
-                data = payload['body']['data']
-                body = self._decode_base64_content(data)
-
-                # HTML ise temizle
-                if payload.get('mimeType') == 'text/html':
-                    body = self._clean_html_content(body)
+            part, is_html = self._select_body_part(payload)
+
+            if part is None:
+                body = ""
+            elif is_html:
+                body = self._clean_html_part(part)
+            else:
+                body = self._read_text_part(part)
 
         except Exception as e:
             print(f"E-posta body çıkarma hatası: {str(e)}")
@@ -381,70 +778,108 @@ class GmailService:
 
         return self._clean_and_normalize_text(body)
 
-    def _extract_from_multipart(self, parts):
-        """Multipart e-postalardan içerik çıkar"""
-        text_content = ""
-        html_content = ""
-
-        # Önce tüm part'ları tara
-        for part in parts:
-            try:
-                # Nested parts varsa recursive işle
-                if 'parts' in part:
-                    nested_content = self._extract_from_multipart(part['parts'])
-                    if nested_content:
-                        return nested_content
+    def _select_body_part(self, payload):
+        """
+        Hiçbir parçayı çözmeden gövde olarak kullanılacak parçayı seç.
 
-                mime_type = part.get('mimeType', '')
-                body_data = part.get('body', {})
+        Öncelik: text/plain > text/html > diğer text/*. İç içe multipart içinde
+        uygun parça varsa o kullanılır; dosya ekleri ve boş parçalar atlanır.
 
-                if not body_data.get('data'):
-                    continue
+        Returns:
+            (part, is_html) veya (None, False)
+        """
+        if 'parts' not in payload:
+            # Tek parçalı e-posta: HTML değilse düz metin kabul edilir
+            if self._part_has_data(payload):
+                return payload, payload.get('mimeType') == 'text/html'
+            return None, False
+
+        html_part = None
+        other_part = None
+
+        for part in payload['parts']:
+            if 'parts' in part:
+                nested = self._select_body_part(part)
+                if nested[0] is not None:
+                    return nested
+                continue
 
-                decoded_content = self._decode_base64_content(body_data['data'])
+            if part.get('filename') or not self._part_has_data(part):
+                continue
 
-                # Öncelik: text/plain > text/html > diğerleri
-                if mime_type == 'text/plain':
-                    text_content = decoded_content
-                    break  # text/plain bulunca dur
-                elif mime_type == 'text/html' and not text_content:
-                    html_content = decoded_content
-                elif mime_type.startswith('text/') and not text_content and not html_content:
-                    text_content = decoded_content
+            mime_type = part.get('mimeType', '')
+            if mime_type == 'text/plain':
+                return part, False
+            if mime_type == 'text/html':
+                html_part = html_part or part
+            elif mime_type.startswith('text/'):
+                other_part = other_part or part
+
+        if html_part is not None:
+            return html_part, True
+        return other_part, False
+
+    @staticmethod
+    def _part_has_data(part):
+        body = part.get('body') or {}
+        # Gmail boş parçalar için size=0 döner; data yoksa (attachmentId) içerik ayrıca indirilmelidir
+        return bool(body.get('data')) and body.get('size', 1) != 0
+
+    @staticmethod
+    def _part_charset(part):
+        """Parçanın Content-Type başlığındaki charset; yoksa veya tanınmıyorsa utf-8"""
+        for header in part.get('headers', []):
+            if header.get('name', '').lower() == 'content-type':
+                match = patterns.CHARSET_PARAM_RE.search(header.get('value', ''))
+                if match:
+                    try:
+                        return codecs.lookup(match.group(1)).name
+                    except LookupError:
+                        break
+        return 'utf-8'
+
+    def _iter_part_chunks(self, part):
+        """Parçayı DECODE_CHUNK_BYTES'lık bloklar halinde base64'ten ve charset'ten çöz"""
+        data = part['body']['data']
+        decoder = codecs.getincrementaldecoder(self._part_charset(part))(errors='replace')
+        # 4 base64 karakteri 3 byte'a karşılık gelir; bloklar padding'siz bölünür
+        step = self.DECODE_CHUNK_BYTES // 3 * 4
+
+        for start in range(0, len(data), step):
+            chunk = data[start:start + step]
+            final = start + step >= len(data)
+            if final:
+                chunk += '=' * (-len(chunk) % 4)
 
-            except Exception as e:
-                print(f"Part işleme hatası: {str(e)}")
-                continue
+            try:
+                raw = base64.urlsafe_b64decode(chunk)
+            except ValueError as e:
+                print(f"Base64 decode hatası: {str(e)}")
+                return
 
-        # En uygun içeriği döndür
-        if text_content:
-            return text_content
-        elif html_content:
-            return self._clean_html_content(html_content)
+            # Blok sınırında bölünen çok byte'lı karakterler bir sonraki bloğa bekletilir
+            yield decoder.decode(raw, final=final)
 
-        return ""
+    def _read_text_part(self, part):
+        """Düz metin parçasını, link ve boşluklar dışında BODY_TEXT_LIMIT karakter toplanana kadar çöz"""
+        chunks = []
+        visible = 0
 
-    def _decode_base64_content(self, data):
-        """Base64 kodlanmış içeriği çöz"""
-        try:
-            # Gmail API'sinden gelen data URL-safe base64 encoded
-            decoded_bytes = base64.urlsafe_b64decode(data)
+        for chunk in self._iter_part_chunks(part):
+            chunks.append(chunk)
+            visible += len(''.join(patterns.HTTP_URL_RE.sub('', chunk).split()))
+            if visible >= self.BODY_TEXT_LIMIT:
+                break
 
-            # Encoding tespiti ve çözümleme
-            try:
-                return decoded_bytes.decode('utf-8')
-            except UnicodeDecodeError:
-                try:
-                    return decoded_bytes.decode('iso-8859-1')
-                except UnicodeDecodeError:
-                    try:
-                        return decoded_bytes.decode('windows-1252')
-                    except UnicodeDecodeError:
-                        return decoded_bytes.decode('utf-8', errors='replace')
+        return ''.join(chunks)
 
+    def _clean_html_part(self, part):
+        """HTML parçasını çözüldükçe ayrıştır; limit dolunca kalan base64 hiç çözülmez"""
+        try:
+            return html_chunks_to_text(self._iter_part_chunks(part), max_chars=self.BODY_TEXT_LIMIT)
         except Exception as e:
-            print(f"Base64 decode hatası: {str(e)}")
-            return ""
+            print(f"HTML temizleme hatası: {str(e)}")
+            return self._simple_html_cleanup(''.join(self._iter_part_chunks(part)))
 
     def _clean_html_content(self, html_content):
         """HTML içeriğini temizle ve düz metne çevir"""
@@ -452,22 +887,8 @@ class GmailService:
             return ""
 
         try:
-            # BeautifulSoup kullanımı (eğer mevcut ise)
-            try:
-                from bs4 import BeautifulSoup
-                soup = BeautifulSoup(html_content, 'html.parser')
-
-                # Script ve style taglarını kaldır
-                for script in soup(["script", "style"]):
-                    script.decompose()
-
-                # Metin çıkar
-                text = soup.get_text()
-
-            except ImportError:
-                # BeautifulSoup yoksa regex ile basit temizlik
-                text = self._simple_html_cleanup(html_content)
-
+            # Akış halinde ayrıştırma: ağaç kurulmaz, gövde limiti dolunca kalan HTML atlanır
+            text = html_to_text(html_content, max_chars=self.BODY_TEXT_LIMIT)
         except Exception as e:
             print(f"HTML temizleme hatası: {str(e)}")
             text = self._simple_html_cleanup(html_content)
@@ -475,81 +896,42 @@ class GmailService:
         return text
 
     def _simple_html_cleanup(self, html_content):
-        """BeautifulSoup olmadan basit HTML temizleme"""
-        import re
-
+        """Regex ile basit HTML temizleme (ayrıştırıcı hata verirse)"""
         # Script ve style içeriklerini kaldır
-        html_content = re.sub(r'<script[^>]*>.*?</script>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
-        html_content = re.sub(r'<style[^>]*>.*?</style>', '', html_content, flags=re.DOTALL | re.IGNORECASE)
+        html_content = patterns.HTML_SCRIPT_RE.sub('', html_content)
+        html_content = patterns.HTML_STYLE_RE.sub('', html_content)
 
         # HTML taglarını kaldır
-        html_content = re.sub(r'<[^>]+>', ' ', html_content)
+        html_content = patterns.HTML_TAG_RE.sub(' ', html_content)
 
         # HTML entity'lerini çöz
-        import html
-        html_content = html.unescape(html_content)
-
-        return html_content
+        return html.unescape(html_content)
 
     def _clean_and_normalize_text(self, text):
         """Metni temizle, linkleri kaldır ve normalize et"""
         if not text:
             return ""
 
-        import re
-
-        # --- YENİ EKLENEN KISIM BAŞLANGICI ---
-
-        # 1. Adım: Belirli anahtar ifadelerden sonrasını kes (daha agresif temizlik)
-        # Bu, "İş ilanını görüntüleyin:" veya "Unsubscribe" gibi linklerden önceki
-        # metni koruyup sonrasını tamamen atar.
-        stop_phrases = [
-            "İş ilanını görüntüleyin:",
-            "View job:",
-            "İlanı görüntüle:",
-            "Görüntüle:",
-            "Unsubscribe",
-            "Abonelikten çık",
-        ]
-        for phrase in stop_phrases:
-            # Büyük/küçük harf duyarsız arama yap
-            if re.search(phrase, text, re.IGNORECASE):
-                # Phrase'in bulunduğu yerden itibaren metni kes
-                text = text.split(re.search(phrase, text, re.IGNORECASE).group(0))[0]
+        # 1. Adım: Stop ifadelerinden ("İş ilanını görüntüleyin:", "Unsubscribe" vb.) ilki
+        # nerede geçiyorsa metni oradan kes; tüm ifadeler tek aramada bulunur
+        stop_match = patterns.find_stop_phrase(text)
+        if stop_match:
+            text = text[:stop_match.start()]
 
-        # 2. Adım: Metin içinde kalan tüm URL'leri temizle
-        # http, https ile başlayan ve boşluk, satır sonu gibi bir karakterle biten tüm linkleri bulur ve siler.
-        text = re.sub(r'https?:\/\/\S+', '', text)
+        # 2. Adım: Metin içinde kalan tüm URL'leri (http(s) ve www ile başlayan) temizle
+        text = patterns.HTTP_URL_RE.sub('', text)
+        text = patterns.WWW_URL_RE.sub('', text)
 
-        # www ile başlayan linkleri de temizle (http olmadan yazılmışlarsa)
-        text = re.sub(r'www\.\S+', '', text)
-
-        # --- YENİ EKLENEN KISIM SONU ---
-
-        # Fazla boşlukları temizle
-        text = re.sub(r'\s+', ' ', text)
-
-        # Satır sonlarını normalize et
-        text = re.sub(r'\r\n|\r|\n', '\n', text)
-
-        # Fazla satır atlamalarını temizle (3'ten fazla ardışık newline)
-        text = re.sub(r'\n{4,}', '\n\n\n', text)
-
-        # Başlangıç ve sonundaki boşlukları temizle
-        text = text.strip()
-
-        # Çok uzun boşlukları kısalt
-        text = re.sub(r' {3,}', '  ', text)
+        # Tüm boşluk ve satır sonlarını tek boşluğa indir, baştaki/sondaki boşlukları at
+        # (satır sonu ve çoklu boşluk normalizasyonu bu adımda kendiliğinden yapılmış olur)
+        text = ' '.join(text.split())
 
         # Özel kontrol karakterlerini temizle
-        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x84\x86-\x9f]', '', text)
-
-        return text
+        return patterns.CONTROL_CHARS_RE.sub('', text)
 
     def extract_sender_email(self, sender_string):
         """Gönderen string'inden e-posta adresini çıkar"""
-        email_pattern = r'[\w\.-]+@[\w\.-]+\.\w+'
-        match = re.search(email_pattern, sender_string)
+        match = patterns.SENDER_EMAIL_RE.search(sender_string)
         return match.group(0) if match else sender_string
 
     def get_email_stats(self, days=None):
@@ -0,0 +1,107 @@
+from html.parser import HTMLParser
+
+# İçeriği metne hiç girmeyen etiketler
+SKIPPED_TAGS = frozenset({'script', 'style'})
+
+# Açılış/kapanışta satır sonu bırakan blok etiketleri (LinkedIn satır bazlı ayrıştırması bunlara dayanır)
+BLOCK_TAGS = frozenset({
+    'address', 'article', 'aside', 'blockquote', 'br', 'center', 'dd', 'div', 'dl', 'dt',
+    'fieldset', 'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tbody',
+    'thead', 'tfoot', 'title', 'tr', 'ul',
+})
+
+# Tablo hücreleri yan yana kalır ama kelimeler birbirine yapışmaz
+CELL_TAGS = frozenset({'td', 'th'})
+
+# HTML bu büyüklükte parçalar halinde beslenir; limit dolunca kalan parçalar hiç ayrıştırılmaz
+FEED_CHUNK_SIZE = 16 * 1024
+
+
+class HtmlTextExtractor(HTMLParser):
+    """
+    HTML'i akış halinde düz metne çeviren ayrıştırıcı.
+
+    Ağaç kurmaz: script/style içeriği atılır, blok etiketleri satır sonuna,
+    tablo hücreleri boşluğa dönüşür, entity'ler çözülür. max_chars verilirse
+    boşluk olmayan metin bu uzunluğa ulaştığında ayrıştırma durur.
+    """
+
+    def __init__(self, max_chars=None):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts = []
+        self.length = 0
+        self.skip_depth = 0
+        self.truncated = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+        elif tag in CELL_TAGS:
+            self.parts.append(' ')
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/>, <hr/> gibi kendiliğinden kapanan etiketler; <script/> içerik açmaz
+        if tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            if self.skip_depth:
+                self.skip_depth -= 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+        elif tag in CELL_TAGS:
+            self.parts.append(' ')
+
+    def handle_data(self, data):
+        if self.skip_depth or self.truncated:
+            return
+
+        self.parts.append(data)
+        # Etiketler arasındaki girinti boşlukları limite sayılmaz
+        if self.max_chars is not None and not data.isspace():
+            self.length += len(data)
+            if self.length >= self.max_chars:
+                self.truncated = True
+
+    def get_text(self):
+        return ''.join(self.parts)
+
+
+def html_to_text(html_content, max_chars=None):
+    """
+    HTML içeriğini düz metne çevir.
+
+    Args:
+        html_content: HTML metni
+        max_chars: Bu kadar metin toplanınca kalan HTML ayrıştırılmaz (None: sınırsız)
+
+    Returns:
+        str: Blok etiketlerinde satır sonu içeren düz metin
+    """
+    if not html_content:
+        return ""
+
+    chunks = (html_content[start:start + FEED_CHUNK_SIZE] for start in range(0, len(html_content), FEED_CHUNK_SIZE))
+    return html_chunks_to_text(chunks, max_chars)
+
+
+def html_chunks_to_text(chunks, max_chars=None):
+    """
+    Parça parça gelen (ör. base64'ten çözüldükçe) HTML'i düz metne çevir.
+
+    Limit dolunca kalan parçalar istenmez; üretici (generator) verilirse geri
+    kalan içerik hiç çözülmez.
+    """
+    extractor = HtmlTextExtractor(max_chars)
+    for chunk in chunks:
+        extractor.feed(chunk)
+        if extractor.truncated:
+            return extractor.get_text()
+
+    extractor.close()
+    return extractor.get_text()
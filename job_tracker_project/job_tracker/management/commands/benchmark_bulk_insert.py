@@ -0,0 +1,113 @@
+import contextlib
+import io
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from job_tracker.email_pipeline import EmailPipeline
+from job_tracker.email_record import EmailRecord
+from job_tracker.models import JobApplication, UserProfile
+
+
+def _classified(prefix, count):
+    """persist aşamasına giren (email_data, job_info, detection_failed) üçlüleri"""
+    for index in range(count):
+        email_data = EmailRecord.create(
+            id=f'{prefix}{index:07d}',
+            subject=f'Yazılım Geliştirici başvurunuz Ornek {index} şirketine gönderildi',
+            sender='LinkedIn <jobs-noreply@linkedin.com>',
+            sender_email='jobs-noreply@linkedin.com',
+            date=datetime(2025, 9, 1, 10, 0, tzinfo=timezone.utc),
+            body='Başvurunuz alınmıştır. Değerlendirme sonrası sizinle iletişime geçeceğiz. ' * 20,
+            is_read=True,
+        )
+        job_info = {
+            'company_name': f'Ornek {index}',
+            'position': 'Yazılım Geliştirici',
+            'status': 'pending',
+            'location': 'İstanbul, Türkiye',
+            'application_source': 'LinkedIn',
+        }
+        yield email_data, job_info, False
+
+
+def _legacy_persist(user, classified):
+    """Eski davranış: başvuru başına JobApplication.objects.create (post_save ile profil sayımı)"""
+    for email_data, job_info, _ in classified:
+        JobApplication.objects.create(
+            user=user,
+            company_name=job_info.get('company_name', 'Bilinmeyen Şirket'),
+            position=job_info.get('position', 'Bilinmeyen Pozisyon'),
+            email_sender=email_data.sender_email,
+            application_date=email_data.date,
+            status=job_info.get('status', 'received'),
+            email_subject=email_data.subject,
+            email_content=email_data.body[:1000],
+            gmail_message_id=email_data.id,
+            extracted_info=job_info
+        )
+
+
+def _bulk_persist(user, classified):
+    """EmailPipeline.persist + çalışma sonunda tek profil güncellemesi (run() ile aynı)"""
+    pipeline = EmailPipeline(user, concurrency=1)
+    for _ in pipeline.persist(classified):
+        pass
+    pipeline._update_profile_stats()
+
+
+class Command(BaseCommand):
+    help = "Senkronizasyonda başvuru yazımını tek tek create ile toplu bulk_create yolu için karşılaştırır"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applications', type=int, default=2000, help='Yazılacak başvuru sayısı')
+
+    def handle(self, *args, **options):
+        count = options['applications']
+        if count < 1:
+            raise CommandError("--applications en az 1 olmalı")
+
+        self.stdout.write(f"{count} başvuru, veritabanı: {connection.vendor} ({connection.settings_dict['NAME']})")
+        self.stdout.write(f"{'Yöntem':<8} {'Toplam (sn)':>12} {'Kayıt/sn':>10} {'Sorgu':>7} {'Hızlanma':>9}")
+
+        results = []
+        for name, persist in (('create', _legacy_persist), ('bulk', _bulk_persist)):
+            # Her yöntem geçici bir kullanıcıyla, autocommit modunda (gerçek akıştaki gibi) çalışır
+            user = User.objects.create(username=f'benchmark_{uuid.uuid4().hex[:12]}')
+            try:
+                with self._count_queries() as queries:
+                    start = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        persist(user, _classified(name, count))
+                    elapsed = time.perf_counter() - start
+
+                saved = JobApplication.objects.filter(user=user).count()
+                profile_total = UserProfile.objects.get(user=user).total_applications
+                if saved != count or profile_total != count:
+                    raise CommandError(f"{name}: {saved} kayıt, profil sayacı {profile_total} (beklenen {count})")
+                results.append((name, elapsed, queries()))
+            finally:
+                user.delete()
+
+        legacy_elapsed = results[0][1]
+        for name, elapsed, query_count in results:
+            self.stdout.write(
+                f"{name:<8} {elapsed:>12.2f} {count / elapsed:>10.0f} {query_count:>7} {legacy_elapsed / elapsed:>8.1f}x"
+            )
+        self.stdout.write("İki yolda da tüm başvurular yazıldı ve profil sayacı doğru")
+
+    @contextlib.contextmanager
+    def _count_queries(self):
+        """Çalıştırılan SQL sorgusu sayısı (DEBUG kapalıyken de)"""
+        executed = []
+
+        def wrapper(execute, sql, params, many, context):
+            executed.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(wrapper):
+            yield lambda: len(executed)
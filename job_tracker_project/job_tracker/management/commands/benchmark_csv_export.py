@@ -0,0 +1,117 @@
+import codecs
+import hashlib
+import random
+import time
+import tracemalloc
+import zlib
+
+import pandas as pd
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+
+from job_tracker.management.commands.benchmark_indexes import (
+    BENCHMARK_ALIAS, seed_applications, temporary_database,
+)
+from job_tracker.models import JobApplication
+from job_tracker.views import _gzip_chunks, _iter_applications_csv
+
+
+def _legacy_export(applications):
+    """export_applications_to_csv'nin önceki hali: tüm satırlar dict listesi -> DataFrame -> HttpResponse"""
+    csv_data = []
+    for app in applications:
+        csv_row = {
+            'ID': app.id,
+            'Şirket': app.company_name,
+            'Pozisyon': app.position,
+            'Gönderen': app.email_sender,
+            'Başvuru Tarihi': app.application_date.strftime('%Y-%m-%d %H:%M:%S'),
+            'Durum': app.get_status_display(),
+            'E-posta Konusu': app.email_subject,
+            'Oluşturma Tarihi': app.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+            'Gmail ID': app.gmail_message_id,
+        }
+        csv_data.append(csv_row)
+
+    df = pd.DataFrame(csv_data)
+    response = HttpResponse(content_type='text/csv')
+    df.to_csv(response, index=False, encoding='utf-8-sig')
+    yield response.content
+
+
+class Command(BaseCommand):
+    help = (
+        "Başvuru CSV export'unu geçici bir SQLite veritabanında ölçer: eski (DataFrame) ve akışlı "
+        "(iterator + csv.writer, isteğe bağlı gzip) yolun ilk byte süresi, toplam süre ve tepe belleği"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 50_000, 200_000],
+                            help='Ölçülen başvuru sayıları')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if min(options['rows']) < 1:
+            raise CommandError("--rows en az 1 olmalı")
+
+        with temporary_database('job_tracker_export_'):
+            call_command('migrate', database=BENCHMARK_ALIAS, verbosity=0)
+            user_ids = seed_applications(max(options['rows']), 1, random.Random(options['seed']))
+            all_applications = JobApplication.objects.using(BENCHMARK_ALIAS).filter(user_id=user_ids[0])
+
+            self.stdout.write(
+                f"{'Satır':>8} {'Yöntem':<10} {'İlk byte (ms)':>14} {'Toplam (ms)':>12} "
+                f"{'Tepe bellek (MB)':>17} {'Boyut (KB)':>11}"
+            )
+            for rows in sorted(options['rows']):
+                # Her boyut için en yeni `rows` başvuru (export sırası)
+                ids = all_applications.order_by('-created_at').values_list('pk', flat=True)[:rows]
+                applications = all_applications.filter(pk__in=list(ids)).order_by('-created_at')
+
+                digests = set()
+                for name, export, compressed in (
+                    ('legacy', _legacy_export, False),
+                    ('stream', _iter_applications_csv, False),
+                    ('gzip', lambda queryset: _gzip_chunks(_iter_applications_csv(queryset)), True),
+                ):
+                    first_byte, elapsed, peak, size, digest = self._measure(export, applications, compressed)
+                    digests.add(digest)
+                    self.stdout.write(
+                        f"{rows:>8} {name:<10} {first_byte * 1000:>14.1f} {elapsed * 1000:>12.1f} "
+                        f"{peak / 1024 ** 2:>17.1f} {size / 1024:>11.0f}"
+                    )
+
+                if len(digests) != 1:
+                    raise CommandError(f"{rows} satırda akışlı export eski çıktıdan farklı")
+            self.stdout.write("Tüm boyutlarda akışlı ve gzip'li export eski çıktıyla birebir aynı (BOM hariç)")
+
+    def _measure(self, export, applications, compressed=False):
+        """
+        İlk parçaya kadar geçen süre, toplam süre, tepe bellek (tracemalloc), gönderilen byte
+        sayısı ve (açılmış) içeriğin özeti. Parçalar tarayıcıya gider gibi tutulmadan tüketilir.
+
+        Eski yol encoding='utf-8-sig' verse de HttpResponse'a BOM yazmıyordu; özet BOM
+        hariç içerikten alınır.
+        """
+        digest = hashlib.sha256()
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if compressed else None
+        size = 0
+        first_byte = None
+        content_started = False
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        for chunk in export(applications):
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            size += len(chunk)
+            data = decompressor.decompress(chunk) if compressed else chunk
+            if data and not content_started:
+                data = data.removeprefix(codecs.BOM_UTF8)
+                content_started = True
+            digest.update(data)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return first_byte, elapsed, peak, size, digest.hexdigest()
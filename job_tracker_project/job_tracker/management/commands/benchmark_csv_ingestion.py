@@ -0,0 +1,160 @@
+import contextlib
+import hashlib
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from job_tracker.email_record import EmailRecord
+from job_tracker.gmail_service import EmailCsvWriter
+from job_tracker.management.commands.benchmark_email_memory import (
+    OfflineGmailService, _current_rss_kb, _peak_rss_kb,
+)
+
+COMPANIES = ('Acme', 'Globex', 'Initech', 'Hooli', 'Wonka', 'Umbrella', 'Stark', 'Wayne')
+SUBJECTS = ('Başvurunuz alındı', 'Mülakat daveti', 'Başvurunuz hakkında', 'Haftalık bülten', 'Teklif mektubu')
+
+
+def _legacy_read_emails(csv_path):
+    """read_emails_from_csv'nin önceki hali: tüm CSV DataFrame'e, iterrows + strptime ile listeye"""
+    df = pd.read_csv(csv_path, encoding='utf-8-sig')
+
+    emails = []
+    for _, row in df.iterrows():
+        body_length = row.get('body_length')
+        emails.append(EmailRecord.create(
+            id=row['id'],
+            subject=row['subject'],
+            sender=row['sender'],
+            sender_email=row['sender_email'],
+            date=datetime.strptime(row['date'], '%Y-%m-%d %H:%M:%S'),
+            body=row['body_full'],
+            is_read=row['is_read'],
+            body_length=None if pd.isna(body_length) else body_length,
+        ))
+    return emails
+
+
+def _write_csv(path, rows, body_chars, rng):
+    """sync_emails'in yazdığı biçimde (EmailCsvWriter) sentetik bir e-posta CSV'si oluştur"""
+    start = datetime(2024, 1, 1, 9, 0, 0)
+    sentence = "Merhaba, Yazılım Geliştirici pozisyonu için başvurunuz alınmıştır; ekibimiz değerlendiriyor. "
+    text = (sentence * (body_chars // len(sentence) + 1))[:body_chars]
+
+    with EmailCsvWriter(path) as writer:
+        for index in range(rows):
+            company = rng.choice(COMPANIES)
+            body = f"{company} #{index}\n{text}"
+            writer.write(EmailRecord.create(
+                id=f'{index:016x}',
+                subject=f'{rng.choice(SUBJECTS)} - {company}',
+                sender=f'{company} İK <ik@{company.lower()}.com>',
+                sender_email=f'ik@{company.lower()}.com',
+                date=start + timedelta(minutes=index),
+                body=body,
+                is_read=rng.random() < 0.5,
+                body_length=len(body) + rng.randrange(0, 3) * 1000,
+            ))
+
+
+def _update_digest(digest, record):
+    digest.update(repr((
+        record.id, record.subject, record.sender, record.sender_email, record.date,
+        record.body, record.body_length, record.is_read,
+    )).encode('utf-8'))
+
+
+def _run_mode(mode, folder, filename, results):
+    """
+    Tek bir modu ayrı süreçte çalıştır, run_csv_job'un CSV'yi tüketme biçimiyle:
+    legacy tüm kayıtları listede tutar, stream önce id'leri tarar sonra kayıtları akış halinde işler.
+    """
+    service = OfflineGmailService()
+    service.csv_folder = folder
+    baseline = _current_rss_kb()
+    digest = hashlib.sha256()
+    count = 0
+
+    start = time.perf_counter()
+    if mode == 'legacy':
+        emails = _legacy_read_emails(os.path.join(folder, filename))
+        for record in emails:
+            _update_digest(digest, record)
+        count = len(emails)
+    else:
+        total, _ = service.scan_csv(filename)
+        with contextlib.redirect_stdout(None):  # okuyucunun özet satırı tabloya karışmasın
+            for record in service.read_emails_from_csv(filename):
+                _update_digest(digest, record)
+                count += 1
+        if total != count:
+            count = -1
+
+    results.put({
+        'mode': mode,
+        'emails': count,
+        'elapsed': time.perf_counter() - start,
+        'rss_growth_kb': max(0, _peak_rss_kb() - baseline),
+        'digest': digest.hexdigest(),
+    })
+
+
+class Command(BaseCommand):
+    help = (
+        "process_from_csv'nin CSV okumasını ölçer: eski (tüm DataFrame + iterrows) ve "
+        "dosyayı satır satır okuyan akışlı okuyucu için süre ve tepe bellek"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                            help='Ölçülen CSV satır sayıları')
+        parser.add_argument('--body-chars', type=int, default=400, help='body_full sütununun uzunluğu (karakter)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if min(options['rows']) < 1:
+            raise CommandError("--rows en az 1 olmalı")
+
+        folder = tempfile.mkdtemp(prefix='job_tracker_csv_ingestion_')
+        # Tepe RSS süreç başına ölçüldüğü için her mod ayrı bir süreçte çalışır
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+
+        try:
+            self.stdout.write(
+                f"{'Satır':>9} {'Dosya (MB)':>11} {'Yöntem':<8} {'Süre (sn)':>10} "
+                f"{'Satır/sn':>10} {'RSS artışı (MB)':>16}"
+            )
+            for rows in sorted(options['rows']):
+                filename = f'gmail_emails_{rows}.csv'
+                path = os.path.join(folder, filename)
+                _write_csv(path, rows, options['body_chars'], random.Random(options['seed']))
+                size_mb = os.path.getsize(path) / 1024 ** 2
+
+                digests = set()
+                for mode in ('legacy', 'stream'):
+                    process = context.Process(target=_run_mode, args=(mode, folder, filename, results))
+                    process.start()
+                    row = results.get()
+                    process.join()
+
+                    if row['emails'] != rows:
+                        raise CommandError(f"{mode} {rows} satırlık CSV'den {row['emails']} kayıt okudu")
+                    digests.add(row['digest'])
+                    self.stdout.write(
+                        f"{rows:>9} {size_mb:>11.1f} {mode:<8} {row['elapsed']:>10.2f} "
+                        f"{rows / row['elapsed']:>10.0f} {row['rss_growth_kb'] / 1024:>16.1f}"
+                    )
+
+                if len(digests) != 1:
+                    raise CommandError(f"{rows} satırda iki okuyucu farklı kayıtlar üretti")
+                os.remove(path)
+            self.stdout.write("Tüm boyutlarda iki okuyucu aynı kayıtları üretti")
+        finally:
+            shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,140 @@
+import base64
+import multiprocessing
+import resource
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from job_tracker.gmail_service import GmailService
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).decode('ascii')
+
+
+def _fake_full_message(index, body_kb, attachment_kb):
+    """Düz metin, HTML ve base64 ek içeren, format='full' ile dönen gerçekçi bir mesaj üret"""
+    text = (f"Merhaba, Yazılım Geliştirici pozisyonu için başvurunuz alınmıştır. Referans {index}. " * 64)
+    text = (text * (body_kb * 1024 // len(text) + 1))[:body_kb * 1024]
+    html = f"<html><body><p>{text}</p></body></html>"
+
+    return {
+        'id': f'msg{index:08d}',
+        'threadId': f'msg{index:08d}',
+        'labelIds': ['INBOX', 'CATEGORY_PERSONAL'],
+        'payload': {
+            'mimeType': 'multipart/mixed',
+            'headers': [
+                {'name': 'Subject', 'value': f'Başvurunuz alındı #{index}'},
+                {'name': 'From', 'value': 'İK <ik@ornek-sirket.com>'},
+                {'name': 'Date', 'value': 'Mon, 1 Sep 2025 10:00:00 +0300'},
+            ],
+            'parts': [
+                {
+                    'mimeType': 'multipart/alternative',
+                    'parts': [
+                        {'mimeType': 'text/plain', 'body': {'data': _b64(text.encode('utf-8'))}},
+                        {'mimeType': 'text/html', 'body': {'data': _b64(html.encode('utf-8'))}},
+                    ],
+                },
+                {
+                    'mimeType': 'application/pdf',
+                    'filename': f'cv_{index}.pdf',
+                    'body': {'data': _b64(bytes(attachment_kb * 1024))},
+                },
+            ],
+        },
+    }
+
+
+class OfflineGmailService(GmailService):
+    """Sadece ayrıştırma için; Gmail'e bağlanmayan GmailService"""
+
+    def authenticate(self):
+        self.service = None
+
+
+def _current_rss_kb():
+    """Sürecin o anki RSS değeri (KB); /proc yoksa tepe değer kullanılır"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize() // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _peak_rss_kb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # macOS byte cinsinden döner
+
+
+def _run_mode(mode, count, body_kb, attachment_kb, results):
+    """Tek bir modu ayrı süreçte çalıştır: get_recent_emails gibi tüm mailleri listede tut"""
+    service = OfflineGmailService()
+    baseline = _current_rss_kb()
+    start = time.perf_counter()
+    emails = []
+
+    for index in range(count):
+        message = _fake_full_message(index, body_kb, attachment_kb)
+        record = service.parse_message(message)
+
+        if mode == 'legacy':
+            # Eski davranış: tam gövde + ham Gmail payload'u sözlükte tutuluyordu
+            body = service.extract_email_body(message['payload'])
+            emails.append({
+                'id': record.id,
+                'subject': record.subject,
+                'sender': record.sender,
+                'sender_email': record.sender_email,
+                'date': record.date,
+                'body': body,
+                'body_preview': record.body_preview,
+                'raw_message': message,
+                'is_read': record.is_read,
+            })
+        else:
+            emails.append(record)
+
+    results.put({
+        'mode': mode,
+        'emails': len(emails),
+        'elapsed': time.perf_counter() - start,
+        'rss_growth_kb': max(0, _peak_rss_kb() - baseline),
+    })
+
+
+class Command(BaseCommand):
+    help = "Ham payload tutan eski e-posta sözlükleri ile EmailRecord'un bellek kullanımını karşılaştırır"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--emails', type=int, default=2000, help='Ayrıştırılacak mesaj sayısı')
+        parser.add_argument('--body-kb', type=int, default=20, help='Mesaj gövdesi boyutu (KB)')
+        parser.add_argument('--attachment-kb', type=int, default=200, help='Ek boyutu (KB)')
+
+    def handle(self, *args, **options):
+        count = options['emails']
+        self.stdout.write(
+            f"{count} mesaj, gövde {options['body_kb']} KB, ek {options['attachment_kb']} KB"
+        )
+
+        # Tepe RSS süreç başına ölçüldüğü için her mod ayrı bir süreçte çalışır
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        rows = []
+
+        for mode in ('legacy', 'record'):
+            process = context.Process(
+                target=_run_mode,
+                args=(mode, count, options['body_kb'], options['attachment_kb'], results)
+            )
+            process.start()
+            rows.append(results.get())
+            process.join()
+
+        self.stdout.write(f"{'Mod':<8} {'Süre (sn)':>10} {'RSS artışı (MB)':>16} {'MB / 1k mail':>13}")
+        for row in rows:
+            growth_mb = row['rss_growth_kb'] / 1024
+            per_1k = growth_mb * 1000 / row['emails'] if row['emails'] else 0.0
+            self.stdout.write(f"{row['mode']:<8} {row['elapsed']:>10.2f} {growth_mb:>16.1f} {per_1k:>13.2f}")
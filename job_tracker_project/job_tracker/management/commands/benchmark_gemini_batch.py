@@ -0,0 +1,99 @@
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from job_tracker.email_record import EmailRecord
+from job_tracker.gemini_service import GeminiService
+from job_tracker.management.commands.benchmark_gemini_modes import SAMPLE_EMAILS
+
+
+class Command(BaseCommand):
+    help = "Batch analizde grup boyutuna (K) göre e-posta başına token ve dakikadaki e-posta sayısını ölçer"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1,5,10,20', help='Denenecek grup boyutları (virgülle ayrılmış)')
+        parser.add_argument('--emails', type=int, default=40, help='Her boyutta analiz edilecek e-posta sayısı')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='API çağrısı yapmadan prompt boyutlarından token tahmini yap')
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError("--sizes tam sayılardan oluşmalı, ör. 1,5,10,20")
+        if not sizes or min(sizes) < 1:
+            raise CommandError("Grup boyutları 1 veya daha büyük olmalı")
+
+        emails = self._build_emails(options['emails'])
+        self.stdout.write(f"{len(emails)} e-posta, grup boyutları: {', '.join(map(str, sizes))}")
+
+        if options['dry_run']:
+            self._estimate(emails, sizes)
+            return
+
+        self.stdout.write(f"{'K':>4} {'Çağrı':>6} {'Girdi tok.':>11} {'Çıktı tok.':>11} {'Tok./mail':>10} {'Mail/dk':>8}")
+        for size in sizes:
+            service = GeminiService(cache_ttl=0, use_templates=False)  # Ölçüm gerçek model çağrılarıyla yapılmalı
+            service.analysis_mode = 'batch'
+            start = time.perf_counter()
+
+            for group in self._chunks(emails, size):
+                if len(group) == 1:
+                    service.analyze_email(group[0].subject, group[0].body, group[0].sender)
+                else:
+                    service.analyze_batch([(e.id, e.subject, e.body, e.sender) for e in group])
+
+            elapsed = time.perf_counter() - start
+            usage = service.usage
+            total_tokens = usage['prompt_tokens'] + usage['output_tokens']
+            self.stdout.write(
+                f"{size:>4} {usage['calls']:>6} {usage['prompt_tokens']:>11} {usage['output_tokens']:>11} "
+                f"{total_tokens / len(emails):>10.0f} {len(emails) * 60 / elapsed:>8.1f}"
+            )
+
+    def _build_emails(self, count):
+        """Örnek e-postaları benzersiz ID'lerle `count` adede tamamla"""
+        emails = []
+        for index in range(count):
+            subject, sender, body = SAMPLE_EMAILS[index % len(SAMPLE_EMAILS)]
+            emails.append(EmailRecord.create(
+                id=f'bench{index:05d}', subject=subject, sender=sender,
+                sender_email=GeminiService._extract_email_from_sender(sender),
+                date=datetime.now(), body=body, is_read=True
+            ))
+        return emails
+
+    @staticmethod
+    def _chunks(emails, size):
+        for start in range(0, len(emails), size):
+            yield emails[start:start + size]
+
+    def _estimate(self, emails, sizes):
+        """Model çağrısı yapmadan her grup boyutunun göndereceği prompt'ların token tahmini (~4 karakter/token)"""
+        service = GeminiService()
+
+        self.stdout.write(f"{'K':>4} {'Çağrı':>6} {'Girdi tok. (tahmini)':>21} {'Tok./mail':>10}")
+        for size in sizes:
+            calls = tokens = 0
+            for group in self._chunks(emails, size):
+                candidates = []
+                for email_data in group:
+                    sender_email = service._extract_email_from_sender(email_data.sender)
+                    rule_result = service._apply_rule_filters(email_data.subject, email_data.body, sender_email)
+                    if rule_result is not False:
+                        candidates.append((email_data.id, email_data.subject, email_data.body,
+                                           email_data.sender, sender_email, rule_result))
+
+                if len(candidates) == 1:
+                    _, subject, body, _, sender_email, _ = candidates[0]
+                    prompt = service._create_unified_analysis_prompt(subject, body, sender_email)
+                elif candidates:
+                    prompt = service._create_batch_analysis_prompt(candidates)
+                else:
+                    continue
+
+                calls += 1
+                tokens += len(prompt) // 4
+
+            self.stdout.write(f"{size:>4} {calls:>6} {tokens:>21} {tokens / len(emails):>10.0f}")
@@ -0,0 +1,148 @@
+import time
+from datetime import datetime
+
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+
+from job_tracker.email_record import EmailRecord
+from job_tracker.gemini_service import GeminiService
+
+# Gerçek posta kutusu olmadan da çalışabilmek için örnek e-postalar
+SAMPLE_EMAILS = [
+    ('Başvurunuz alındı - Yazılım Geliştirici', 'İK <ik@ornek-sirket.com>',
+     'Merhaba, Ornek Teknoloji A.Ş. bünyesindeki Yazılım Geliştirici pozisyonu için başvurunuz alınmıştır. '
+     'Başvurunuz değerlendirildikten sonra sizinle iletişime geçeceğiz. İstanbul ofisimiz için aday arıyoruz.'),
+    ('Mülakat Daveti: Data Analyst', 'Talent <talent@veribank.com>',
+     'Merhaba, VeriBank Data Analyst başvurunuz için sizi online görüşmeye davet etmek isteriz. '
+     'Önümüzdeki hafta müsaitliğinizi paylaşabilir misiniz? Pozisyon Ankara merkezlidir.'),
+    ('Başvurunuz hakkında', 'Kariyer <careers@eticaretsepeti.com>',
+     'Merhaba, Backend Developer pozisyonuna gösterdiğiniz ilgi için teşekkür ederiz. Maalesef bu aşamada '
+     'başka bir adayla ilerleme kararı aldık. Kariyerinizde başarılar dileriz.'),
+    ('İş Teklifi - Ürün Yöneticisi', 'HR <hr@bulutyazilim.com>',
+     'Tebrikler! Bulut Yazılım olarak Ürün Yöneticisi pozisyonu için size iş teklifimizi sunmaktan mutluluk '
+     'duyuyoruz. Maaş teklifi ve sözleşme ektedir. Çalışma şekli hibrit, İzmir.'),
+    ('başvurunuz TeknolojiBank şirketine gönderildi', 'LinkedIn <jobs-noreply@linkedin.com>',
+     'Data Scientist\nTeknolojiBank\nAnkara, Türkiye\nBaşvurunuz gönderildi.'),
+    ('Application under review: Frontend Engineer', 'Hiring <hiring@globex.com>',
+     'Hi, thank you for your application for the Frontend Engineer role at Globex. Your application is '
+     'currently under review by our hiring team. Location: Remote.'),
+    ('Size uygun iş ilanları', 'Kariyer.net <aday@e.kariyer.net>',
+     'Yeni iş ilanı: Size özel iş fırsatları bu hafta yayınlandı. Hemen başvurun!'),
+    ('Haftalık bülten', 'Haberler <bulten@haberportali.com>',
+     'Bu haftanın en çok okunan haberleri, kampanyalar ve indirimler.'),
+]
+
+
+class Command(BaseCommand):
+    help = "Gemini analizinde üç çağrılı (separate) ve tek çağrılı (unified) modu token, süre ve uyum açısından karşılaştırır"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--csv', help='Örnek yerine kullanılacak e-posta CSV dosyası (gmail_emails_*.csv)')
+        parser.add_argument('--limit', type=int, default=50, help='Karşılaştırılacak en fazla e-posta sayısı')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='API çağrısı yapmadan prompt boyutlarından token tahmini yap')
+
+    def handle(self, *args, **options):
+        emails = self._load_emails(options['csv'])[:options['limit']]
+        if not emails:
+            raise CommandError("Karşılaştırılacak e-posta bulunamadı")
+
+        self.stdout.write(f"{len(emails)} e-posta karşılaştırılıyor")
+
+        if options['dry_run']:
+            self._estimate(emails)
+            return
+
+        results = {}
+        for mode in ('separate', 'unified'):
+            service = GeminiService(cache_ttl=0, use_templates=False)  # Ölçüm gerçek model çağrılarıyla yapılmalı
+            service.analysis_mode = mode
+            outputs = []
+            start = time.perf_counter()
+
+            for email_data in emails:
+                outputs.append(service.analyze_email(email_data.subject, email_data.body, email_data.sender))
+
+            results[mode] = {
+                'outputs': outputs,
+                'elapsed': time.perf_counter() - start,
+                'usage': dict(service.usage),
+            }
+
+        self.stdout.write(f"{'Mod':<10} {'Çağrı':>6} {'Girdi tok.':>11} {'Çıktı tok.':>11} {'Tok./mail':>10} {'ms/mail':>8}")
+        for mode, result in results.items():
+            usage = result['usage']
+            total_tokens = usage['prompt_tokens'] + usage['output_tokens']
+            self.stdout.write(
+                f"{mode:<10} {usage['calls']:>6} {usage['prompt_tokens']:>11} {usage['output_tokens']:>11} "
+                f"{total_tokens / len(emails):>10.0f} {result['elapsed'] * 1000 / len(emails):>8.0f}"
+            )
+
+        self._report_agreement(results['separate']['outputs'], results['unified']['outputs'])
+
+    def _load_emails(self, csv_path):
+        if not csv_path:
+            return [
+                EmailRecord.create(
+                    id=str(index), subject=subject, sender=sender,
+                    sender_email=GeminiService._extract_email_from_sender(sender),
+                    date=datetime.now(), body=body, is_read=True
+                )
+                for index, (subject, sender, body) in enumerate(SAMPLE_EMAILS)
+            ]
+
+        df = pd.read_csv(csv_path, encoding='utf-8-sig')
+        return [
+            EmailRecord.create(
+                id=row['id'], subject=row['subject'], sender=row['sender'], sender_email=row['sender_email'],
+                date=datetime.now(), body=row['body_full'], is_read=row['is_read']
+            )
+            for _, row in df.iterrows()
+        ]
+
+    def _estimate(self, emails):
+        """Model çağrısı yapmadan her modun göndereceği prompt'ların token tahmini (~4 karakter/token)"""
+        service = GeminiService()
+        totals = {'separate': [0, 0], 'unified': [0, 0]}  # [çağrı, tahmini girdi token]
+
+        for email_data in emails:
+            sender_email = service._extract_email_from_sender(email_data.sender)
+            rule_result = service._apply_rule_filters(email_data.subject, email_data.body, sender_email)
+            if rule_result is False:
+                continue
+
+            # En kötü durum: model maili iş başvurusu olarak işaretler
+            separate_prompts = [
+                service._create_status_classification_prompt(email_data.subject, email_data.body),
+                service._create_job_extraction_prompt(email_data.subject, email_data.body, sender_email, 'received'),
+            ]
+            if rule_result is None:
+                separate_prompts.append(
+                    service._create_job_detection_prompt(email_data.subject, email_data.body, sender_email)
+                )
+
+            totals['separate'][0] += len(separate_prompts)
+            totals['separate'][1] += sum(len(prompt) for prompt in separate_prompts) // 4
+            totals['unified'][0] += 1
+            totals['unified'][1] += len(
+                service._create_unified_analysis_prompt(email_data.subject, email_data.body, sender_email)
+            ) // 4
+
+        self.stdout.write(f"{'Mod':<10} {'Çağrı':>6} {'Girdi tok. (tahmini)':>21} {'Tok./mail':>10}")
+        for mode, (calls, tokens) in totals.items():
+            self.stdout.write(f"{mode:<10} {calls:>6} {tokens:>21} {tokens / len(emails):>10.0f}")
+
+    def _report_agreement(self, separate, unified):
+        """İki modun kararlarının ne kadar örtüştüğünü yazdır"""
+        total = len(separate)
+        both_job = [(a[1], b[1]) for a, b in zip(separate, unified) if a[0] and b[0]]
+
+        is_job_match = sum(1 for a, b in zip(separate, unified) if a[0] == b[0])
+        self.stdout.write(f"is_job uyumu: {is_job_match}/{total}")
+
+        for field in ('status', 'company_name', 'position', 'location'):
+            matches = sum(
+                1 for a, b in both_job
+                if str(a.get(field, '')).strip().lower() == str(b.get(field, '')).strip().lower()
+            )
+            self.stdout.write(f"{field} uyumu (iki modda da iş başvurusu olanlar): {matches}/{len(both_job)}")
@@ -0,0 +1,185 @@
+import base64
+import json
+import re
+import threading
+import time
+import urllib.parse
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httplib2
+from django.core.management.base import BaseCommand
+from googleapiclient.discovery import build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+from job_tracker.gmail_service import GmailService
+
+MESSAGE_PATH = re.compile(r'^/gmail/v1/users/me/messages/([^/?]+)')
+
+
+def _fake_message(message_id):
+    """Gerçekçi boyutta sahte bir Gmail mesajı üret"""
+    body = (f"Merhaba, Yazılım Geliştirici pozisyonu için başvurunuz alınmıştır. Mesaj {message_id}. " * 40)
+    return {
+        'id': message_id,
+        'threadId': message_id,
+        'labelIds': ['INBOX', 'CATEGORY_PERSONAL'],
+        'payload': {
+            'mimeType': 'text/plain',
+            'headers': [
+                {'name': 'Subject', 'value': f'Başvurunuz alındı #{message_id}'},
+                {'name': 'From', 'value': 'İK <ik@ornek-sirket.com>'},
+                {'name': 'Date', 'value': 'Mon, 1 Sep 2025 10:00:00 +0300'},
+            ],
+            'body': {'data': base64.urlsafe_b64encode(body.encode('utf-8')).decode('ascii')},
+        },
+    }
+
+
+class FakeGmailHandler(BaseHTTPRequestHandler):
+    """messages.get ve /batch/gmail/v1 uç noktalarını taklit eden basit HTTP sunucusu"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _message_response(self, path):
+        """(status, json_body) döndür; error_every ile belirli mesajlar 404 alır"""
+        match = MESSAGE_PATH.match(path)
+        if not match:
+            return 404, {'error': {'code': 404, 'message': 'Not Found'}}
+
+        message_id = match.group(1)
+        error_every = self.server.error_every
+        if error_every and int(message_id) % error_every == 0:
+            return 404, {'error': {'code': 404, 'message': 'Requested entity was not found.'}}
+
+        message = _fake_message(message_id)
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(path).query)
+        if query.get('format') == ['metadata']:
+            # metadata formatında gövde ve part'lar dönmez
+            message['payload'].pop('body')
+
+        return 200, message
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.count_round_trip()
+        time.sleep(self.server.latency)
+        status, payload = self._message_response(self.path)
+        self._send(status, json.dumps(payload).encode('utf-8'), 'application/json; charset=UTF-8')
+
+    def do_POST(self):
+        self.server.count_round_trip()
+        time.sleep(self.server.latency)
+
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length)
+        content_type = self.headers.get('Content-Type')
+        multipart = BytesParser(policy=HTTP).parsebytes(
+            f'Content-Type: {content_type}\r\n\r\n'.encode('ascii') + raw
+        )
+
+        boundary = 'batch_fake_gmail_boundary'
+        parts = []
+        for part in multipart.iter_parts():
+            request_line = part.get_payload().lstrip().split('\n', 1)[0]
+            path = request_line.split(' ')[1]
+            status, payload = self._message_response(path)
+            content_id = part['Content-ID'].strip('<>')
+            reason = 'OK' if status == 200 else 'Not Found'
+            parts.append(
+                f'--{boundary}\r\n'
+                f'Content-Type: application/http\r\n'
+                f'Content-ID: <response-{content_id}>\r\n\r\n'
+                f'HTTP/1.1 {status} {reason}\r\n'
+                f'Content-Type: application/json; charset=UTF-8\r\n\r\n'
+                f'{json.dumps(payload)}\r\n'
+            )
+
+        body = (''.join(parts) + f'--{boundary}--\r\n').encode('utf-8')
+        self._send(200, body, f'multipart/mixed; boundary={boundary}')
+
+
+class FakeGmailServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency, error_every):
+        super().__init__(('127.0.0.1', 0), FakeGmailHandler)
+        self.latency = latency
+        self.error_every = error_every
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def count_round_trip(self):
+        with self._lock:
+            self.round_trips += 1
+
+
+class BenchmarkGmailService(GmailService):
+    """OAuth yerine sahte sunucuya bağlanan GmailService"""
+
+    def __init__(self, root_url, **kwargs):
+        self.root_url = root_url
+        super().__init__(**kwargs)
+
+    def authenticate(self):
+        self.service = self._build_service()
+
+    def _build_service(self):
+        document = json.loads(get_static_doc('gmail', 'v1'))
+        document['rootUrl'] = self.root_url
+        return build_from_document(document, http=httplib2.Http(timeout=30))
+
+
+class Command(BaseCommand):
+    help = "Sahte bir Gmail sunucusuna karşı seri, eşzamanlı ve batch mesaj çekme yollarını karşılaştırır"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--messages', type=int, default=500, help='Çekilecek mesaj sayısı')
+        parser.add_argument('--latency', type=float, default=20, help='Sunucu gecikmesi (ms, istek başına)')
+        parser.add_argument('--batch-size', type=int, default=50, help='Batch modunda istek başına mesaj sayısı')
+        parser.add_argument('--concurrency', type=int, default=8, help='Eşzamanlı modda uçuştaki istek sayısı')
+        parser.add_argument('--error-every', type=int, default=0,
+                            help='Her N. mesaj 404 döner (batch içi hata yönetimini ölçmek için)')
+
+    def handle(self, *args, **options):
+        server = FakeGmailServer(options['latency'] / 1000.0, options['error_every'])
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        root_url = f'http://127.0.0.1:{server.server_address[1]}/'
+        message_ids = [str(i) for i in range(1, options['messages'] + 1)]
+
+        self.stdout.write(
+            f"{len(message_ids)} mesaj, sunucu gecikmesi {options['latency']:.0f} ms, sunucu: {root_url}"
+        )
+        self.stdout.write(f"{'Yol':<12}{'HTTP isteği':>14}{'Süre (sn)':>12}{'Mesaj/sn':>12}{'Başarılı':>10}")
+
+        try:
+            for mode in ('serial', 'concurrent', 'batch'):
+                gmail = BenchmarkGmailService(root_url)
+                gmail.fetch_concurrency = options['concurrency']
+                gmail.batch_size = options['batch_size']
+                server.round_trips = 0
+                start = time.perf_counter()
+
+                if mode == 'serial':
+                    emails = [e for e in (gmail.get_email_details(i) for i in message_ids) if e]
+                else:
+                    gmail.fetch_mode = mode
+                    emails = list(gmail.fetch_emails(message_ids))
+
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"{mode:<12}{server.round_trips:>14}{elapsed:>12.2f}"
+                    f"{len(emails) / elapsed:>12.1f}{len(emails):>10}"
+                )
+        finally:
+            server.shutdown()
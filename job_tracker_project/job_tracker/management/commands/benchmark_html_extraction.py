@@ -0,0 +1,122 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from job_tracker.email_record import EmailRecord
+from job_tracker.html_text import html_to_text
+from job_tracker.management.commands.benchmark_email_memory import OfflineGmailService
+from job_tracker.management.commands.benchmark_text_normalization import PARAGRAPHS
+
+# Ayrıştırıcıyı zorlayan durumlar: iç içe/kapanmamış script-style, yorumlar, entity'ler, bozuk etiketler
+EDGE_CASES = (
+    '',
+    'düz metin, etiket yok',
+    '<p>Merhaba &amp; hoş geldiniz&nbsp;&copy; &#304;stanbul &#x130;K</p>',
+    '<script>var a = "<script>içteki</script>"; kalan()</script><p>görünen</p>',
+    '<style>p { color: red; }</style><div>stil sonrası</div><style>kapanmamış stil',
+    '<p>önce</p><!-- yorum <b>gizli</b> --><p>sonra</p>',
+    '<table><tr><td>Yazılım Geliştirici</td><td>Ornek A.Ş.</td></tr><tr><td>İstanbul</td></tr></table>',
+    'satır<br>satır<br/>satır<hr/>son',
+    '<p>kapanmamış <b>kalın <i>italik</p> devam',
+    '<div<p>bozuk etiket</p> > < &lt; metin',
+    '<!DOCTYPE html><html><head><title>Başlık</title></head><body>gövde</body></html>',
+)
+
+
+def _marketing_email(rng, target_chars):
+    """Inline stil, takip pikselleri ve iç içe tablolarla şişmiş pazarlama HTML'i üret"""
+    parts = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8"><title>İş fırsatları</title>',
+        '<style>' + 'td.c%d { padding: 4px; font-family: Arial; }\n' * 40 + '</style>',
+        '<script type="text/javascript">var tracking = {"id": 1, "html": "<div>x</div>"};</script>',
+        '</head><body><table width="100%" cellpadding="0" cellspacing="0" border="0">',
+    ]
+    length = sum(len(part) for part in parts)
+    while length < target_chars:
+        paragraph = rng.choice(PARAGRAPHS)
+        link = f'https://www.linkedin.com/comm/jobs/view/{rng.randrange(10 ** 9)}?trackingId={rng.randrange(10 ** 12)}'
+        row = (
+            '<tr><td style="padding:0;margin:0;font-family:Helvetica,Arial,sans-serif;font-size:14px;color:#191919">'
+            f'<table width="100%"><tr><td class="c1"><a href="{link}" style="color:#0a66c2;text-decoration:none">'
+            f'{paragraph}</a></td></tr><tr><td><img src="{link}&amp;pixel=1" width="1" height="1" alt="">'
+            f'&nbsp;&middot;&nbsp;Detaylar</td></tr></table></td></tr>\n'
+        )
+        parts.append(row)
+        length += len(row)
+    parts.append('<tr><td>Unsubscribe &copy; 2025</td></tr></table></body></html>')
+    return ''.join(parts)
+
+
+def _beautifulsoup_text(html_content):
+    """GmailService._clean_html_content'in önceki hali (BeautifulSoup, html.parser)"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_content, 'html.parser')
+
+    for script in soup(["script", "style"]):
+        script.decompose()
+
+    return soup.get_text()
+
+
+def _tokens(text):
+    """Karşılaştırma için boşluksuz metin (yeni ayrıştırıcı blok sınırlarına ayraç ekler)"""
+    return ''.join(text.split())
+
+
+class Command(BaseCommand):
+    help = "HTML e-posta gövdesinden metin çıkarmayı BeautifulSoup ve akış halindeki HTMLParser için karşılaştırır"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--emails', type=int, default=200, help='Üretilecek HTML e-posta sayısı')
+        parser.add_argument('--body-kb', type=int, default=200, help='HTML gövde boyutu (KB)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['emails'] < 1:
+            raise CommandError("--emails en az 1 olmalı")
+        try:
+            import bs4  # noqa: F401
+        except ImportError:
+            raise CommandError("Karşılaştırma için beautifulsoup4 kurulu olmalı")
+
+        service = OfflineGmailService()
+        rng = random.Random(options['seed'])
+        bodies = [_marketing_email(rng, options['body_kb'] * 1024) for _ in range(options['emails'])]
+        bodies.extend(EDGE_CASES)
+        self.stdout.write(f"{len(bodies)} HTML gövde (ortalama {sum(map(len, bodies)) / len(bodies) / 1024:.0f} KB)")
+
+        methods = (
+            ('bs4', _beautifulsoup_text),
+            ('htmlparser', html_to_text),
+            ('htmlparser+limit', service._clean_html_content),
+        )
+        results = {}
+        for name, extract in methods:
+            start = time.perf_counter()
+            outputs = [extract(body) for body in bodies]
+            results[name] = (time.perf_counter() - start, outputs)
+
+        # Limitsiz çıktı BeautifulSoup ile aynı metni vermeli (sadece boşluklar farklı olabilir)
+        mismatches = [
+            index for index, (a, b) in enumerate(zip(results['bs4'][1], results['htmlparser'][1]))
+            if _tokens(a) != _tokens(b)
+        ]
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} gövdede metin farklı (ilk: #{mismatches[0]})")
+
+        # Limitli yol, saklanan (normalize edilip kısaltılmış) gövdeyi değiştirmemeli
+        stored_length = EmailRecord.BODY_MAX_LENGTH
+        stored_mismatches = sum(
+            1 for a, b in zip(results['htmlparser'][1], results['htmlparser+limit'][1])
+            if service._clean_and_normalize_text(a)[:stored_length] != service._clean_and_normalize_text(b)[:stored_length]
+        )
+
+        bs4_elapsed = results['bs4'][0]
+        self.stdout.write(f"{'Yöntem':<18} {'Toplam (sn)':>12} {'ms/mail':>9} {'Hızlanma':>9}")
+        for name, (elapsed, _) in results.items():
+            self.stdout.write(
+                f"{name:<18} {elapsed:>12.2f} {elapsed * 1000 / len(bodies):>9.2f} {bs4_elapsed / elapsed:>8.1f}x"
+            )
+        self.stdout.write("Limitsiz çıktılar BeautifulSoup ile aynı metni veriyor")
+        self.stdout.write(f"Limitli yolda saklanan gövdesi değişen e-posta: {stored_mismatches}")
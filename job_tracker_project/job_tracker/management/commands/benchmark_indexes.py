@@ -0,0 +1,228 @@
+import contextlib
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Model
+from django.utils import timezone
+
+from job_tracker import analytics
+from job_tracker.management.commands.benchmark_text_normalization import PARAGRAPHS
+from job_tracker.models import ApplicationStats, JobApplication
+
+BENCHMARK_ALIAS = 'index_benchmark'
+MIGRATION_BEFORE = '0009_applicationstats'
+MIGRATION_AFTER = '0010_jobapplication_user_indexes'
+SEED_BATCH_SIZE = 50_000
+
+COMPANIES = ('Ornek', 'Acme', 'Globex', 'Initech', 'Umbrella', 'Hooli', 'Stark', 'Wayne', 'Wonka', 'Tyrell')
+POSITIONS = ('Yazılım Geliştirici', 'Backend Geliştirici', 'Veri Analisti', 'DevOps Mühendisi', 'Ürün Yöneticisi')
+STATUSES = [status for status, _ in JobApplication.STATUS_CHOICES]
+
+# Görünümlerin ve ApplicationStats.rebuild'in JobApplication üzerinde çalıştırdığı sorgular.
+# Her biri tek kullanıcının başvurularıyla (filter(user=...)) çağrılır.
+VIEW_QUERIES = (
+    ('dashboard: son 5 başvuru', lambda apps: list(apps.order_by('-created_at')[:5])),
+    ('liste: ilk sayfa', lambda apps: list(apps.order_by('-created_at')[:20])),
+    ('liste: 50. sayfa', lambda apps: list(apps.order_by('-created_at')[980:1000])),
+    ('liste: filtreli sayım', lambda apps: apps.count()),
+    ('liste: durum filtresi', lambda apps: list(apps.filter(status='interview').order_by('-created_at')[:20])),
+    ('liste: durum sayımı', lambda apps: apps.filter(status='interview').count()),
+    ('varsayılan sıralama', lambda apps: list(apps[:20])),
+    ('export', lambda apps: list(
+        apps.order_by('-created_at').values_list('company_name', 'position', 'status', 'application_date')
+    )),
+    ('istatistik: şirket/durum', analytics.company_status_counts),
+    ('istatistik: aylık', analytics.monthly_counts),
+    ('istatistik: haftalık', analytics.weekly_counts),
+    ('istatistik: son günler', lambda apps: analytics.recent_day_counts(
+        apps, ApplicationStats.DAILY_RETENTION_DAYS + 1
+    )),
+)
+
+
+def _comparable(result):
+    """Model listelerini pk listesine çevir; iki aşamanın sonuçları bununla karşılaştırılır"""
+    if isinstance(result, list) and result and isinstance(result[0], Model):
+        return [obj.pk for obj in result]
+    return result
+
+
+@contextlib.contextmanager
+def temporary_database(prefix):
+    """
+    BENCHMARK_ALIAS'ı geçici bir SQLite dosyasına bağla; çıkışta bağlantıyı kapatıp dosyayı sil.
+
+    Geliştirme veritabanına dokunmadan milyonlarca satırla ölçüm yapmak için.
+    """
+    handle, path = tempfile.mkstemp(prefix=prefix, suffix='.sqlite3')
+    os.close(handle)
+    try:
+        connections.settings[BENCHMARK_ALIAS] = connections.configure_settings({
+            'default': connections.settings['default'],
+            BENCHMARK_ALIAS: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path},
+        })[BENCHMARK_ALIAS]
+        yield path
+    finally:
+        if BENCHMARK_ALIAS in connections.settings:
+            connections[BENCHMARK_ALIAS].close()
+            del connections[BENCHMARK_ALIAS]
+            del connections.settings[BENCHMARK_ALIAS]
+        for suffix in ('', '-journal', '-wal', '-shm'):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path + suffix)
+
+
+def seed_applications(rows, users, rng):
+    """
+    BENCHMARK_ALIAS'a `users` kullanıcı ve aralarında eşit dağılmış `rows` başvuru yaz.
+
+    ORM'i atlayıp executemany kullanır (sinyaller, istatistik satırı ve arama indeksi
+    güncellenmez; arama ölçülecekse indeks ayrıca kurulmalı). Kullanıcı ID'lerini döndürür.
+    """
+    connection = connections[BENCHMARK_ALIAS]
+    User.objects.using(BENCHMARK_ALIAS).bulk_create(
+        User(username=f'benchmark_{index}') for index in range(users)
+    )
+    user_ids = list(User.objects.using(BENCHMARK_ALIAS).order_by('pk').values_list('pk', flat=True))
+
+    fields = [field for field in JobApplication._meta.concrete_fields if not field.primary_key]
+    quote_name = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote_name(JobApplication._meta.db_table),
+        ', '.join(quote_name(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    adapt_datetime = connection.ops.adapt_datetimefield_value
+    now = timezone.now()
+
+    def row(index):
+        created_at = now - timedelta(minutes=rng.randrange(2 * 365 * 24 * 60))
+        company = f'{rng.choice(COMPANIES)} {rng.randrange(300)}'
+        values = {
+            'user_id': user_ids[index % users],
+            'company_name': company,
+            'position': rng.choice(POSITIONS),
+            'email_sender': f'ik@{company.split()[0].lower()}.com',
+            'application_date': adapt_datetime(created_at - timedelta(hours=rng.randrange(72))),
+            'status': rng.choice(STATUSES),
+            'email_subject': f'{company} başvurunuz alındı',
+            'email_content': ' '.join(rng.sample(PARAGRAPHS, 2)),
+            'gmail_message_id': f'msg{index:08d}',
+            'extracted_info': None,
+            'created_at': adapt_datetime(created_at),
+            'updated_at': adapt_datetime(created_at),
+        }
+        return [values[field.attname] for field in fields]
+
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode = OFF')
+        cursor.execute('PRAGMA synchronous = OFF')
+        for offset in range(0, rows, SEED_BATCH_SIZE):
+            batch = [row(index) for index in range(offset, min(offset + SEED_BATCH_SIZE, rows))]
+            cursor.executemany(sql, batch)
+    analyze()
+    return user_ids
+
+
+def analyze():
+    """Planlayıcı istatistiklerini güncelle (seed ve şema değişikliklerinden sonra)"""
+    with connections[BENCHMARK_ALIAS].cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+class Command(BaseCommand):
+    help = (
+        "JobApplication kullanıcı indekslerini (0010) geçici bir SQLite veritabanında ölçer: "
+        "seed edilen veride görünüm sorgularının EXPLAIN planlarını ve sürelerini indeksler öncesi/sonrası raporlar"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Seed edilecek başvuru sayısı')
+        parser.add_argument('--users', type=int, default=20, help='Başvuruların dağıtılacağı kullanıcı sayısı')
+        parser.add_argument('--repeat', type=int, default=5, help='Her sorgunun tekrar sayısı (medyan alınır)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['users'] < 1 or options['repeat'] < 1:
+            raise CommandError("--rows, --users ve --repeat en az 1 olmalı")
+
+        with temporary_database('job_tracker_indexes_') as path:
+            self._run(path, options)
+
+    def _run(self, path, options):
+        call_command('migrate', 'auth', database=BENCHMARK_ALIAS, verbosity=0)
+        call_command('migrate', 'job_tracker', MIGRATION_BEFORE, database=BENCHMARK_ALIAS, verbosity=0)
+
+        start = time.perf_counter()
+        user_ids = seed_applications(options['rows'], options['users'], random.Random(options['seed']))
+        self.stdout.write(
+            f"{options['rows']} başvuru, {options['users']} kullanıcı seed edildi "
+            f"({time.perf_counter() - start:.1f} sn, {os.path.getsize(path) / 1024 ** 2:.0f} MB, {path})"
+        )
+
+        applications = JobApplication.objects.using(BENCHMARK_ALIAS).filter(user_id=user_ids[0])
+        self.stdout.write(f"Ölçülen kullanıcının başvuru sayısı: {applications.count()}")
+
+        before = self._measure(applications, options['repeat'])
+
+        start = time.perf_counter()
+        call_command('migrate', 'job_tracker', MIGRATION_AFTER, database=BENCHMARK_ALIAS, verbosity=0)
+        analyze()
+        self.stdout.write(f"İndeksler oluşturuldu ({time.perf_counter() - start:.1f} sn)")
+
+        after = self._measure(applications, options['repeat'])
+
+        mismatches = [label for label in before if before[label]['result'] != after[label]['result']]
+        if mismatches:
+            raise CommandError(f"İndeksler sonrası sonucu değişen sorgular: {', '.join(mismatches)}")
+
+        self.stdout.write(f"\n{'Sorgu':<26} {'Önce (ms)':>10} {'Sonra (ms)':>11} {'Hızlanma':>9}")
+        for label in before:
+            before_ms, after_ms = before[label]['ms'], after[label]['ms']
+            self.stdout.write(f"{label:<26} {before_ms:>10.2f} {after_ms:>11.2f} {before_ms / after_ms:>8.1f}x")
+
+        self.stdout.write("\nEXPLAIN QUERY PLAN")
+        for label in before:
+            self.stdout.write(f"{label}:")
+            self.stdout.write(f"  önce:  {before[label]['plan']}")
+            self.stdout.write(f"  sonra: {after[label]['plan']}")
+        self.stdout.write("\nTüm sorgular indeksler öncesi ve sonrası aynı sonucu döndürdü")
+
+    def _measure(self, applications, repeat):
+        connection = connections[BENCHMARK_ALIAS]
+        results = {}
+        for label, query in VIEW_QUERIES:
+            executed = []
+
+            def wrapper(execute, sql, params, many, context):
+                executed.append((sql, params))
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(wrapper):
+                result = query(applications)
+
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                query(applications)
+                timings.append(time.perf_counter() - start)
+
+            results[label] = {
+                'result': _comparable(result),
+                'ms': statistics.median(timings) * 1000,
+                'plan': ' ; '.join(self._explain(connection, sql, params) for sql, params in executed),
+            }
+        return results
+
+    def _explain(self, connection, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return ' | '.join(detail for *_, detail in cursor.fetchall())
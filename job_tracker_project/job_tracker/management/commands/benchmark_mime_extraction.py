@@ -0,0 +1,187 @@
+import base64
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from job_tracker.email_record import EmailRecord
+from job_tracker.management.commands.benchmark_email_memory import OfflineGmailService
+from job_tracker.management.commands.benchmark_html_extraction import _marketing_email
+from job_tracker.management.commands.benchmark_text_normalization import PARAGRAPHS
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).decode('ascii')
+
+
+def _text_part(mime_type, text, charset='utf-8', filename=''):
+    data = text.encode(charset)
+    return {
+        'mimeType': mime_type,
+        'filename': filename,
+        'headers': [{'name': 'Content-Type', 'value': f'{mime_type}; charset="{charset}"'}],
+        'body': {'size': len(data), 'data': _b64(data)},
+    }
+
+
+def _plain_text(rng, target_chars):
+    lines = []
+    length = 0
+    while length < target_chars:
+        line = f"{rng.choice(PARAGRAPHS)}\nhttps://www.linkedin.com/comm/jobs/view/{rng.randrange(10 ** 9)}\n"
+        lines.append(line)
+        length += len(line)
+    return ''.join(lines)
+
+
+def _payload(rng, body_kb, plain):
+    """Ek, iç içe multipart/related ve büyük text/* alternatifleri olan bir Gmail payload'u"""
+    alternatives = [_text_part('text/html', _marketing_email(rng, body_kb * 1024))]
+    if plain:
+        alternatives.insert(0, _text_part('text/plain', _plain_text(rng, body_kb * 1024 // 4)))
+
+    return {
+        'mimeType': 'multipart/mixed',
+        'parts': [
+            {
+                'mimeType': 'multipart/related',
+                'parts': [
+                    {'mimeType': 'multipart/alternative', 'parts': alternatives},
+                    {'mimeType': 'image/png', 'filename': 'logo.png',
+                     'body': {'size': 4096, 'attachmentId': 'logo'}},
+                ],
+            },
+            {'mimeType': 'application/pdf', 'filename': 'ilan.pdf',
+             'body': {'size': 65536, 'data': _b64(bytes(65536))}},
+        ],
+    }
+
+
+class LegacyMimeExtractor:
+    """GmailService.extract_email_body'nin önceki hali (her parçayı tamamen çözen, codec deneyen sürüm)"""
+
+    def __init__(self, service):
+        self.service = service
+
+    def extract_email_body(self, payload):
+        body = ""
+
+        try:
+            if 'parts' in payload:
+                body = self._extract_from_multipart(payload['parts'])
+            elif payload.get('body') and 'data' in payload['body']:
+                body = self._decode_base64_content(payload['body']['data'])
+                if payload.get('mimeType') == 'text/html':
+                    body = self.service._clean_html_content(body)
+
+        except Exception as e:
+            print(f"E-posta body çıkarma hatası: {str(e)}")
+            return "İçerik okunamadı"
+
+        return self.service._clean_and_normalize_text(body)
+
+    def _extract_from_multipart(self, parts):
+        text_content = ""
+        html_content = ""
+
+        for part in parts:
+            try:
+                if 'parts' in part:
+                    nested_content = self._extract_from_multipart(part['parts'])
+                    if nested_content:
+                        return nested_content
+
+                mime_type = part.get('mimeType', '')
+                body_data = part.get('body', {})
+
+                if not body_data.get('data'):
+                    continue
+
+                decoded_content = self._decode_base64_content(body_data['data'])
+
+                if mime_type == 'text/plain':
+                    text_content = decoded_content
+                    break
+                elif mime_type == 'text/html' and not text_content:
+                    html_content = decoded_content
+                elif mime_type.startswith('text/') and not text_content and not html_content:
+                    text_content = decoded_content
+
+            except Exception as e:
+                print(f"Part işleme hatası: {str(e)}")
+                continue
+
+        if text_content:
+            return text_content
+        elif html_content:
+            return self.service._clean_html_content(html_content)
+
+        return ""
+
+    def _decode_base64_content(self, data):
+        try:
+            decoded_bytes = base64.urlsafe_b64decode(data)
+
+            try:
+                return decoded_bytes.decode('utf-8')
+            except UnicodeDecodeError:
+                try:
+                    return decoded_bytes.decode('iso-8859-1')
+                except UnicodeDecodeError:
+                    try:
+                        return decoded_bytes.decode('windows-1252')
+                    except UnicodeDecodeError:
+                        return decoded_bytes.decode('utf-8', errors='replace')
+
+        except Exception as e:
+            print(f"Base64 decode hatası: {str(e)}")
+            return ""
+
+
+class Command(BaseCommand):
+    help = "E-posta gövdesi çıkarmayı eski (tüm parçaları çözen) ve metadata ile seçip kısmi çözen yol için karşılaştırır"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--emails', type=int, default=200, help='Üretilecek mesaj sayısı')
+        parser.add_argument('--body-kb', type=int, default=200, help='HTML alternatifinin boyutu (KB)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['emails'] < 1:
+            raise CommandError("--emails en az 1 olmalı")
+
+        service = OfflineGmailService()
+        legacy = LegacyMimeExtractor(service)
+        rng = random.Random(options['seed'])
+        # Yarısı text/plain + HTML alternatifli, yarısı sadece HTML
+        payloads = [_payload(rng, options['body_kb'], plain=index % 2 == 0) for index in range(options['emails'])]
+        self.stdout.write(f"{len(payloads)} mesaj, HTML alternatifi {options['body_kb']} KB, ekli ve iç içe multipart")
+
+        results = {}
+        for name, extract in (('legacy', legacy.extract_email_body), ('walker', service.extract_email_body)):
+            start = time.perf_counter()
+            bodies = [extract(payload) for payload in payloads]
+            results[name] = (time.perf_counter() - start, bodies)
+
+        # Saklanan gövde (EmailRecord.BODY_MAX_LENGTH) aynı kalmalı
+        stored_length = EmailRecord.BODY_MAX_LENGTH
+        mismatches = [
+            index for index, (a, b) in enumerate(zip(results['legacy'][1], results['walker'][1]))
+            if a[:stored_length] != b[:stored_length]
+        ]
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} mesajda saklanan gövde farklı (ilk: #{mismatches[0]})")
+
+        legacy_elapsed = results['legacy'][0]
+        self.stdout.write(f"{'Yöntem':<8} {'Toplam (sn)':>12} {'ms/mail':>9} {'Hızlanma':>9}")
+        for name, (elapsed, _) in results.items():
+            self.stdout.write(
+                f"{name:<8} {elapsed:>12.2f} {elapsed * 1000 / len(payloads):>9.2f} {legacy_elapsed / elapsed:>8.1f}x"
+            )
+        self.stdout.write("Tüm mesajlarda saklanan gövde birebir aynı")
+
+        # Charset başlıktan okunur: eski yol ISO-8859-9 Türkçe karakterleri latin-1 sanıyordu
+        turkish = 'Başvurunuz için teşekkürler, İstanbul ofisimizde görüşmek üzere. Şirket: Ağ Yazılım'
+        payload = {'mimeType': 'multipart/alternative', 'parts': [_text_part('text/plain', turkish, 'iso-8859-9')]}
+        self.stdout.write(f"ISO-8859-9 gövde (eski):   {legacy.extract_email_body(payload)}")
+        self.stdout.write(f"ISO-8859-9 gövde (walker): {service.extract_email_body(payload)}")
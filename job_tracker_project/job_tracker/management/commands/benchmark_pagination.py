@@ -0,0 +1,85 @@
+import random
+import statistics
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.db.models.functions import Substr
+
+from job_tracker.management.commands.benchmark_indexes import (
+    BENCHMARK_ALIAS, seed_applications, temporary_database,
+)
+from job_tracker.models import JobApplication
+from job_tracker.pagination import KeysetPaginator
+from job_tracker.views import APPLICATION_LIST_FIELDS, APPLICATION_LIST_PAGE_SIZE, APPLICATION_PREVIEW_LENGTH
+
+
+class Command(BaseCommand):
+    help = (
+        "application_list sayfalamasını geçici bir SQLite veritabanında ölçer: "
+        "Paginator (COUNT + OFFSET, tüm sütunlar) ve keyset cursor (projeksiyonlu) ile derin sayfalar"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200_000, help='Ölçülen kullanıcının başvuru sayısı')
+        parser.add_argument('--pages', type=int, nargs='+', default=[1, 100, 1000, 5000], help='Ölçülen sayfa numaraları')
+        parser.add_argument('--repeat', type=int, default=5, help='Her ölçümün tekrar sayısı (medyan alınır)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['repeat'] < 1:
+            raise CommandError("--rows ve --repeat en az 1 olmalı")
+
+        with temporary_database('job_tracker_pagination_'):
+            call_command('migrate', database=BENCHMARK_ALIAS, verbosity=0)
+            user_ids = seed_applications(options['rows'], 1, random.Random(options['seed']))
+            self.stdout.write(f"{options['rows']} başvurulu kullanıcı, sayfa başına {APPLICATION_LIST_PAGE_SIZE}")
+
+            applications = JobApplication.objects.using(BENCHMARK_ALIAS).filter(user_id=user_ids[0])
+            # Aynı created_at'li satırların sırası iki yöntemde de id ile sabitlenir
+            legacy_queryset = applications.order_by('-created_at', '-id')
+            keyset = KeysetPaginator(
+                applications.only(*APPLICATION_LIST_FIELDS)
+                .annotate(content_preview=Substr('email_content', 1, APPLICATION_PREVIEW_LENGTH + 1))
+                .order_by('-created_at', '-id'),
+                APPLICATION_LIST_PAGE_SIZE,
+            )
+            cursors = self._cursors(keyset, max(options['pages']))
+
+            self.stdout.write(f"{'Sayfa':>6} {'Paginator (ms)':>15} {'Keyset (ms)':>12} {'Hızlanma':>9}")
+            for number in sorted(options['pages']):
+                if number - 1 >= len(cursors):
+                    continue
+
+                def legacy_page():
+                    # Paginator.get_page: COUNT(*) + OFFSET'li sayfa
+                    paginator = Paginator(legacy_queryset, APPLICATION_LIST_PAGE_SIZE)
+                    return [obj.pk for obj in paginator.get_page(number)]
+
+                def keyset_page():
+                    return [obj.pk for obj in keyset.get_page(after=cursors[number - 1])]
+
+                if legacy_page() != keyset_page():
+                    raise CommandError(f"{number}. sayfada iki yöntem farklı satırlar döndürdü")
+
+                legacy_ms, keyset_ms = self._time(legacy_page, options['repeat']), self._time(keyset_page, options['repeat'])
+                self.stdout.write(f"{number:>6} {legacy_ms:>15.2f} {keyset_ms:>12.2f} {legacy_ms / keyset_ms:>8.1f}x")
+            self.stdout.write("Tüm ölçülen sayfalarda iki yöntem aynı satırları döndürdü")
+
+    def _cursors(self, keyset, last_page):
+        """Her sayfaya ulaşmak için gereken after cursor'ları (ilk sayfa için None)"""
+        cursors = [None]
+        page = keyset.get_page()
+        while page.has_next and len(cursors) < last_page:
+            cursors.append(page.next_cursor)
+            page = keyset.get_page(after=page.next_cursor)
+        return cursors
+
+    def _time(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings) * 1000
@@ -0,0 +1,88 @@
+import random
+import statistics
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from job_tracker.management.commands.benchmark_indexes import (
+    BENCHMARK_ALIAS, seed_applications, temporary_database,
+)
+from job_tracker.models import JobApplication
+from job_tracker.search import ContainsSearchBackend, SQLiteFTSSearchBackend
+
+QUERIES = ('globex 12', 'wonka', 'veri analisti', 'devops', 'ik@hooli', 'mül', 'müsait', 'frontend engineer review')
+PAGE_SIZE = 20
+
+
+class LegacySearchBackend:
+    """application_list'in önceki araması: üç alanda icontains"""
+
+    def search(self, queryset, user, query):
+        return queryset.filter(
+            Q(company_name__icontains=query) |
+            Q(position__icontains=query) |
+            Q(email_sender__icontains=query)
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Başvuru aramasını (application_list) geçici bir SQLite veritabanında ölçer: "
+        "eski icontains, beş alanlı icontains ve FTS5 backend'i için sayım + ilk sayfa süreleri"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500_000, help='Seed edilecek başvuru sayısı')
+        parser.add_argument('--users', type=int, default=500, help='Başvuruların dağıtılacağı kullanıcı sayısı')
+        parser.add_argument('--repeat', type=int, default=5, help='Her aramanın tekrar sayısı (medyan alınır)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['rows'] < 1 or options['users'] < 1 or options['repeat'] < 1:
+            raise CommandError("--rows, --users ve --repeat en az 1 olmalı")
+
+        with temporary_database('job_tracker_search_'):
+            call_command('migrate', database=BENCHMARK_ALIAS, verbosity=0)
+
+            start = time.perf_counter()
+            user_ids = seed_applications(options['rows'], options['users'], random.Random(options['seed']))
+            seeded = time.perf_counter()
+            SQLiteFTSSearchBackend().rebuild(BENCHMARK_ALIAS)
+            self.stdout.write(
+                f"{options['rows']} başvuru, {options['users']} kullanıcı seed edildi "
+                f"({seeded - start:.1f} sn, FTS indeksi {time.perf_counter() - seeded:.1f} sn)"
+            )
+
+            user = JobApplication._meta.get_field('user').related_model(pk=user_ids[0])
+            applications = JobApplication.objects.using(BENCHMARK_ALIAS).filter(user=user).order_by('-created_at')
+            self.stdout.write(f"Aranan kullanıcının başvuru sayısı: {applications.count()}")
+
+            backends = (
+                ('icontains (eski)', LegacySearchBackend()),
+                ('icontains (5 alan)', ContainsSearchBackend()),
+                ('fts5', SQLiteFTSSearchBackend()),
+            )
+            self.stdout.write(f"\n{'Arama':<26} {'Backend':<19} {'Sonuç':>7} {'ms':>9}")
+            fts_timings = []
+            for query in QUERIES:
+                for name, backend in backends:
+                    results = backend.search(applications, user, query)
+                    elapsed, count = self._time_page(results, options['repeat'])
+                    if name == 'fts5':
+                        fts_timings.append(elapsed)
+                    self.stdout.write(f"{query:<26} {name:<19} {count:>7} {elapsed * 1000:>9.2f}")
+                self.stdout.write("")
+
+            self.stdout.write(f"FTS5 en yavaş arama: {max(fts_timings) * 1000:.2f} ms (sayım + ilk {PAGE_SIZE} sonuç)")
+
+    def _time_page(self, results, repeat):
+        """Paginator'ın yaptığı iş: toplam sayım + ilk sayfa"""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = results.count()
+            list(results[:PAGE_SIZE])
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings), count
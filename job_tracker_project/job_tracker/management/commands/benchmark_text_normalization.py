@@ -0,0 +1,125 @@
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from job_tracker.management.commands.benchmark_email_memory import OfflineGmailService
+
+# Sınır durumları: karışık büyük/küçük harfli stop ifadeleri, iç içe linkler, kontrol ve unicode boşluk karakterleri
+EDGE_CASES = (
+    '',
+    '   ',
+    'Merhaba\r\n\r\n\r\n\r\n\r\nDünya',
+    'Başvurunuz alındı. view JOB: https://x.com/1 sonrası atılır',
+    'Önce İLANI GÖRÜNTÜLE: ve sonra Görüntüle: ve unsubscribe',
+    'Görüntüle: başta',
+    'Link www.ornek.com/ahttp://b.com/c sonra https://d.com/www.e.com bitti',
+    'abchttp://xwww.y  \t son',
+    'vwww.http://x.com sonra',
+    'kontrol\x01 \x02karakter \x0b\x0c dikey\x1c\x1d\x1e\x1f ayırıcı\x85nel\xa0nbsp em\x7f\x9f',
+    '\x01  baştaki kontrol',
+    'sondaki kontrol \x01',
+    'Abonelikten Çık linki: www.x.com',
+    'İSTANBUL ofisi: İŞ İLANINI GÖRÜNTÜLEYİN: https://x.com',
+    'Vıew job: noktasız ı ile, sonra ilanı görüntüle:',
+    'UNſUBſCRIBE uzun s ile',
+    'i\u0307ş ilanını görüntüleyin: birleşik noktalı i',
+)
+
+PARAGRAPHS = (
+    'Merhaba Ayşe, Ornek Teknoloji A.Ş. bünyesindeki Yazılım Geliştirici pozisyonu için başvurunuz alınmıştır.',
+    'Hi, thank you for applying to the Frontend Engineer role at Globex. Your application is under review.',
+    'Size özel iş fırsatları:   Data Analyst  —  İstanbul,   Türkiye\t(Hibrit)',
+    'Bu e-postayı almak istemiyorsanız tercihlerinizi güncelleyebilirsiniz. &nbsp; &copy; 2025',
+    'Önümüzdeki hafta müsaitliğinizi paylaşabilir misiniz? Görüşme yaklaşık 45 dakika sürecektir.',
+)
+
+
+def _html_email(rng, target_chars):
+    """Çok sayıda link, tablo ve boşluk içeren, HTML'den türetilmiş büyük bir e-posta gövdesi üret"""
+    parts = ['<html><head><style>td { padding: 4px; }</style></head><body><table>']
+    length = 0
+    while length < target_chars:
+        paragraph = rng.choice(PARAGRAPHS)
+        link = f'https://www.linkedin.com/comm/jobs/view/{rng.randrange(10 ** 9)}?trackingId={rng.randrange(10 ** 12)}'
+        parts.append(f'<tr><td>\n    {paragraph}\n</td><td><a href="{link}">{link}</a></td></tr>\n\n')
+        length += len(paragraph) + 2 * len(link) + 40
+    if rng.random() < 0.5:
+        parts.append(f'<p>{rng.choice(["İş ilanını görüntüleyin:", "View job:", "Unsubscribe"])} {link}</p>')
+    parts.append('</table></body></html>')
+    return ''.join(parts)
+
+
+def _legacy_clean_and_normalize_text(text):
+    """GmailService._clean_and_normalize_text'in önceki hali (karşılaştırma için birebir kopya)"""
+    if not text:
+        return ""
+
+    stop_phrases = [
+        "İş ilanını görüntüleyin:",
+        "View job:",
+        "İlanı görüntüle:",
+        "Görüntüle:",
+        "Unsubscribe",
+        "Abonelikten çık",
+    ]
+    for phrase in stop_phrases:
+        if re.search(phrase, text, re.IGNORECASE):
+            text = text.split(re.search(phrase, text, re.IGNORECASE).group(0))[0]
+
+    text = re.sub(r'https?:\/\/\S+', '', text)
+    text = re.sub(r'www\.\S+', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\r\n|\r|\n', '\n', text)
+    text = re.sub(r'\n{4,}', '\n\n\n', text)
+    text = text.strip()
+    text = re.sub(r' {3,}', '  ', text)
+    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x84\x86-\x9f]', '', text)
+    return text
+
+
+class Command(BaseCommand):
+    help = "E-posta gövdesi normalizasyonunun eski (çok adımlı re.sub) ve derlenmiş desenli halini karşılaştırır"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--emails', type=int, default=2000, help='Üretilecek HTML e-posta sayısı')
+        parser.add_argument('--body-kb', type=int, default=50, help='HTML gövde boyutu (KB)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options['emails'] < 1:
+            raise CommandError("--emails en az 1 olmalı")
+
+        service = OfflineGmailService()
+        rng = random.Random(options['seed'])
+
+        # Gerçek akıştaki gibi önce HTML metne çevrilir, normalizasyon bu metin üzerinde ölçülür
+        texts = [
+            service._simple_html_cleanup(_html_email(rng, options['body_kb'] * 1024))
+            for _ in range(options['emails'])
+        ]
+        texts.extend(EDGE_CASES)
+        average_kb = sum(len(text) for text in texts) / len(texts) / 1024
+        self.stdout.write(f"{len(texts)} gövde (ortalama {average_kb:.1f} KB metin)")
+
+        results = {}
+        for name, normalize in (('legacy', _legacy_clean_and_normalize_text),
+                                ('compiled', service._clean_and_normalize_text)):
+            start = time.perf_counter()
+            outputs = [normalize(text) for text in texts]
+            results[name] = (time.perf_counter() - start, outputs)
+
+        mismatches = [
+            index for index, (a, b) in enumerate(zip(results['legacy'][1], results['compiled'][1])) if a != b
+        ]
+        if mismatches:
+            raise CommandError(f"{len(mismatches)} gövdede çıktı farklı (ilk: #{mismatches[0]})")
+
+        legacy_elapsed = results['legacy'][0]
+        self.stdout.write(f"{'Yöntem':<10} {'Toplam (sn)':>12} {'ms/mail':>9} {'Hızlanma':>9}")
+        for name, (elapsed, _) in results.items():
+            self.stdout.write(
+                f"{name:<10} {elapsed:>12.2f} {elapsed * 1000 / len(texts):>9.3f} {legacy_elapsed / elapsed:>8.1f}x"
+            )
+        self.stdout.write("Tüm gövdelerde çıktılar birebir aynı")
@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from job_tracker.models import ApplicationStats
+
+
+class Command(BaseCommand):
+    help = "Kullanıcı başvuru istatistiklerini (ApplicationStats) JobApplication tablosundan baştan hesaplar"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Sadece bu kullanıcı adı için hesapla (varsayılan: tüm kullanıcılar)')
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk')
+        if options['user']:
+            users = users.filter(username=options['user'])
+            if not users.exists():
+                raise CommandError(f"Kullanıcı bulunamadı: {options['user']}")
+
+        rebuilt = 0
+        for user in users.iterator():
+            stats = ApplicationStats.rebuild(user)
+            rebuilt += 1
+            self.stdout.write(f"{user.username}: {stats.total} başvuru, {stats.companies_count} şirket")
+
+        self.stdout.write(self.style.SUCCESS(f"{rebuilt} kullanıcının istatistikleri yeniden hesaplandı"))
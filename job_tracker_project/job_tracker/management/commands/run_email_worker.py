@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from job_tracker.email_jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = "Kuyruktaki e-posta senkronizasyon ve CSV işleme işlerini çalıştırır"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Kuyruk boşalınca çık')
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help='Boş kuyrukta bekleme süresi (saniye, varsayılan EMAIL_JOB_POLL_INTERVAL)')
+
+    def handle(self, *args, **options):
+        self.stdout.write("E-posta worker başladı (durdurmak için Ctrl+C)")
+
+        try:
+            processed = run_worker(once=options['once'], poll_interval=options['poll_interval'])
+        except KeyboardInterrupt:
+            # Yarım kalan iş heartbeat'i eskiyince bir sonraki worker tarafından devam ettirilir
+            self.stdout.write("Worker durduruldu")
+            return
+
+        self.stdout.write(self.style.SUCCESS(f"{processed} iş tamamlandı"))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 03:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0002_alter_jobapplication_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='gmail_history_id',
+            field=models.CharField(blank=True, help_text='Artımlı senkronizasyon için son işlenen Gmail historyId değeri', max_length=32, verbose_name='Gmail History ID'),
+        ),
+        migrations.AlterField(
+            model_name='jobapplication',
+            name='status',
+            field=models.CharField(choices=[('pending', 'İş Başvurusu Beklemede'), ('reviewing', 'Başvuru İnceleniyor'), ('interview', 'Mülakat Aşaması'), ('accepted', 'İş Başvurusu Kabul Edildi'), ('rejected', 'İş Başvurusu Reddedildi')], default='received', max_length=20, verbose_name='Durum'),
+        ),
+    ]
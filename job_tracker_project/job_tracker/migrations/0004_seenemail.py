@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-17 03:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0003_userprofile_gmail_history_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeenEmail',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gmail_message_id', models.CharField(max_length=100, verbose_name='Gmail Mesaj ID')),
+                ('seen_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seen_emails', to=settings.AUTH_USER_MODEL, verbose_name='Kullanıcı')),
+            ],
+            options={
+                'verbose_name': 'Görülmüş E-posta',
+                'verbose_name_plural': 'Görülmüş E-postalar',
+                'unique_together': {('user', 'gmail_message_id')},
+            },
+        ),
+    ]
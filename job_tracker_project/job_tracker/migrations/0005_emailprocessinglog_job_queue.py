@@ -0,0 +1,58 @@
+# Generated by Django 5.2.4 on 2026-10-17 03:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0004_seenemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailprocessinglog',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0, verbose_name='Deneme Sayısı'),
+        ),
+        migrations.AddField(
+            model_name='emailprocessinglog',
+            name='csv_filename',
+            field=models.CharField(blank=True, max_length=255, verbose_name='CSV Dosyası'),
+        ),
+        migrations.AddField(
+            model_name='emailprocessinglog',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='emailprocessinglog',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='emailprocessinglog',
+            name='job_type',
+            field=models.CharField(choices=[('sync', 'Gmail Senkronizasyonu'), ('csv', 'CSV İşleme')], default='sync', max_length=10, verbose_name='İş Tipi'),
+        ),
+        migrations.AddField(
+            model_name='emailprocessinglog',
+            name='processed_emails',
+            field=models.IntegerField(default=0, verbose_name='İşlenen E-posta'),
+        ),
+        migrations.AddField(
+            model_name='emailprocessinglog',
+            name='result_message',
+            field=models.TextField(blank=True, verbose_name='Sonuç Mesajı'),
+        ),
+        migrations.AddField(
+            model_name='emailprocessinglog',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='emailprocessinglog',
+            name='status',
+            field=models.CharField(choices=[('queued', 'Kuyrukta'), ('running', 'Çalışıyor'), ('completed', 'Tamamlandı'), ('failed', 'Hatalı')], default='completed', max_length=10, verbose_name='Durum'),
+        ),
+    ]
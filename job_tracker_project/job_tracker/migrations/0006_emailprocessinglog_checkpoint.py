@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-17 03:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0005_emailprocessinglog_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailprocessinglog',
+            name='history_id',
+            field=models.CharField(blank=True, max_length=32, verbose_name='Başlangıç historyId'),
+        ),
+        migrations.AddField(
+            model_name='emailprocessinglog',
+            name='last_message_id',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Son İşlenen Mesaj ID'),
+        ),
+    ]
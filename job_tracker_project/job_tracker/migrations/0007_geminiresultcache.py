@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0006_emailprocessinglog_checkpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeminiResultCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True, verbose_name='Anahtar')),
+                ('kind', models.CharField(max_length=20, verbose_name='Analiz Türü')),
+                ('model_name', models.CharField(max_length=100, verbose_name='Model')),
+                ('result', models.JSONField(verbose_name='Sonuç')),
+                ('hit_count', models.PositiveIntegerField(default=0, verbose_name='Kullanım Sayısı')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': "Gemini Sonuç Cache'i",
+                'verbose_name_plural': "Gemini Sonuç Cache'i",
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0007_geminiresultcache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64, unique=True, verbose_name='Parmak İzi')),
+                ('sender_email', models.CharField(db_index=True, max_length=254, verbose_name='Gönderen E-posta')),
+                ('subject_pattern', models.TextField(verbose_name='Konu Şablonu')),
+                ('body_pattern', models.TextField(blank=True, verbose_name='İçerik Şablonu')),
+                ('status', models.CharField(max_length=20, verbose_name='Durum')),
+                ('application_source', models.CharField(blank=True, max_length=100, verbose_name='Başvuru Kaynağı')),
+                ('hit_count', models.PositiveIntegerField(default=0, verbose_name='Kullanım Sayısı')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'E-posta Şablonu',
+                'verbose_name_plural': 'E-posta Şablonları',
+            },
+        ),
+    ]
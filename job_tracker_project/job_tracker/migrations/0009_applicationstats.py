@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0008_emailtemplate'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Toplam Başvuru')),
+                ('status_counts', models.JSONField(default=dict, verbose_name='Durum Sayıları')),
+                ('company_counts', models.JSONField(default=dict, verbose_name='Şirket Sayıları')),
+                ('monthly_counts', models.JSONField(default=dict, verbose_name='Aylık Sayılar')),
+                ('weekly_counts', models.JSONField(default=dict, verbose_name='Haftalık Sayılar')),
+                ('daily_application_counts', models.JSONField(default=dict, verbose_name='Günlük Başvuru Sayıları')),
+                ('daily_created_counts', models.JSONField(default=dict, verbose_name='Günlük Eklenen Sayıları')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='application_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Başvuru İstatistiği',
+                'verbose_name_plural': 'Başvuru İstatistikleri',
+            },
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.4 on 2026-10-17 04:32
+
+import re
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Contentless FTS5 tablosu: metin JobApplication'da kalır, indeks sadece kullanıcı ön ekli
+# terimleri tutar. rowid başvurunun id'sidir. Trigger'ların çağırdığı SQL fonksiyonu
+# 0012'de saf SQL trigger'lara geçilince kaldırıldı; bu migration için burada tutulur.
+FTS_COLUMNS = ('company_name', 'position', 'email_sender', 'email_subject', 'email_content')
+FTS_RANK = 'bm25(10.0, 5.0, 2.0, 3.0, 1.0)'
+SEARCH_TERMS_FUNCTION = 'job_tracker_search_terms'
+SEARCH_TOKEN_RE = re.compile(r'\w+')
+
+
+def search_terms(user_id, text):
+    """Metni kullanıcı ön ekli FTS terimlerine çevir: 'Ornek Teknoloji' -> 'u7_Ornek u7_Teknoloji'"""
+    return ' '.join(f'u{user_id}_{token}' for token in SEARCH_TOKEN_RE.findall(text or ''))
+
+
+def register_sqlite_functions(connection):
+    connection.connection.create_function(SEARCH_TERMS_FUNCTION, 2, search_terms, deterministic=True)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    register_sqlite_functions(schema_editor.connection)
+    columns = ', '.join(FTS_COLUMNS)
+
+    def terms(row):
+        return ', '.join(f'{SEARCH_TERMS_FUNCTION}({row}user_id, {row}{column})' for column in FTS_COLUMNS)
+
+    delete_old = (
+        f"INSERT INTO job_tracker_jobapplication_fts(job_tracker_jobapplication_fts, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {terms('old.')});"
+    )
+    insert_new = f"INSERT INTO job_tracker_jobapplication_fts(rowid, {columns}) VALUES (new.id, {terms('new.')});"
+
+    for statement in (
+        f"CREATE VIRTUAL TABLE job_tracker_jobapplication_fts USING fts5({columns}, content='', "
+        f"tokenize=\"unicode61 remove_diacritics 2 tokenchars '_'\")",
+        f"CREATE TRIGGER job_tracker_jobapplication_fts_ai AFTER INSERT ON job_tracker_jobapplication "
+        f"BEGIN {insert_new} END",
+        f"CREATE TRIGGER job_tracker_jobapplication_fts_ad AFTER DELETE ON job_tracker_jobapplication "
+        f"BEGIN {delete_old} END",
+        f"CREATE TRIGGER job_tracker_jobapplication_fts_au AFTER UPDATE OF user_id, {columns} "
+        f"ON job_tracker_jobapplication BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO job_tracker_jobapplication_fts(rowid, {columns}) SELECT id, {terms('')} FROM job_tracker_jobapplication",
+        f"INSERT INTO job_tracker_jobapplication_fts(job_tracker_jobapplication_fts, rank) VALUES ('rank', '{FTS_RANK}')",
+    ):
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS job_tracker_jobapplication_fts_{suffix}")
+    schema_editor.execute("DROP TABLE IF EXISTS job_tracker_jobapplication_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0010_jobapplication_user_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobApplicationSearchIndex',
+            fields=[
+                ('application', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='job_tracker.jobapplication')),
+                ('document', models.TextField(db_column='job_tracker_jobapplication_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'job_tracker_jobapplication_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,66 @@
+import importlib
+
+from django.db import migrations
+
+# 0011'in trigger'ları terimleri her SQLite bağlantısına ayrıca kaydedilmesi gereken bir SQL
+# fonksiyonuyla üretiyordu; fonksiyonu kaydetmeyen bağlantılardan yapılan yazımlar hata veriyordu.
+# İndeks artık Python'dan (sinyaller ve toplu yazımlar, bkz. search.SQLiteFTSSearchBackend)
+# güncellenir. rowid ile silinebilmesi için tablo contentless değil, terimleri kendisi saklar.
+FTS_TABLE = 'job_tracker_jobapplication_fts'
+FTS_COLUMNS = ('company_name', 'position', 'email_sender', 'email_subject', 'email_content')
+FTS_RANK = 'bm25(10.0, 5.0, 2.0, 3.0, 1.0)'
+
+
+def _previous_migration():
+    return importlib.import_module('job_tracker.migrations.0011_jobapplication_search_index')
+
+
+def _drop_search_index(schema_editor):
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    search_terms = _previous_migration().search_terms
+    columns = ', '.join(FTS_COLUMNS)
+
+    _drop_search_index(schema_editor)
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5({columns}, "
+        f"tokenize=\"unicode61 remove_diacritics 2 tokenchars '_'\")"
+    )
+
+    JobApplication = apps.get_model('job_tracker', 'JobApplication')
+    applications = JobApplication.objects.using(schema_editor.connection.alias).values('id', 'user_id', *FTS_COLUMNS)
+    rows = (
+        (application['id'], *(search_terms(application['user_id'], application[column]) for column in FTS_COLUMNS))
+        for application in applications.iterator(chunk_size=2000)
+    )
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (%s, {', '.join(['%s'] * len(FTS_COLUMNS))})", rows
+        )
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', '{FTS_RANK}')")
+
+
+def restore_trigger_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    _drop_search_index(schema_editor)
+    _previous_migration().create_search_index(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('job_tracker', '0011_jobapplication_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, restore_trigger_search_index),
+    ]
@@ -1,9 +1,15 @@
-from django.db import models
+import hashlib
+from datetime import timedelta
+
+from django.db import models, transaction
 from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.cache import cache
 from django.contrib.auth.models import User
 
+from . import search
+from .email_templates import build_template
+
 
 class JobApplication(models.Model):
     STATUS_CHOICES = [
@@ -47,12 +53,112 @@ class JobApplication(models.Model):
         verbose_name_plural = "İş Başvuruları"
         # Aynı kullanıcıda aynı gmail mesaj ID'si tekrar edemez
         unique_together = ['user', 'gmail_message_id']
+        # Tüm sorgular kullanıcıya göre filtrelenir; ardından sıralama veya gruplama alanı gelir
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='jobapp_user_created_idx'),  # liste, dashboard, export
+            models.Index(fields=['user', '-application_date'], name='jobapp_user_appdate_idx'),  # varsayılan sıralama, trendler
+            models.Index(fields=['user', 'status'], name='jobapp_user_status_idx'),  # durum filtresi ve sayımları
+            models.Index(fields=['user', 'company_name'], name='jobapp_user_company_idx'),  # şirket gruplamaları
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.company_name} - {self.position}"
 
 
+class FullTextMatch(models.Lookup):
+    """`alan__match=ifade` -> `alan MATCH ifade` (SQLite FTS5)"""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class JobApplicationSearchIndex(models.Model):
+    """
+    JobApplication'ın SQLite FTS5 tam metin indeksi (sanal tablo, rowid = başvuru id'si).
+
+    Tablo migration'da sadece SQLite'ta oluşturulur; satırlar JobApplication sinyalleri ve
+    toplu yazımlarda search backend'i tarafından yazılır, ORM ile hiçbir zaman yazılmaz.
+    Bu model yalnızca başvuruları indeksle join edip eşleştirmek ve sıralamak için vardır
+    (bkz. search.SQLiteFTSSearchBackend).
+    """
+    application = models.OneToOneField(
+        JobApplication,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_index'
+    )
+    # FTS5'te tablo adıyla aynı gizli sütun MATCH'in sol tarafıdır, rank ise bm25 skorudur
+    document = models.TextField(db_column='job_tracker_jobapplication_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'job_tracker_jobapplication_fts'
+
+
+JobApplicationSearchIndex._meta.get_field('document').register_lookup(FullTextMatch)
+
+
+class SeenEmail(models.Model):
+    """İş başvurusu olmadığı tespit edilen, tekrar indirilmeyecek Gmail mesajları"""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name="Kullanıcı",
+        related_name='seen_emails'
+    )
+
+    gmail_message_id = models.CharField(max_length=100, verbose_name="Gmail Mesaj ID")
+    seen_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Görülmüş E-posta"
+        verbose_name_plural = "Görülmüş E-postalar"
+        unique_together = ['user', 'gmail_message_id']
+
+    def __str__(self):
+        return f"{self.user.username} - {self.gmail_message_id}"
+
+    @classmethod
+    def get_known_message_ids(cls, user):
+        """Kullanıcının işlenmiş (başvuru veya görülmüş) tüm Gmail mesaj ID'lerini tek sorguda getir"""
+        applications = JobApplication.objects.filter(user=user).values_list('gmail_message_id', flat=True)
+        seen = cls.objects.filter(user=user).values_list('gmail_message_id', flat=True)
+        return set(applications.order_by().union(seen.order_by()))
+
+    @classmethod
+    def mark_seen(cls, user, message_ids):
+        """Mesaj ID'lerini görülmüş olarak kaydet (zaten kayıtlı olanlar atlanır)"""
+        objs = [cls(user=user, gmail_message_id=message_id) for message_id in set(message_ids) if message_id]
+        if objs:
+            cls.objects.bulk_create(objs, batch_size=500, ignore_conflicts=True)
+        return len(objs)
+
+
 class EmailProcessingLog(models.Model):
+    """E-posta işleme kaydı; arka plan işleri için kuyruk ve ilerleme bilgisini de tutar"""
+
+    JOB_TYPE_CHOICES = [
+        ('sync', 'Gmail Senkronizasyonu'),
+        ('csv', 'CSV İşleme'),
+    ]
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Kuyrukta'),
+        (STATUS_RUNNING, 'Çalışıyor'),
+        (STATUS_COMPLETED, 'Tamamlandı'),
+        (STATUS_FAILED, 'Hatalı'),
+    ]
+
     # Kullanıcı ile ilişki - HER LOG BİR KULLANICIYA AIT
     user = models.ForeignKey(
         User,
@@ -67,6 +173,20 @@ class EmailProcessingLog(models.Model):
     success = models.BooleanField(default=True)
     error_message = models.TextField(blank=True, null=True)
 
+    # Arka plan işi bilgileri
+    job_type = models.CharField(max_length=10, choices=JOB_TYPE_CHOICES, default='sync', verbose_name="İş Tipi")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_COMPLETED, verbose_name="Durum")
+    csv_filename = models.CharField(max_length=255, blank=True, verbose_name="CSV Dosyası")
+    processed_emails = models.IntegerField(default=0, verbose_name="İşlenen E-posta")
+    result_message = models.TextField(blank=True, verbose_name="Sonuç Mesajı")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Deneme Sayısı")
+    # Yarıda kalan senkronizasyonun devam noktası
+    last_message_id = models.CharField(max_length=255, blank=True, verbose_name="Son İşlenen Mesaj ID")
+    history_id = models.CharField(max_length=32, blank=True, verbose_name="Başlangıç historyId")
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         ordering = ['-processed_at']
         verbose_name = "E-posta İşlem Kaydı"
@@ -75,6 +195,181 @@ class EmailProcessingLog(models.Model):
     def __str__(self):
         return f"{self.user.username} - {self.processed_at.strftime('%d.%m.%Y %H:%M')}"
 
+    @property
+    def is_active(self):
+        return self.status in (self.STATUS_QUEUED, self.STATUS_RUNNING)
+
+    @property
+    def progress_percent(self):
+        if self.status == self.STATUS_COMPLETED:
+            return 100
+        if not self.total_emails:
+            return 0
+        return min(100, round(self.processed_emails * 100 / self.total_emails))
+
+    def to_progress_dict(self):
+        """Dashboard'un sorguladığı ilerleme bilgisini döndür"""
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'status_display': self.get_status_display(),
+            'processed': self.processed_emails,
+            'total': self.total_emails,
+            'found': self.job_applications_found,
+            'percent': self.progress_percent,
+            'message': self.result_message,
+            'error': self.error_message or '',
+            'is_active': self.is_active,
+        }
+
+
+class GeminiResultCache(models.Model):
+    """
+    Gemini analiz sonuçlarının içerik adresli kalıcı cache'i.
+
+    Anahtar (analiz türü, model, prompt sürümü, normalize edilmiş konu/içerik/gönderen)
+    bileşiminin sha256 özetidir; aynı e-posta tekrar analiz edildiğinde model çağrılmaz.
+    Süre dolumu okuma anında kullanıcının gemini_cache_ttl ayarına göre yapılır,
+    tablo boyutu en az kullanılanlar silinerek (LRU) sınırlanır.
+    """
+
+    # SystemSettings.gemini_cache_ttl üst sınırı: bundan eski kayıtlar hiçbir kullanıcı için geçerli değil
+    MAX_AGE_MINUTES = 1440
+
+    key = models.CharField(max_length=64, unique=True, verbose_name="Anahtar")
+    kind = models.CharField(max_length=20, verbose_name="Analiz Türü")
+    model_name = models.CharField(max_length=100, verbose_name="Model")
+    result = models.JSONField(verbose_name="Sonuç")
+    hit_count = models.PositiveIntegerField(default=0, verbose_name="Kullanım Sayısı")
+    created_at = models.DateTimeField(default=timezone.now)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = "Gemini Sonuç Cache'i"
+        verbose_name_plural = "Gemini Sonuç Cache'i"
+
+    def __str__(self):
+        return f"{self.kind} - {self.key[:12]}"
+
+    @staticmethod
+    def make_key(kind, model_name, prompt_version, subject, body, sender):
+        """Analiz girdilerinden cache anahtarı üret (boşluk farkları aynı anahtarı verir)"""
+        parts = [kind, model_name, str(prompt_version)]
+        parts += [' '.join(str(value or '').split()) for value in (subject, body, sender)]
+        return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+    @classmethod
+    def lookup(cls, key, ttl_minutes):
+        """TTL içindeki sonucu döndür (yoksa None); bulunan kaydın son kullanım zamanını güncelle"""
+        now = timezone.now()
+        entry = cls.objects.filter(
+            key=key, created_at__gte=now - timedelta(minutes=ttl_minutes)
+        ).values_list('pk', 'result').first()
+        if entry is None:
+            return None
+
+        cls.objects.filter(pk=entry[0]).update(last_used_at=now, hit_count=models.F('hit_count') + 1)
+        return entry[1]
+
+    @classmethod
+    def store(cls, key, kind, model_name, result):
+        """Sonucu kaydet; aynı anahtar varsa üzerine yaz ve süresini yenile"""
+        now = timezone.now()
+        cls.objects.update_or_create(
+            key=key,
+            defaults={'kind': kind, 'model_name': model_name, 'result': result,
+                      'created_at': now, 'last_used_at': now}
+        )
+
+    @classmethod
+    def evict(cls, max_entries):
+        """
+        Süresi her kullanıcı için dolmuş kayıtları sil, kalanları en az kullanılandan başlayarak max_entries'e indir.
+
+        Sınır bayt değil kayıt sayısıdır: sonuçlar birkaç yüz baytlık JSON'lar olduğundan
+        tablo boyutu kayıt sayısıyla orantılı kalır ve sayım tek bir COUNT sorgusuyla yapılır.
+        """
+        cls.objects.filter(created_at__lt=timezone.now() - timedelta(minutes=cls.MAX_AGE_MINUTES)).delete()
+
+        excess = cls.objects.count() - max_entries
+        if excess > 0:
+            stale_ids = list(cls.objects.order_by('last_used_at').values_list('pk', flat=True)[:excess])
+            cls.objects.filter(pk__in=stale_ids).delete()
+            return excess
+        return 0
+
+
+
+class EmailTemplate(models.Model):
+    """
+    Gemini'nin etiketlediği, tekrar eden e-posta şablonu (LinkedIn, ATS sistemleri vb.).
+
+    Konu ve gövdenin ilk satırlarından, şirket/pozisyon/konum değerleri maskelenerek
+    çıkarılan regex iskeletini tutar. Aynı göndericiden bu iskelete uyan e-postalar
+    model çağrılmadan çözülür (bkz. email_templates).
+    """
+
+    fingerprint = models.CharField(max_length=64, unique=True, verbose_name="Parmak İzi")
+    sender_email = models.CharField(max_length=254, db_index=True, verbose_name="Gönderen E-posta")
+    subject_pattern = models.TextField(verbose_name="Konu Şablonu")
+    body_pattern = models.TextField(blank=True, verbose_name="İçerik Şablonu")
+    status = models.CharField(max_length=20, verbose_name="Durum")
+    application_source = models.CharField(max_length=100, blank=True, verbose_name="Başvuru Kaynağı")
+    hit_count = models.PositiveIntegerField(default=0, verbose_name="Kullanım Sayısı")
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "E-posta Şablonu"
+        verbose_name_plural = "E-posta Şablonları"
+
+    def __str__(self):
+        return f"{self.sender_email} - {self.subject_pattern[:50]}"
+
+    @staticmethod
+    def _cache_key(sender_email):
+        return 'email_templates_' + hashlib.sha256(sender_email.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def for_sender(cls, sender_email):
+        """Göndericinin şablonlarını getir (5 dakika cache'lenir)"""
+        cache_key = cls._cache_key(sender_email)
+        templates = cache.get(cache_key)
+
+        if templates is None:
+            templates = list(cls.objects.filter(sender_email=sender_email).order_by('-hit_count'))
+            cache.set(cache_key, templates, 300)
+
+        return templates
+
+    @classmethod
+    def learn(cls, sender_email, subject, body, job_info):
+        """Etiketlenmiş e-postadan şablon çıkarıp kaydet; yeni şablon oluşturulduysa döndür"""
+        template = build_template(sender_email, subject, body, job_info)
+        if template is None:
+            return None
+
+        obj, created = cls.objects.get_or_create(
+            fingerprint=template['fingerprint'],
+            defaults={
+                'sender_email': sender_email,
+                'subject_pattern': template['subject_pattern'],
+                'body_pattern': template['body_pattern'],
+                'status': job_info.get('status', 'received'),
+                'application_source': job_info.get('application_source', ''),
+            }
+        )
+        if not created:
+            return None
+
+        cache.delete(cls._cache_key(sender_email))
+        return obj
+
+    def record_hit(self):
+        EmailTemplate.objects.filter(pk=self.pk).update(
+            hit_count=models.F('hit_count') + 1, last_used_at=timezone.now()
+        )
 
 class SystemSettings(models.Model):
     """Kullanıcıya özel sistem ayarlarını veritabanında saklayan model"""
@@ -192,7 +487,7 @@ class SystemSettings(models.Model):
             'email_scan_limit': getattr(django_settings, 'EMAIL_SCAN_LIMIT', 50000),
             'email_batch_size': getattr(django_settings, 'EMAIL_BATCH_SIZE', 10),
             'gemini_api_key': getattr(django_settings, 'GEMINI_API_KEY', ''),
-            'gemini_cache_ttl': getattr(django_settings, 'GEMINI_CACHE_TTL', 60),
+            'gemini_cache_ttl': django_settings.GEMINI_CACHE_TTL,
         }
 
     def clear_cache(self):
@@ -248,6 +543,12 @@ class UserProfile(models.Model):
     # Statistik bilgileri
     total_applications = models.PositiveIntegerField(default=0, verbose_name="Toplam Başvuru")
     last_email_sync = models.DateTimeField(null=True, blank=True, verbose_name="Son E-posta Senkronizasyonu")
+    gmail_history_id = models.CharField(
+        max_length=32,
+        blank=True,
+        verbose_name="Gmail History ID",
+        help_text="Artımlı senkronizasyon için son işlenen Gmail historyId değeri"
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -266,28 +567,193 @@ class UserProfile(models.Model):
 
     def get_success_rate(self):
         """Başarı oranını hesapla"""
-        total = self.user.job_applications.count()
-        if total == 0:
+        stats = ApplicationStats.for_user(self.user)
+        if stats.total == 0:
             return 0
 
-        successful = self.user.job_applications.filter(
-            status__in=['accepted', 'interview']
-        ).count()
-
-        return round((successful / total) * 100, 1)
+        return round((stats.success_count / stats.total) * 100, 1)
 
     @property
     def recent_applications(self):
         """Son 7 gündeki başvuruları getir"""
-        from datetime import timedelta
-        week_ago = timezone.now() - timedelta(days=7)
-        return self.user.job_applications.filter(
-            application_date__gte=week_ago
-        ).count()
+        return ApplicationStats.for_user(self.user).last_days(7)
+
+
+class ApplicationStats(models.Model):
+    """
+    Kullanıcı başına önceden hesaplanmış başvuru istatistikleri.
+
+    Dashboard ve analiz API'leri JobApplication üzerinde COUNT çalıştırmak yerine
+    bu tek satırı okur. Başvuru eklenince, durumu/şirketi/tarihi değişince ve
+    silinince sinyallerle artımlı güncellenir; toplu yazımlar record() çağırır.
+    Tutarsızlık şüphesinde `manage.py rebuild_application_stats` ile baştan
+    hesaplanır.
+    """
+
+    PENDING_STATUSES = ('received', 'reviewing', 'interview', 'waiting')
+    SUCCESS_STATUSES = ('accepted', 'interview')
+
+    # Son N gün sayıları için günlük kovalar bu kadar gün saklanır
+    DAILY_RETENTION_DAYS = 14
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='application_stats'
+    )
+    total = models.PositiveIntegerField(default=0, verbose_name="Toplam Başvuru")
+    status_counts = models.JSONField(default=dict, verbose_name="Durum Sayıları")
+    # şirket -> {durum: sayı}
+    company_counts = models.JSONField(default=dict, verbose_name="Şirket Sayıları")
+    # 'YYYY-MM' -> sayı (application_date, yerel saat)
+    monthly_counts = models.JSONField(default=dict, verbose_name="Aylık Sayılar")
+    # Haftanın pazartesisi 'YYYY-MM-DD' -> sayı (application_date, yerel saat)
+    weekly_counts = models.JSONField(default=dict, verbose_name="Haftalık Sayılar")
+    # 'YYYY-MM-DD' -> sayı; son DAILY_RETENTION_DAYS gün
+    daily_application_counts = models.JSONField(default=dict, verbose_name="Günlük Başvuru Sayıları")
+    daily_created_counts = models.JSONField(default=dict, verbose_name="Günlük Eklenen Sayıları")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Başvuru İstatistiği"
+        verbose_name_plural = "Başvuru İstatistikleri"
+
+    def __str__(self):
+        return f"{self.user_id} - {self.total} başvuru"
+
+    @staticmethod
+    def values_of(application):
+        """İstatistiğe giren alanlar: (status, company_name, application_date, created_at)"""
+        return application.status, application.company_name, application.application_date, application.created_at
+
+    @classmethod
+    def for_user(cls, user):
+        """Kullanıcının istatistik satırını tek sorguda getir; yoksa baştan hesapla"""
+        stats = cls.objects.filter(user=user).first()
+        if stats is None:
+            stats = cls.rebuild(user)
+        return stats
+
+    @classmethod
+    def rebuild(cls, user):
+        """İstatistikleri JobApplication tablosundan baştan hesapla ve kaydet (satır sayısından bağımsız 4 sorgu)"""
+        from . import analytics
+
+        applications = JobApplication.objects.filter(user=user)
+        company_counts = analytics.company_status_counts(applications)
+
+        status_counts = {}
+        for statuses in company_counts.values():
+            for status, count in statuses.items():
+                status_counts[status] = status_counts.get(status, 0) + count
+
+        daily_application_counts, daily_created_counts = analytics.recent_day_counts(
+            applications, cls.DAILY_RETENTION_DAYS + 1
+        )
+
+        obj, _ = cls.objects.update_or_create(user=user, defaults={
+            'total': sum(status_counts.values()),
+            'status_counts': status_counts,
+            'company_counts': company_counts,
+            'monthly_counts': analytics.monthly_counts(applications),
+            'weekly_counts': analytics.weekly_counts(applications),
+            'daily_application_counts': daily_application_counts,
+            'daily_created_counts': daily_created_counts,
+        })
+        return obj
+
+    @classmethod
+    def record(cls, user_id, added=(), removed=()):
+        """
+        Eklenen/çıkarılan başvuruları (values_of demetleri) istatistiğe işle.
+
+        Satır henüz yoksa bir şey yapılmaz; ilk okumada for_user baştan hesaplar.
+        """
+        with transaction.atomic():
+            stats = cls.objects.select_for_update().filter(user_id=user_id).first()
+            if stats is None:
+                return
+            for values in removed:
+                stats._apply(values, -1)
+            for values in added:
+                stats._apply(values, 1)
+            stats._prune()
+            stats.save()
+
+    @staticmethod
+    def _bump(counts, key, delta):
+        value = counts.get(key, 0) + delta
+        if value > 0:
+            counts[key] = value
+        else:
+            counts.pop(key, None)
+
+    @staticmethod
+    def _local_date(value):
+        if value is None:
+            return None
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return timezone.localtime(value).date()
+
+    def _apply(self, values, delta):
+        status, company_name, application_date, created_at = values
+
+        self.total = max(0, self.total + delta)
+        self._bump(self.status_counts, status, delta)
+
+        company_statuses = self.company_counts.setdefault(company_name, {})
+        self._bump(company_statuses, status, delta)
+        if not company_statuses:
+            del self.company_counts[company_name]
+
+        day = self._local_date(application_date)
+        if day is not None:
+            self._bump(self.monthly_counts, day.strftime('%Y-%m'), delta)
+            self._bump(self.weekly_counts, (day - timedelta(days=day.weekday())).isoformat(), delta)
+            self._bump(self.daily_application_counts, day.isoformat(), delta)
+
+        created_day = self._local_date(created_at)
+        if created_day is not None:
+            self._bump(self.daily_created_counts, created_day.isoformat(), delta)
+
+    def _prune(self):
+        oldest = (timezone.localdate() - timedelta(days=self.DAILY_RETENTION_DAYS)).isoformat()
+        for counts in (self.daily_application_counts, self.daily_created_counts):
+            for key in [key for key in counts if key < oldest]:
+                del counts[key]
+
+    # --- Okuma yardımcıları ---
+
+    @property
+    def companies_count(self):
+        return len(self.company_counts)
+
+    @property
+    def pending_count(self):
+        return sum(self.status_counts.get(status, 0) for status in self.PENDING_STATUSES)
+
+    @property
+    def success_count(self):
+        return sum(self.status_counts.get(status, 0) for status in self.SUCCESS_STATUSES)
+
+    def status_count(self, status):
+        return self.status_counts.get(status, 0)
+
+    def last_days(self, days, field='daily_application_counts'):
+        """Bugün dahil son `days` günün toplamı (en fazla DAILY_RETENTION_DAYS)"""
+        first = (timezone.localdate() - timedelta(days=days - 1)).isoformat()
+        return sum(count for key, count in getattr(self, field).items() if key >= first)
+
+    def company_totals(self):
+        """(şirket, toplam) listesi, en çok başvurulan önce"""
+        totals = [(company, sum(statuses.values())) for company, statuses in self.company_counts.items()]
+        totals.sort(key=lambda item: -item[1])
+        return totals
 
 
 # Signal'lar - Kullanıcı oluşturulduğunda otomatik profil ve ayarlar oluştur
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 
@@ -309,4 +775,49 @@ def save_user_profile(sender, instance, **kwargs):
 def update_user_stats(sender, instance, created, **kwargs):
     """Yeni başvuru eklendiğinde kullanıcı istatistiklerini güncelle"""
     if created and hasattr(instance.user, 'profile'):
-        instance.user.profile.update_application_count()
\ No newline at end of file
+        instance.user.profile.update_application_count()
+
+
+@receiver(pre_save, sender=JobApplication)
+def remember_application_stats_values(sender, instance, raw=False, **kwargs):
+    """Güncellenen başvurunun istatistiğe girmiş eski değerlerini sakla"""
+    instance._stats_previous = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._stats_previous = JobApplication.objects.filter(pk=instance.pk).values_list(
+        'status', 'company_name', 'application_date', 'created_at'
+    ).first()
+
+
+@receiver(post_save, sender=JobApplication)
+def update_application_stats(sender, instance, created, raw=False, **kwargs):
+    """Başvuru eklendiğinde veya istatistiğe giren alanları değiştiğinde istatistiği güncelle"""
+    if raw:
+        return
+
+    values = ApplicationStats.values_of(instance)
+    previous = getattr(instance, '_stats_previous', None)
+    if created:
+        ApplicationStats.record(instance.user_id, added=[values])
+    elif previous is not None and tuple(previous) != values:
+        ApplicationStats.record(instance.user_id, added=[values], removed=[previous])
+
+
+@receiver(post_delete, sender=JobApplication)
+def remove_application_stats(sender, instance, **kwargs):
+    """Silinen başvuruyu istatistikten düş"""
+    ApplicationStats.record(instance.user_id, removed=[ApplicationStats.values_of(instance)])
+
+
+@receiver(post_save, sender=JobApplication)
+def index_application(sender, instance, raw=False, using=None, **kwargs):
+    """Eklenen/değişen başvuruyu arama indeksine yaz (toplu yazımlar indeksi kendisi günceller)"""
+    if raw:
+        return
+    search.get_search_backend(using).index([instance], using)
+
+
+@receiver(post_delete, sender=JobApplication)
+def unindex_application(sender, instance, using=None, **kwargs):
+    """Silinen başvuruyu arama indeksinden çıkar"""
+    search.get_search_backend(using).remove([instance.pk], using)
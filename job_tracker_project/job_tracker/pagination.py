@@ -0,0 +1,144 @@
+import base64
+import binascii
+import json
+from datetime import date
+
+from django.db.models import F, Q
+
+# Keyset (cursor) sayfalama. Sayfa, önceki sayfanın son satırının sıralama değerlerinden
+# devam eder; OFFSET ve COUNT(*) çalıştırılmaz, derin sayfalar da ilk sayfa kadar hızlıdır.
+# Sıralama queryset'in order_by'ından alınır (sadece alan yolları), sonuna pk eklenerek
+# her satırın konumu tekil yapılır. HTML listesi ve JSON endpoint'i aynı sayfalayıcıyı kullanır.
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    """Sıralama değerlerini URL'de taşınabilir bir cursor'a çevir (datetime'lar mikro saniyeyle)"""
+    data = json.dumps(values, default=lambda value: value.isoformat() if isinstance(value, date) else str(value))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidCursor(str(e))
+
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursor("Cursor sıralama alanlarıyla uyuşmuyor")
+    return values
+
+
+class KeysetPage:
+    """Bir sayfanın satırları ve komşu sayfaların cursor'ları (komşu yoksa None)"""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Sıralı bir queryset'i cursor'larla sayfala.
+
+    Args:
+        queryset: order_by'ı alan yollarından oluşan queryset ('-created_at', 'search_index__rank')
+        per_page: Sayfa başına satır
+    """
+
+    def __init__(self, queryset, per_page):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if any(not isinstance(field, str) for field in ordering):
+            raise ValueError("Keyset sayfalama sadece alan adlarıyla sıralanmış queryset'lerde çalışır")
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            # Aynı değerli satırlar arasında sırayı sabitle
+            ordering.append('-pk' if ordering and ordering[-1].startswith('-') else 'pk')
+
+        self.per_page = per_page
+        self.ordering = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+        self.queryset = queryset.annotate(**{
+            self._key(index): F(path) for index, (path, _) in enumerate(self.ordering)
+        })
+
+    @staticmethod
+    def _key(index):
+        return f'keyset_{index}'
+
+    def get_page(self, after=None, before=None):
+        """Cursor'dan sonraki (after) veya önceki (before) sayfa; cursor yoksa/geçersizse ilk sayfa"""
+        try:
+            if before:
+                return self._page(decode_cursor(before, len(self.ordering)), forward=False)
+            if after:
+                return self._page(decode_cursor(after, len(self.ordering)), forward=True)
+        except InvalidCursor:
+            pass
+        return self._page(None, forward=True)
+
+    def _page(self, values, forward):
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self._seek_condition(values, forward))
+        if not forward:
+            queryset = queryset.order_by(*[path if descending else f'-{path}' for path, descending in self.ordering])
+        else:
+            queryset = queryset.order_by(*[f'-{path}' if descending else path for path, descending in self.ordering])
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if not forward:
+            if not has_more:
+                # Başa ulaşıldı; kısa bir sayfa yerine tam ilk sayfayı göster
+                return self._page(None, forward=True)
+            rows.reverse()
+        if not rows:
+            return KeysetPage(rows)
+
+        first, last = self._cursor(rows[0]), self._cursor(rows[-1])
+        if forward:
+            return KeysetPage(rows, last if has_more else None, first if values is not None else None)
+        return KeysetPage(rows, last, first if has_more else None)
+
+    def _cursor(self, obj):
+        return encode_cursor([getattr(obj, self._key(index)) for index in range(len(self.ordering))])
+
+    def _seek_condition(self, values, forward):
+        """
+        Sıralamada cursor'dan sonra (forward) ya da önce gelen satırlar:
+        (a < x) OR (a = x AND b < y) OR ... ; ilk alan için eklenen a <= x koşulu
+        indeksin aralık taramasıyla kullanılmasını sağlar.
+        """
+        condition = Q()
+        equal = Q()
+        for (path, descending), value in zip(self.ordering, values):
+            operator = 'lt' if descending == forward else 'gt'
+            condition |= equal & Q(**{f'{path}__{operator}': value})
+            equal &= Q(**{path: value})
+
+        first_path, first_descending = self.ordering[0]
+        first_operator = 'lte' if first_descending == forward else 'gte'
+        return Q(**{f'{first_path}__{first_operator}': values[0]}) & condition
@@ -0,0 +1,122 @@
+import re
+
+# GmailService ve GeminiService'in sıcak yollarında kullanılan, modül yüklenirken bir kez derlenen desenler
+
+# --- E-posta gövdesi normalizasyonu (GmailService._clean_and_normalize_text) ---
+
+# Bu ifadelerden itibaren metin atılır (ilan linkleri, abonelik iptali vb.)
+STOP_PHRASES = (
+    "İş ilanını görüntüleyin:",
+    "View job:",
+    "İlanı görüntüle:",
+    "Görüntüle:",
+    "Unsubscribe",
+    "Abonelikten çık",
+)
+STOP_PHRASE_RE = re.compile('|'.join(re.escape(phrase) for phrase in STOP_PHRASES), re.IGNORECASE)
+
+# re.IGNORECASE'in eşit saydığı karakterleri (İ/I/i/ı, ſ/s) aynı harfe indiren, uzunluğu koruyan katlama
+FOLDED_STOP_PHRASES = tuple(
+    phrase.replace('İ', 'i').lower().replace('ı', 'i').replace('ſ', 's') for phrase in STOP_PHRASES
+)
+
+
+def find_stop_phrase(text):
+    """
+    STOP_PHRASE_RE.search(text) ile aynı sonucu döndür.
+
+    Büyük/küçük harf duyarsız regex araması uzun metinlerde yavaştır; önce katlanmış
+    metinde str.find ile aday konumlar bulunur. Regex eşleşmesi katlanmış metinde de
+    aynı konumda görüneceği için en erken adaydan önce eşleşme olamaz; regex sadece
+    oradan itibaren çalıştırılır, aday yoksa hiç çalıştırılmaz.
+    """
+    folded = text.replace('İ', 'i').lower()
+    start = 0
+
+    # Uzunluk değiştiyse (beklenmeyen çok karakterli küçük harf dönüşümü) indeksler hizalı değildir
+    if len(folded) == len(text):
+        folded = folded.replace('ı', 'i').replace('ſ', 's')
+        positions = [position for position in (folded.find(phrase) for phrase in FOLDED_STOP_PHRASES) if position != -1]
+        if not positions:
+            return None
+        start = min(positions)
+
+    return STOP_PHRASE_RE.search(text, start)
+
+# http(s) ve www ile başlayan linkler; sırayla uygulanır ("www.http://..." gibi durumlar için sıra önemli)
+HTTP_URL_RE = re.compile(r'https?://\S+')
+WWW_URL_RE = re.compile(r'www\.\S+')
+
+# Özel kontrol karakterleri (tab/newline/CR ve NEL hariç)
+CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x84\x86-\x9f]')
+
+# --- Regex ile basit HTML temizliği (BeautifulSoup yoksa) ---
+
+HTML_SCRIPT_RE = re.compile(r'<script[^>]*>.*?</script>', re.DOTALL | re.IGNORECASE)
+HTML_STYLE_RE = re.compile(r'<style[^>]*>.*?</style>', re.DOTALL | re.IGNORECASE)
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# --- MIME başlıkları ---
+
+# Content-Type başlığındaki charset parametresi (text/plain; charset="UTF-8")
+CHARSET_PARAM_RE = re.compile(r'charset\s*=\s*["\']?([^"\';\s]+)', re.IGNORECASE)
+
+# --- Gönderen adresi ---
+
+# GmailService.extract_sender_email
+SENDER_EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+
+# GeminiService._extract_email_from_sender
+EMAIL_ADDRESS_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# Şirket domain'lerinden gelen iş başvurusu göndericileri (GeminiService._is_valid_job_sender)
+JOB_SENDER_RE = re.compile('|'.join([
+    r'.*@.*\.com',
+    r'.*careers@.*',
+    r'.*hr@.*',
+    r'.*hiring@.*',
+    r'.*jobs@.*',
+    r'.*recruitment@.*',
+    r'.*talent@.*',
+    r'.*@peoplise\.com',
+    r'.*@.*inside-pmi\.com',
+    r'^noreply@.*',
+]))
+
+# --- Gemini yanıtları ---
+
+JSON_FENCE_START_RE = re.compile(r'^```json\s*', re.MULTILINE)
+JSON_FENCE_END_RE = re.compile(r'\s*```$', re.MULTILINE)
+
+# --- LinkedIn konu başlıkları (sıra önemli: ilk geçerli eşleşme kullanılır) ---
+
+LINKEDIN_SUBJECT_POSITION_RES = (
+    re.compile(r'(.+?)\s+başvurunuz', re.IGNORECASE),  # "Data Scientist başvurunuz"
+    re.compile(r'şirketindeki\s+(.+?)\s+başvurunuz', re.IGNORECASE),  # "şirketindeki AI Engineer başvurunuz"
+)
+LINKEDIN_SUBJECT_COMPANY_RES = (
+    re.compile(r'başvurunuz\s+(.+?)\s+şirketine', re.IGNORECASE),  # "başvurunuz Chippin şirketine"
+    re.compile(r'(.+?)\s+şirketindeki', re.IGNORECASE),  # "Robopine şirketindeki"
+)
+LINKEDIN_DEFAULT_COMPANY_RES = (
+    re.compile(r'başvurunuz\s+(.+?)\s+şirketine\s+gönderildi', re.IGNORECASE),
+    re.compile(r'başvurunuz\s+(.+?)\s+şirketine', re.IGNORECASE),
+)
+
+# --- Pozisyon / şirket adı temizliği ---
+
+POSITION_AL_PAREN_RE = re.compile(r'\(Al\)')  # (Al) → (AI)
+POSITION_AL_WORD_RE = re.compile(r'\bAl\b')  # Al → AI
+POSITION_SYMBOLS_RE = re.compile(r'[*\-•→←↑↓]+')
+WHITESPACE_RE = re.compile(r'\s+')
+POSITION_AFFIX_RES = (
+    re.compile(r'^(pozisyon|position|role|job|iş)\s*:?\s*', re.IGNORECASE),
+    re.compile(r'\s*(pozisyon|position|role|job|iş)\s*$', re.IGNORECASE),
+)
+COMPANY_SUFFIX_RE = re.compile(
+    r'\s+(şirketi|company|ltd\.?|inc\.?|corp\.?|şti\.?|a\.ş\.?|san\.?tic\.?)$', re.IGNORECASE
+)
+
+# --- Başvuru araması (search.SQLiteFTSSearchBackend) ---
+
+SEARCH_TOKEN_RE = re.compile(r'\w+')  # FTS terimlerine dönüşen kelimeler (search.search_terms)
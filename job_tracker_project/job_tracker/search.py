@@ -0,0 +1,144 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from . import patterns
+
+# Başvuru listesi araması. Arama veritabanının kendi tam metin altyapısıyla yapılır;
+# backend JOB_APPLICATION_SEARCH_BACKEND ayarıyla (dotted path) seçilebilir, ayar yoksa
+# veritabanı türüne göre seçilir. Yeni bir veritabanı için SearchBackend'den türetip
+# search() (indeks tutuyorsa index() ve remove()) metodlarını yazmak ve VENDOR_BACKENDS'e
+# (veya ayara) eklemek yeterlidir.
+
+SEARCH_FIELDS = ('company_name', 'position', 'email_sender', 'email_subject', 'email_content')
+
+SQLITE_INDEX_TABLE = 'job_tracker_jobapplication_fts'
+
+
+def search_terms(user_id, text):
+    """
+    Metni kullanıcıya özel FTS terimlerine çevir: "Ornek Teknoloji" -> "u7_Ornek u7_Teknoloji".
+
+    FTS5 indeksi tüm kullanıcılar için tek tablodur; terimler kullanıcı ön ekiyle
+    yazıldığında her kullanıcının doclist'i ayrı olur ve önek aramaları sadece o
+    kullanıcının terimlerini birleştirir (maliyet tablo boyutuna değil kullanıcının
+    başvuru sayısına bağlı kalır). Büyük/küçük harf ve aksanları FTS tokenizer'ı katlar.
+    """
+    return ' '.join(f'u{user_id}_{token}' for token in patterns.SEARCH_TOKEN_RE.findall(text or ''))
+
+
+class SearchBackend:
+    """Arama backend'lerinin ortak arayüzü"""
+
+    def search(self, queryset, user, query):
+        """
+        `queryset` (kullanıcının başvuruları) içinde `query` ile eşleşenleri döndür.
+
+        Dönen queryset en alakalıdan başlayarak sıralanmış olmalı.
+        """
+        raise NotImplementedError
+
+    def index(self, applications, using=DEFAULT_DB_ALIAS):
+        """Eklenen veya değişen başvuruları indekse yaz (indeks tutmayan backend'lerde bir şey yapmaz)"""
+
+    def remove(self, application_ids, using=DEFAULT_DB_ALIAS):
+        """Silinen başvuruları indeksten çıkar"""
+
+
+class ContainsSearchBackend(SearchBackend):
+    """Tam metin indeksi olmayan veritabanları için alan başına icontains (kullanıcının satırları taranır)"""
+
+    def search(self, queryset, user, query):
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__icontains': query})
+        return queryset.filter(condition)
+
+
+class SQLiteFTSSearchBackend(SearchBackend):
+    """
+    SQLite FTS5 indeksi (JobApplicationSearchIndex) üzerinden arama.
+
+    Her kelime önek olarak eşleşir ("yaz" -> "Yazılım"), büyük/küçük harf ve aksanlar
+    yok sayılır, sonuçlar bm25 skoruna (şirket > pozisyon > konu > gönderen > içerik) göre sıralanır.
+
+    İndeks veritabanı trigger'larıyla değil, başvuru sinyalleri ve toplu yazımlarda
+    index()/remove() ile Python'dan güncellenir: terimler kullanıcı ön ekiyle yazılır
+    (bkz. search_terms) ve bunu yapan bir SQL fonksiyonu bağlantılara kaydedilmez.
+    ORM dışından yapılan yazımlar rebuild() ile indekse alınır.
+    """
+
+    def search(self, queryset, user, query):
+        expression = self.match_expression(user, query)
+        if expression is None:
+            # Kelime içermeyen aramalar ("@", "+") indekste karşılık bulamaz
+            return ContainsSearchBackend().search(queryset, user, query)
+
+        return queryset.filter(search_index__document__match=expression).order_by(
+            'search_index__rank', '-created_at', '-id'
+        )
+
+    @staticmethod
+    def match_expression(user, query):
+        """Arama kutusundaki metni FTS5 MATCH ifadesine çevir (kelime yoksa None)"""
+        terms = search_terms(user.pk, query).split()
+        if not terms:
+            return None
+        return ' AND '.join(f'"{term}"*' for term in terms)
+
+    def index(self, applications, using=DEFAULT_DB_ALIAS):
+        applications = list(applications)
+        self.remove([application.pk for application in applications], using)
+        self._insert(applications, using)
+
+    def remove(self, application_ids, using=DEFAULT_DB_ALIAS):
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {SQLITE_INDEX_TABLE} WHERE rowid = %s", [(application_id,) for application_id in application_ids]
+            )
+
+    @staticmethod
+    def _insert(applications, using):
+        rows = [
+            (application.pk, *(search_terms(application.user_id, getattr(application, field)) for field in SEARCH_FIELDS))
+            for application in applications
+        ]
+        with connections[using].cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {SQLITE_INDEX_TABLE}(rowid, {', '.join(SEARCH_FIELDS)}) "
+                f"VALUES (%s, {', '.join(['%s'] * len(SEARCH_FIELDS))})",
+                rows
+            )
+
+    def rebuild(self, using=DEFAULT_DB_ALIAS, batch_size=2000):
+        """İndeksi tüm başvurulardan baştan kur (ORM dışı toplu yazımlardan sonra)"""
+        from .models import JobApplication
+
+        applications = JobApplication.objects.using(using).only('user_id', *SEARCH_FIELDS).order_by('pk')
+
+        # Tek transaction: okuyucular yarım indeks görmez, FTS5 segmentleri bir kez birleştirilir
+        with transaction.atomic(using=using):
+            with connections[using].cursor() as cursor:
+                cursor.execute(f"DELETE FROM {SQLITE_INDEX_TABLE}")
+
+            batch = []
+            for application in applications.iterator(chunk_size=batch_size):
+                batch.append(application)
+                if len(batch) >= batch_size:
+                    self._insert(batch, using)
+                    batch = []
+            self._insert(batch, using)
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSSearchBackend,
+}
+
+
+def get_search_backend(using=DEFAULT_DB_ALIAS):
+    """Ayardaki ya da veritabanı türüne uygun arama backend'i"""
+    backend_path = getattr(settings, 'JOB_APPLICATION_SEARCH_BACKEND', None)
+    if backend_path:
+        return import_string(backend_path)()
+    return VENDOR_BACKENDS.get(connections[using].vendor, ContainsSearchBackend)()
@@ -1,3 +1,1462 @@
-from django.test import TestCase
+import base64
+import csv
+import gzip
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import types
+from datetime import datetime, timedelta
+from functools import partial
+from unittest import mock
 
-# Create your tests here.
+import httplib2
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from google.api_core import exceptions as google_exceptions
+from googleapiclient.errors import HttpError
+
+from . import email_jobs, gemini_pool, gmail_fetcher, patterns, views
+from .email_pipeline import EmailPipeline
+from .email_record import EmailRecord
+from .email_templates import build_template, match_template
+from .gemini_service import GeminiService
+from .gmail_fetcher import AdaptiveRateLimiter, BatchMessageFetcher, ConcurrentMessageFetcher, execute_with_backoff
+from .gmail_service import GmailService
+from .html_text import html_chunks_to_text, html_to_text
+from .keyword_matcher import KeywordMatcher
+from .management.commands import benchmark_mime_extraction as mime_benchmark
+from .management.commands import benchmark_text_normalization as text_benchmark
+from .management.commands.benchmark_email_memory import OfflineGmailService
+from .models import (
+    ApplicationStats, EmailProcessingLog, EmailTemplate, JobApplication, SeenEmail, SystemSettings,
+)
+from .pagination import KeysetPaginator
+from .search import ContainsSearchBackend, SQLiteFTSSearchBackend, get_search_backend
+
+
+STATUSES = ('received', 'reviewing', 'interview', 'accepted', 'rejected', 'waiting')
+
+
+class AnalyticsTestMixin:
+    """Farklı şirket, durum ve tarihlere dağılmış başvurular oluşturur"""
+
+    def create_applications(self, user, count, companies=5, start=0):
+        now = timezone.now()
+        for index in range(start, start + count):
+            JobApplication.objects.create(
+                user=user,
+                company_name=f'Şirket {index % companies}',
+                position='Yazılım Geliştirici',
+                email_sender='ik@ornek.com',
+                application_date=now - timedelta(days=index * 3, hours=index % 24),
+                status=STATUSES[index % len(STATUSES)],
+                email_subject='Başvurunuz alındı',
+                email_content='Başvurunuz için teşekkürler',
+                gmail_message_id=f'msg{index}',
+            )
+
+
+class ApplicationStatsTests(AnalyticsTestMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='ayse')
+        self.create_applications(self.user, 30)
+
+    def assertStatsEqual(self, first, second):
+        for field in ('total', 'status_counts', 'company_counts', 'monthly_counts', 'weekly_counts',
+                      'daily_application_counts', 'daily_created_counts'):
+            self.assertEqual(getattr(first, field), getattr(second, field), field)
+
+    def test_incremental_updates_match_rebuild(self):
+        ApplicationStats.for_user(self.user)
+        applications = list(JobApplication.objects.filter(user=self.user).order_by('pk'))
+
+        for application in applications[:5]:
+            application.status = 'accepted'
+            application.save()
+        applications[5].company_name = 'Yeni Şirket'
+        applications[5].save()
+        applications[6].application_date -= timedelta(days=40)
+        applications[6].save()
+        for application in applications[7:10]:
+            application.delete()
+        self.create_applications(self.user, 4, start=100)
+
+        incremental = ApplicationStats.objects.get(user=self.user)
+        self.assertEqual(incremental.total, 31)
+        self.assertStatsEqual(incremental, ApplicationStats.rebuild(self.user))
+
+    def test_rebuild_query_count_does_not_depend_on_row_count(self):
+        ApplicationStats.rebuild(self.user)
+
+        # 4 analiz sorgusu + mevcut satırın update_or_create'i (savepoint, select_for_update, update, release)
+        with self.assertNumQueries(8):
+            ApplicationStats.rebuild(self.user)
+
+        self.create_applications(self.user, 60, companies=20, start=100)
+        with self.assertNumQueries(8):
+            stats = ApplicationStats.rebuild(self.user)
+        self.assertEqual(stats.total, 90)
+        self.assertEqual(stats.companies_count, 20)
+
+
+class AnalyticsEndpointQueryTests(AnalyticsTestMixin, TestCase):
+    """Analiz endpoint'leri başvuru sayısından bağımsız olarak tek sorgu çalıştırmalı"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='ayse')
+        self.create_applications(self.user, 60, companies=12)
+        ApplicationStats.for_user(self.user)
+        self.factory = RequestFactory()
+
+    def get(self, view, *args):
+        request = self.factory.get('/')
+        request.user = self.user
+        return view(request, *args)
+
+    def test_json_endpoints_run_one_query(self):
+        for view in (views.get_status_distribution, views.get_monthly_trend, views.get_top_companies,
+                     views.get_success_rate_by_company, views.get_weekly_activity,
+                     views.get_application_statistics):
+            with self.subTest(view=view.__name__), self.assertNumQueries(1):
+                response = self.get(view)
+            self.assertEqual(response.status_code, 200)
+
+    def test_application_statistics_values(self):
+        with self.assertNumQueries(1):
+            data = json.loads(self.get(views.get_application_statistics).content)
+
+        applications = JobApplication.objects.filter(user=self.user)
+        self.assertEqual(data['total'], applications.count())
+        self.assertEqual(data['accepted'], applications.filter(status='accepted').count())
+        self.assertEqual(data['rejected'], applications.filter(status='rejected').count())
+        self.assertEqual(
+            data['pending'],
+            applications.filter(status__in=['received', 'reviewing', 'interview', 'waiting']).count()
+        )
+
+    def test_success_rate_by_company_has_no_per_company_queries(self):
+        with self.assertNumQueries(1):
+            data = json.loads(self.get(views.get_success_rate_by_company).content)
+
+        self.assertEqual(len(data['labels']), 10)
+        for company, total in zip(data['labels'], data['totals']):
+            self.assertEqual(total, JobApplication.objects.filter(user=self.user, company_name=company).count())
+
+    def test_analysis_dashboard_runs_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.get(views.analysis_dashboard)
+        self.assertEqual(response.status_code, 200)
+
+    def test_status_chart_runs_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.get(views.generate_matplotlib_chart, 'status_pie')
+        self.assertEqual(response.status_code, 200)
+
+
+class SearchBackendTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='ayse')
+        self.other = User.objects.create(username='mehmet')
+        self.backend = get_search_backend()
+
+    def create(self, user=None, **fields):
+        values = {
+            'company_name': 'Ornek Teknoloji',
+            'position': 'Yazılım Geliştirici',
+            'email_sender': 'ik@ornek.com',
+            'application_date': timezone.now(),
+            'status': 'pending',
+            'email_subject': 'Başvurunuz alındı',
+            'email_content': 'Başvurunuz için teşekkürler',
+            'gmail_message_id': f'msg{JobApplication.objects.count()}',
+        }
+        values.update(fields)
+        return JobApplication.objects.create(user=user or self.user, **values)
+
+    def search(self, query):
+        applications = JobApplication.objects.filter(user=self.user)
+        return list(self.backend.search(applications, self.user, query).values_list('pk', flat=True))
+
+    def test_sqlite_uses_fts_backend(self):
+        self.assertIsInstance(self.backend, SQLiteFTSSearchBackend)
+
+    def test_matches_prefix_subject_and_content_without_diacritics(self):
+        subject = self.create(email_subject='Mülakat daveti')
+        content = self.create(email_content='Teknik görüşme için İstanbul ofisimize bekliyoruz')
+        self.create(user=self.other, email_subject='Mülakat daveti')
+
+        self.assertEqual(self.search('mulak'), [subject.pk])
+        self.assertEqual(self.search('istanbul gorus'), [content.pk])
+        self.assertEqual(self.search('ornek.com'), self.search('ornek'))
+        self.assertEqual(len(self.search('ornek')), 2)
+
+    def test_results_are_ranked(self):
+        in_content = self.create(company_name='Acme', email_content='Globex ile ortak proje')
+        in_company = self.create(company_name='Globex')
+
+        self.assertEqual(self.search('globex'), [in_company.pk, in_content.pk])
+
+    def test_index_follows_updates_deletes_and_pipeline_bulk_insert(self):
+        application = self.create(company_name='Acme')
+        application.company_name = 'Globex'
+        application.save()
+        self.assertEqual(self.search('acme'), [])
+        self.assertEqual(self.search('globex'), [application.pk])
+
+        application.delete()
+        self.assertEqual(self.search('globex'), [])
+
+        # bulk_create sinyal tetiklemez; pipeline'ın toplu yazımı indeksi kendisi günceller
+        pipeline = EmailPipeline(self.user, service_factory=_FakeGeminiService)
+        email_data = _email_record('bulk1')
+        pipeline._bulk_insert([(email_data, pipeline._build_application(email_data, {'company_name': 'Initech'}))])
+        self.assertEqual(self.search('initech'), [JobApplication.objects.get(gmail_message_id='bulk1').pk])
+
+    def test_query_without_words_falls_back_to_contains(self):
+        application = self.create(email_sender='ik@ornek.com')
+        self.assertEqual(self.search('@'), [application.pk])
+        self.assertEqual(
+            self.search('@'),
+            list(ContainsSearchBackend().search(JobApplication.objects.filter(user=self.user), self.user, '@')
+                 .values_list('pk', flat=True))
+        )
+
+    def test_raw_sql_writes_need_no_sql_function_and_rebuild_indexes_them(self):
+        # İndekste bağlantıya kayıtlı SQL fonksiyonu çağıran trigger yok; ORM dışı yazımlar hata vermez
+        application = self.create(company_name='Acme')
+        with connection.cursor() as cursor:
+            cursor.execute("UPDATE job_tracker_jobapplication SET company_name = 'Hooli' WHERE id = %s", [application.pk])
+            cursor.execute(
+                "INSERT INTO job_tracker_jobapplication (user_id, company_name, position, email_sender, "
+                "application_date, status, email_subject, email_content, gmail_message_id, created_at, "
+                "updated_at, extracted_info) SELECT user_id, 'Initech', position, email_sender, application_date, "
+                "status, email_subject, email_content, 'raw1', created_at, updated_at, extracted_info "
+                "FROM job_tracker_jobapplication WHERE id = %s", [application.pk]
+            )
+
+        self.assertEqual(self.search('hooli'), [])
+
+        self.backend.rebuild()
+        self.assertEqual(self.search('acme'), [])
+        self.assertEqual(self.search('hooli'), [application.pk])
+        self.assertEqual(self.search('initech'), [JobApplication.objects.get(gmail_message_id='raw1').pk])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'job_tracker_jobapplication'")
+            self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_application_list_search(self):
+        self.create(company_name='Globex')
+        self.create(company_name='Acme')
+        request = RequestFactory().get('/', {'search': 'glob'})
+        request.user = self.user
+
+        response = views.application_list(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Globex')
+        self.assertNotContains(response, 'Acme')
+
+
+class KeysetPaginationTests(AnalyticsTestMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='ayse')
+        self.create_applications(self.user, 45)
+        # Aynı created_at'e sahip satırlar pk ile ayrışmalı
+        JobApplication.objects.filter(pk__in=list(
+            JobApplication.objects.filter(user=self.user).values_list('pk', flat=True)[:10]
+        )).update(created_at=timezone.now())
+        ApplicationStats.for_user(self.user)
+        self.expected = list(
+            JobApplication.objects.filter(user=self.user).order_by('-created_at', '-id').values_list('pk', flat=True)
+        )
+
+    def paginator(self):
+        return KeysetPaginator(JobApplication.objects.filter(user=self.user).order_by('-created_at'), 20)
+
+    def test_walks_all_pages_forward_and_backward(self):
+        pages = [self.paginator().get_page()]
+        while pages[-1].has_next:
+            pages.append(self.paginator().get_page(after=pages[-1].next_cursor))
+
+        self.assertEqual([len(page) for page in pages], [20, 20, 5])
+        self.assertEqual([obj.pk for page in pages for obj in page], self.expected)
+        self.assertFalse(pages[0].has_previous)
+
+        previous = self.paginator().get_page(before=pages[2].previous_cursor)
+        self.assertEqual([obj.pk for obj in previous], [obj.pk for obj in pages[1]])
+        first = self.paginator().get_page(before=previous.previous_cursor)
+        self.assertEqual([obj.pk for obj in first], [obj.pk for obj in pages[0]])
+
+    def test_invalid_cursor_returns_first_page(self):
+        page = self.paginator().get_page(after='bozuk-cursor')
+        self.assertEqual([obj.pk for obj in page], self.expected[:20])
+
+    def test_list_endpoint_pages_without_count_query(self):
+        request = RequestFactory().get('/')
+        request.user = self.user
+        # Sayfa + ApplicationStats satırı
+        with self.assertNumQueries(2):
+            data = json.loads(views.get_applications(request).content)
+        self.assertEqual([row['id'] for row in data['results']], self.expected[:20])
+        self.assertEqual(data['total'], 45)
+        self.assertIsNone(data['previous_cursor'])
+
+        request = RequestFactory().get('/', {'after': data['next_cursor']})
+        request.user = self.user
+        data = json.loads(views.get_applications(request).content)
+        self.assertEqual([row['id'] for row in data['results']], self.expected[20:40])
+
+    def test_list_endpoints_require_login(self):
+        for url in ('/applications/', '/api/applications/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 302)
+            self.assertTrue(response.url.startswith('/login/'))
+
+    def test_list_page_defers_content_and_extracted_info(self):
+        request = RequestFactory().get('/', {'status': 'accepted'})
+        request.user = self.user
+        page, counts = views._application_list_page(request)
+
+        self.assertEqual(counts['filtered_count'], JobApplication.objects.filter(
+            user=self.user, status='accepted').count())
+        self.assertEqual(page.object_list[0].get_deferred_fields(), {'user_id', 'email_content',
+                                                                     'gmail_message_id', 'extracted_info',
+                                                                     'updated_at'})
+
+
+class CSVExportTests(AnalyticsTestMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='ayse')
+        self.create_applications(self.user, 5)
+        self.create_applications(User.objects.create(username='mehmet'), 3)
+
+    def export(self, **params):
+        request = RequestFactory().get('/', params)
+        request.user = self.user
+        return views.export_applications_to_csv(request)
+
+    def test_streams_users_rows_with_bom(self):
+        response = self.export()
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertTrue(response['Content-Disposition'].endswith('.csv"'))
+
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertTrue(content.startswith('\ufeffID,Şirket,Pozisyon,'))
+        rows = list(csv.reader(io.StringIO(content.lstrip('\ufeff'))))
+        expected = JobApplication.objects.filter(user=self.user).order_by('-created_at')
+        self.assertEqual([int(row[0]) for row in rows[1:]], [app.pk for app in expected])
+        self.assertEqual(rows[1][5], expected[0].get_status_display())
+        self.assertEqual(rows[1][4], expected[0].application_date.strftime('%Y-%m-%d %H:%M:%S'))
+
+    def test_chunks_match_chunk_size(self):
+        chunks = list(views._iter_applications_csv(JobApplication.objects.filter(user=self.user), chunk_size=2))
+        # Başlık ilk parçayla gider: (başlık + 2) + 2 + 1 satır
+        self.assertEqual([chunk.count(b'\n') for chunk in chunks], [3, 2, 1])
+
+    def test_gzip_export_matches_plain_export(self):
+        plain = b''.join(self.export().streaming_content)
+        response = self.export(gzip='1')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertTrue(response['Content-Disposition'].endswith('.csv.gz"'))
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), plain)
+
+
+class CSVIngestionTests(TestCase):
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        with mock.patch.object(GmailService, 'authenticate'):
+            self.service = GmailService()
+        self.service.csv_folder = folder.name
+
+        start = datetime(2025, 3, 1, 9, 30, 15)
+        self.records = [
+            EmailRecord.create(
+                id=f'msg{index}',
+                subject='None' if index == 2 else f'Başvurunuz alındı, #{index}',
+                sender='İK <ik@ornek.com>',
+                sender_email='ik@ornek.com',
+                date=start + timedelta(hours=index),
+                body='' if index == 3 else f'Merhaba,\n"Yazılım Geliştirici" pozisyonu {index}',
+                is_read=index % 2 == 0,
+                body_length=None if index != 1 else 9000,
+            )
+            for index in range(5)
+        ]
+        with self.service.open_csv_writer() as writer:
+            for record in self.records:
+                writer.write(record)
+        self.filename = writer.filename
+
+    def test_round_trips_csv_writer_output(self):
+        emails = self.service.read_emails_from_csv(self.filename)
+        self.assertIsInstance(emails, types.GeneratorType)
+        self.assertEqual(list(emails), self.records)
+
+    def test_skip_and_scan_for_resume(self):
+        self.assertEqual(self.service.scan_csv(self.filename), (5, None))
+        self.assertEqual(self.service.scan_csv(self.filename, 'msg2'), (5, 3))
+        self.assertEqual(self.service.scan_csv(self.filename, 'silinmis'), (5, None))
+        self.assertEqual(list(self.service.read_emails_from_csv(self.filename, skip=3)), self.records[3:])
+        self.assertEqual(self.service.get_csv_info(self.filename)['row_count'], 5)
+
+    def test_missing_file_and_missing_body_length_column(self):
+        self.assertEqual(list(self.service.read_emails_from_csv('yok.csv')), [])
+        self.assertEqual(self.service.scan_csv('yok.csv'), (0, None))
+
+        with open(os.path.join(self.service.csv_folder, 'eski.csv'), 'w', newline='', encoding='utf-8-sig') as csv_file:
+            csv_file.write('id,subject,sender,sender_email,date,is_read,body_preview,body_full\n'
+                           'a1,Konu,Gönderen,g@ornek.com,2025-03-01 09:30:15,False,Gövde,Gövde metni\n')
+        email_data, = self.service.read_emails_from_csv('eski.csv')
+        self.assertEqual(email_data.body_length, len('Gövde metni'))
+        self.assertFalse(email_data.is_read)
+
+
+def _http_error(status, reason=None):
+    content = json.dumps({'error': {'code': status, 'errors': [{'reason': reason}] if reason else []}})
+    return HttpError(httplib2.Response({'status': status}), content.encode('utf-8'))
+
+
+class _FakeRequest:
+    """messages().get isteği: sıradaki yanıtı döndürür ya da hatayı fırlatır"""
+
+    def __init__(self, service, message_id):
+        self.service = service
+        self.message_id = message_id
+        self.postproc = lambda resp, content: json.loads(content)
+
+    def response(self):
+        outcomes = self.service.outcomes.get(self.message_id)
+        outcome = outcomes.pop(0) if outcomes else self.service.stored.get(self.message_id, {'id': self.message_id})
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def execute(self):
+        outcome = self.response()
+        return self.postproc(None, json.dumps(outcome).encode('utf-8'))
+
+
+class _FakeBatch:
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.batches.append([request_id for request_id, _ in self.requests])
+        for request_id, request in self.requests:
+            try:
+                self.callback(request_id, request.response(), None)
+            except HttpError as e:
+                self.callback(request_id, None, e)
+
+
+class _FakeGmailService:
+    """
+    Sahte Gmail servisi: mesaj başına önce sıralı sonuçlar (yanıt veya HttpError), onlar
+    bitince `stored`'daki mesaj (yoksa {'id': ...}) döner.
+    """
+
+    def __init__(self, outcomes=None, stored=None):
+        self.outcomes = {message_id: list(items) for message_id, items in (outcomes or {}).items()}
+        self.stored = stored or {}
+        self.batches = []
+        self.requests = []
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def get(self, userId, id, format, **params):
+        self.requests.append((format, id))
+        return _FakeRequest(self, id)
+
+    def new_batch_http_request(self, callback):
+        return _FakeBatch(self, callback)
+
+
+@mock.patch.object(gmail_fetcher.time, 'sleep')
+class GmailFetcherTests(SimpleTestCase):
+    def test_rate_limiter_backs_off_and_recovers(self, sleep):
+        limiter = AdaptiveRateLimiter(max_interval=0.3)
+        limiter.on_throttle()
+        self.assertEqual(limiter.interval, 0.05)
+        limiter.on_throttle()
+        limiter.on_throttle()
+        limiter.on_throttle()
+        self.assertEqual(limiter.interval, 0.3)
+        self.assertEqual(limiter.throttle_count, 4)
+
+        limiter.on_success()
+        self.assertAlmostEqual(limiter.interval, 0.27)
+        for _ in range(100):
+            limiter.on_success()
+        self.assertEqual(limiter.interval, 0.0)
+
+    def test_backoff_retries_rate_limit_errors(self, sleep):
+        for error in (_http_error(429), _http_error(503), _http_error(403, 'userRateLimitExceeded')):
+            with self.subTest(status=error.resp.status):
+                limiter = AdaptiveRateLimiter()
+                request = mock.Mock(side_effect=[error, error, {'id': 'm1'}])
+                self.assertEqual(execute_with_backoff(request, limiter), {'id': 'm1'})
+                self.assertEqual(request.call_count, 3)
+                self.assertEqual(limiter.throttle_count, 2)
+
+    def test_backoff_raises_other_errors_and_gives_up(self, sleep):
+        for error in (_http_error(403, 'insufficientPermissions'), _http_error(404)):
+            request = mock.Mock(side_effect=error)
+            with self.assertRaises(HttpError):
+                execute_with_backoff(request, AdaptiveRateLimiter())
+            self.assertEqual(request.call_count, 1)
+
+        request = mock.Mock(side_effect=_http_error(429))
+        with self.assertRaises(HttpError):
+            execute_with_backoff(request, AdaptiveRateLimiter(), max_retries=2)
+        self.assertEqual(request.call_count, 3)
+
+    def test_concurrent_fetcher_keeps_order_and_reports_failures(self, sleep):
+        service = _FakeGmailService({'m2': [_http_error(429)], 'm3': [_http_error(404)]})
+        fetcher = ConcurrentMessageFetcher(lambda: service, concurrency=3)
+        ids = [f'm{index}' for index in range(8)]
+
+        results = list(fetcher.fetch(ids))
+
+        self.assertEqual([message_id for message_id, _ in results], ids)
+        self.assertEqual([message_id for message_id, message in results if message is None], ['m3'])
+        self.assertEqual((fetcher.fetched_count, fetcher.failed_count), (7, 1))
+        self.assertEqual(fetcher.round_trips, 9)
+        self.assertEqual(fetcher.rate_limiter.throttle_count, 1)
+        self.assertGreater(fetcher.bytes_downloaded, 0)
+
+    def test_batch_fetcher_retries_only_throttled_messages(self, sleep):
+        service = _FakeGmailService({
+            'm1': [_http_error(429)],
+            'm2': [_http_error(403, 'rateLimitExceeded')],
+            'm3': [_http_error(404)],
+        })
+        fetcher = BatchMessageFetcher(service, batch_size=4)
+
+        results = list(fetcher.fetch(['m0', 'm1', 'm2', 'm3', 'm4']))
+
+        self.assertEqual(service.batches, [['m0', 'm1', 'm2', 'm3'], ['m1', 'm2'], ['m4']])
+        self.assertEqual([message_id for message_id, _ in results], ['m0', 'm1', 'm2', 'm3', 'm4'])
+        self.assertEqual(dict(results)['m1'], {'id': 'm1'})
+        self.assertIsNone(dict(results)['m3'])
+        self.assertEqual((fetcher.fetched_count, fetcher.failed_count), (4, 1))
+        self.assertEqual(fetcher.round_trips, 3)
+
+
+class _OfflineGmailService(GmailService):
+    """Gmail'e bağlanmayan, CSV'lerini geçici klasöre yazan GmailService"""
+
+    csv_root = None
+
+    def authenticate(self):
+        self.service = mock.Mock()
+
+    def _build_service(self):
+        return self.service
+
+    def _get_user_csv_folder(self):
+        return self.csv_root
+
+
+class _FakeGeminiService:
+    """analyze_email'i sabit sonuçla yanıtlayan Gemini servisi (failed: tespit hatası simülasyonu)"""
+
+    analysis_mode = 'separate'
+    job_info = None
+    failed = False
+
+    def __init__(self):
+        self.usage = {'template_lookups': 0, 'template_hits': 0}
+        self.cache_ttl = 0
+        self.last_detection_failed = False
+
+    def analyze_email(self, subject, body, sender):
+        self.last_detection_failed = self.failed
+        return self.job_info is not None, self.job_info
+
+
+def _email_record(message_id, index=0, subject='Başvurunuz alındı'):
+    return EmailRecord.create(
+        id=message_id,
+        subject=subject,
+        sender='İK <ik@ornek.com>',
+        sender_email='ik@ornek.com',
+        date=datetime(2025, 3, 1, 9, 0) + timedelta(hours=index),
+        body=f'Başvurunuz için teşekkürler {index}',
+        is_read=False,
+    )
+
+
+class GmailHistorySyncTests(TestCase):
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.user = User.objects.create(username='ayse')
+        self.user.profile.gmail_history_id = '100'
+        self.user.profile.save()
+        _OfflineGmailService.csv_root = folder.name
+        self.service = _OfflineGmailService(user=self.user)
+
+    def set_history_pages(self, *pages):
+        self.service.service.users.return_value.history.return_value.list.return_value.execute.side_effect = pages
+
+    @staticmethod
+    def record(history_id, *message_ids):
+        return {'id': history_id, 'messagesAdded': [
+            {'message': {'id': message_id, 'labelIds': ['INBOX', 'CATEGORY_PERSONAL']}} for message_id in message_ids
+        ]}
+
+    def test_checkpoint_stops_at_last_listed_record_when_limit_is_hit(self):
+        self.set_history_pages(
+            {'history': [self.record('101', 'a', 'b'), self.record('102', 'c')], 'nextPageToken': 'p2', 'historyId': '200'},
+            {'history': [self.record('103', 'd')], 'historyId': '200'},
+        )
+        ids = self.service.list_message_ids(max_results=3, skip_known=False)
+
+        self.assertEqual(ids, ['a', 'b', 'c'])
+        self.assertEqual(self.service.pending_history_id, '102')
+
+    def test_checkpoint_moves_to_latest_history_when_exhausted(self):
+        self.set_history_pages(
+            {'history': [self.record('101', 'a')], 'nextPageToken': 'p2', 'historyId': '200'},
+            {'history': [self.record('103', 'd')], 'historyId': '201'},
+        )
+        ids = self.service.list_message_ids(max_results=3, skip_known=False)
+
+        self.assertEqual(ids, ['a', 'd'])
+        self.assertEqual(self.service.pending_history_id, '201')
+
+    @override_settings(GEMINI_CONCURRENCY=1)
+    def run_sync(self, detection_failed):
+        service = self.service
+
+        def list_message_ids(**kwargs):
+            service.pending_history_id = '300'
+            service.used_incremental_sync = True
+            service.last_listed_count = 2
+            return ['m1', 'm2']
+
+        service.list_message_ids = list_message_ids
+        service.fetch_emails = lambda message_ids, prefilter=False: (
+            _email_record(message_id, index) for index, message_id in enumerate(message_ids)
+        )
+        gemini = type('Gemini', (_FakeGeminiService,), {'failed': detection_failed})
+        job = EmailProcessingLog.objects.create(user=self.user, job_type='sync', status=EmailProcessingLog.STATUS_RUNNING)
+
+        with mock.patch.object(email_jobs, 'GmailService', return_value=service), \
+                mock.patch.object(email_jobs, 'EmailPipeline', partial(EmailPipeline, service_factory=gemini)):
+            email_jobs.run_sync_job(job, email_jobs.JobProgress(job))
+        self.user.profile.refresh_from_db()
+        return self.user.profile.gmail_history_id
+
+    def test_sync_with_failed_detection_keeps_checkpoint(self):
+        self.assertEqual(self.run_sync(detection_failed=True), '100')
+
+    def test_successful_sync_advances_checkpoint(self):
+        self.assertEqual(self.run_sync(detection_failed=False), '300')
+
+
+def _gmail_message(message_id, subject='Başvurunuz alındı', sender='İK <ik@ornek.com>', body='Başvurunuz için teşekkürler'):
+    """format='full' ile dönen düz metin bir Gmail mesajı"""
+    return {
+        'id': message_id,
+        'labelIds': ['INBOX', 'UNREAD'],
+        'payload': {
+            'mimeType': 'text/plain',
+            'headers': [
+                {'name': 'Subject', 'value': subject},
+                {'name': 'From', 'value': sender},
+                {'name': 'Date', 'value': 'Mon, 1 Sep 2025 10:00:00 +0300'},
+            ],
+            'body': {'data': base64.urlsafe_b64encode(body.encode('utf-8')).decode('ascii')},
+        },
+    }
+
+
+class GmailServiceTestMixin:
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.user = User.objects.create(username='ayse')
+        _OfflineGmailService.csv_root = folder.name
+
+    def gmail_service(self, messages):
+        """Verilen mesajları (id -> mesaj veya HttpError) döndüren sahte servisle GmailService"""
+        gmail = _OfflineGmailService(user=self.user)
+        gmail.service = _FakeGmailService(
+            outcomes={message_id: [error] for message_id, error in messages.items() if isinstance(error, Exception)},
+            stored={message_id: message for message_id, message in messages.items() if isinstance(message, dict)},
+        )
+        return gmail
+
+
+@mock.patch.object(gmail_fetcher.time, 'sleep')
+class GmailBatchModeTests(GmailServiceTestMixin, TestCase):
+    @override_settings(GMAIL_FETCH_MODE='batch')
+    def test_fetch_emails_in_batch_mode(self, sleep):
+        messages = {f'm{index}': _gmail_message(f'm{index}', subject=f'Başvuru {index}') for index in range(12)}
+        messages['m2'] = _http_error(404)
+        gmail = self.gmail_service(messages)
+
+        emails = list(gmail.fetch_emails(list(messages)))
+
+        self.assertIsInstance(gmail.last_fetcher, BatchMessageFetcher)
+        # email_batch_size (varsayılan 10) mesaj tek HTTP isteğinde
+        self.assertEqual([len(batch) for batch in gmail.service.batches], [10, 2])
+        self.assertEqual([email_data.id for email_data in emails], [message_id for message_id in messages if message_id != 'm2'])
+        self.assertEqual(emails[0].subject, 'Başvuru 0')
+        self.assertEqual(emails[0].body, 'Başvurunuz için teşekkürler')
+        self.assertEqual(gmail.fetch_stats['full']['skipped'], 1)
+        self.assertEqual(gmail.fetch_failed_count, 1)
+
+
+class MetadataPrefilterTests(GmailServiceTestMixin, TestCase):
+    def test_full_content_is_downloaded_only_for_candidates(self):
+        gmail = self.gmail_service({
+            'm0': _gmail_message('m0'),
+            'm1': _gmail_message('m1', sender='Indeed <alert@indeed.com>'),
+            'm2': _gmail_message('m2', subject='Haftalık özet: size uygun ilanlar'),
+            'm3': _gmail_message('m3', subject='Mülakat daveti'),
+        })
+
+        emails = list(gmail.fetch_emails(['m0', 'm1', 'm2', 'm3'], prefilter=True))
+
+        self.assertEqual([email_data.id for email_data in emails], ['m0', 'm3'])
+        self.assertEqual(sorted(gmail.service.requests), [
+            ('full', 'm0'), ('full', 'm3'),
+            ('metadata', 'm0'), ('metadata', 'm1'), ('metadata', 'm2'), ('metadata', 'm3'),
+        ])
+        self.assertEqual(gmail.fetch_stats['metadata']['skipped'], 2)
+        self.assertEqual(gmail.fetch_stats['full']['fetched'], 2)
+
+        # Elenen mailler bir daha indirilmesin
+        gmail.mark_rejected_seen()
+        self.assertEqual(SeenEmail.get_known_message_ids(self.user), {'m1', 'm2'})
+
+
+class KnownMessageSkipTests(GmailServiceTestMixin, AnalyticsTestMixin, TestCase):
+    def test_known_messages_are_dropped_before_download(self):
+        self.create_applications(self.user, 2)  # msg0, msg1
+        SeenEmail.mark_seen(self.user, ['msg2', 'msg2'])
+        SeenEmail.mark_seen(User.objects.create(username='mehmet'), ['msg3'])
+        self.assertEqual(SeenEmail.get_known_message_ids(self.user), {'msg0', 'msg1', 'msg2'})
+
+        gmail = _OfflineGmailService(user=self.user)
+        gmail.service.users().messages().list().execute.return_value = {
+            'messages': [{'id': f'msg{index}'} for index in range(5)],
+        }
+        ids = gmail.list_message_ids(incremental=False)
+
+        self.assertEqual(ids, ['msg3', 'msg4'])
+        self.assertEqual(gmail.last_listed_count, 5)
+        self.assertEqual(gmail.list_message_ids(incremental=False, skip_known=False), [f'msg{i}' for i in range(5)])
+
+    def test_pipeline_drops_known_ids(self):
+        SeenEmail.mark_seen(self.user, ['a', 'c'])
+        pipeline = EmailPipeline(self.user, service_factory=_FakeGeminiService)
+        self.assertEqual(pipeline.drop_known(['a', 'b', 'c', 'd']), ['b', 'd'])
+
+
+@override_settings(EMAIL_JOBS_RUN_IN_PROCESS=True, EMAIL_JOB_STALE_SECONDS=120, EMAIL_JOB_MAX_ATTEMPTS=3)
+class EmailJobQueueTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='ayse')
+        ensure_worker = mock.patch.object(email_jobs, 'ensure_worker_thread')
+        self.ensure_worker_thread = ensure_worker.start()
+        self.addCleanup(ensure_worker.stop)
+
+    def create_job(self, status, heartbeat_age=0, attempts=1, job_type='sync'):
+        return EmailProcessingLog.objects.create(
+            user=self.user, job_type=job_type, status=status, attempts=attempts,
+            heartbeat_at=timezone.now() - timedelta(seconds=heartbeat_age),
+        )
+
+    def test_job_left_by_dead_worker_is_requeued_and_picked_up(self):
+        # Web süreci iş çalışırken yeniden başladı: iş 'running' kaldı, heartbeat eskidi
+        dead = self.create_job(EmailProcessingLog.STATUS_RUNNING, heartbeat_age=600)
+
+        job, created = email_jobs.enqueue_job(self.user, 'sync')
+
+        self.assertFalse(created)
+        self.assertEqual(job.pk, dead.pk)
+        self.assertEqual(job.status, EmailProcessingLog.STATUS_QUEUED)
+        self.ensure_worker_thread.assert_called_once()
+
+        with mock.patch.object(email_jobs, 'run_job', side_effect=lambda job: job) as run_job:
+            self.assertEqual(email_jobs.run_worker(once=True), 1)
+        self.assertEqual(run_job.call_args.args[0].pk, dead.pk)
+        self.assertEqual(run_job.call_args.args[0].attempts, 2)
+
+    def test_live_running_job_is_returned_and_worker_ensured(self):
+        running = self.create_job(EmailProcessingLog.STATUS_RUNNING, heartbeat_age=5)
+
+        job, created = email_jobs.enqueue_job(self.user, 'sync')
+
+        self.assertEqual((job.pk, created, job.status), (running.pk, False, EmailProcessingLog.STATUS_RUNNING))
+        self.ensure_worker_thread.assert_called_once()
+
+    def test_claim_is_exclusive_and_oldest_first(self):
+        first = self.create_job(EmailProcessingLog.STATUS_QUEUED, attempts=0)
+        second = self.create_job(EmailProcessingLog.STATUS_QUEUED, attempts=0, job_type='csv')
+        original_first = QuerySet.first
+
+        def raced_first(queryset):
+            # Başka bir worker SELECT ile UPDATE arasında ilk işi sahiplenir
+            job = original_first(queryset)
+            if job is not None and job.pk == first.pk:
+                EmailProcessingLog.objects.filter(pk=job.pk).update(status=EmailProcessingLog.STATUS_RUNNING)
+            return job
+
+        with mock.patch.object(QuerySet, 'first', autospec=True, side_effect=raced_first):
+            claimed = email_jobs.claim_next_job()
+
+        self.assertEqual(claimed.pk, second.pk)
+        self.assertEqual((claimed.status, claimed.attempts), (EmailProcessingLog.STATUS_RUNNING, 1))
+        self.assertIsNone(email_jobs.claim_next_job())
+
+    def test_stale_jobs_are_requeued_until_max_attempts(self):
+        alive = self.create_job(EmailProcessingLog.STATUS_RUNNING, heartbeat_age=30)
+        retry = self.create_job(EmailProcessingLog.STATUS_RUNNING, heartbeat_age=600, attempts=2)
+        exhausted = self.create_job(EmailProcessingLog.STATUS_RUNNING, heartbeat_age=600, attempts=3)
+
+        self.assertEqual(email_jobs.requeue_stale_jobs(), 1)
+
+        statuses = dict(EmailProcessingLog.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[alive.pk], EmailProcessingLog.STATUS_RUNNING)
+        self.assertEqual(statuses[retry.pk], EmailProcessingLog.STATUS_QUEUED)
+        self.assertEqual(statuses[exhausted.pk], EmailProcessingLog.STATUS_FAILED)
+        self.assertFalse(EmailProcessingLog.objects.get(pk=exhausted.pk).success)
+
+    @override_settings(EMAIL_JOB_PROGRESS_INTERVAL=60)
+    def test_progress_saves_are_throttled_and_flush_seen_ids(self):
+        job = self.create_job(EmailProcessingLog.STATUS_RUNNING)
+        progress = email_jobs.JobProgress(job)
+
+        progress.update(processed=1, total=10, force=True)
+        progress.mark_seen_later('m1')
+        progress.update(processed=2, last_message_id='m1')
+        job.refresh_from_db()
+        self.assertEqual((job.processed_emails, job.last_message_id), (1, ''))
+        self.assertFalse(SeenEmail.objects.exists())
+
+        progress.update(processed=3, last_message_id='m2', force=True)
+        job.refresh_from_db()
+        self.assertEqual((job.processed_emails, job.total_emails, job.last_message_id), (3, 10, 'm2'))
+        self.assertEqual(SeenEmail.get_known_message_ids(self.user), {'m1'})
+
+
+class PipelineResumeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username='ayse')
+
+    def test_resume_after_checkpoint(self):
+        items = ['a', 'b', 'c', 'd']
+        self.assertEqual(EmailPipeline.resume_after(items, 'b'), ['c', 'd'])
+        self.assertEqual(EmailPipeline.resume_after(items, 'd'), [])
+        # Checkpoint mesajı silinmişse baştan başlanır; işlenmişler known_ids ile atlanır
+        self.assertEqual(EmailPipeline.resume_after(items, 'x'), items)
+        self.assertEqual(EmailPipeline.resume_after(items, None), items)
+        records = [_email_record(message_id) for message_id in items]
+        self.assertEqual(EmailPipeline.resume_after(records, 'c', key=lambda email_data: email_data.id), records[3:])
+
+    def test_new_job_inherits_checkpoint_of_failed_job_only(self):
+        EmailProcessingLog.objects.create(
+            user=self.user, job_type='sync', status=EmailProcessingLog.STATUS_FAILED,
+            last_message_id='m7', history_id='500',
+        )
+        job = EmailProcessingLog.objects.create(user=self.user, job_type='sync', status=EmailProcessingLog.STATUS_RUNNING)
+        email_jobs._load_resume_checkpoint(job)
+        job.refresh_from_db()
+        self.assertEqual((job.last_message_id, job.history_id), ('m7', '500'))
+
+        # Başarıyla bitmiş bir işin checkpoint'i devralınmaz
+        EmailProcessingLog.objects.all().delete()
+        EmailProcessingLog.objects.create(
+            user=self.user, job_type='sync', status=EmailProcessingLog.STATUS_COMPLETED, last_message_id='m9',
+        )
+        fresh = EmailProcessingLog.objects.create(user=self.user, job_type='sync', status=EmailProcessingLog.STATUS_RUNNING)
+        email_jobs._load_resume_checkpoint(fresh)
+        self.assertEqual(fresh.last_message_id, '')
+
+    @override_settings(GEMINI_CONCURRENCY=1)
+    def test_pipeline_checkpoints_every_email_and_marks_non_jobs_seen(self):
+        job = EmailProcessingLog.objects.create(user=self.user, job_type='csv', status=EmailProcessingLog.STATUS_RUNNING)
+        progress = email_jobs.JobProgress(job)
+
+        class Gemini(_FakeGeminiService):
+            def analyze_email(self, subject, body, sender):
+                self.last_detection_failed = False
+                if subject.startswith('Bülten'):
+                    return False, None
+                return True, {'company_name': 'Acme', 'position': 'Geliştirici', 'status': 'received'}
+
+        emails = [_email_record('m0'), _email_record('m1', 1, subject='Bülten'), _email_record('m2', 2)]
+        pipeline = EmailPipeline(self.user, progress, service_factory=Gemini)
+        pipeline.run(pipeline.track(iter(emails)))
+        progress.save()
+
+        job.refresh_from_db()
+        self.assertEqual(job.last_message_id, 'm2')
+        self.assertEqual(pipeline.job_applications_found, 2)
+        self.assertEqual(sorted(JobApplication.objects.values_list('gmail_message_id', flat=True)), ['m0', 'm2'])
+        self.assertEqual(set(SeenEmail.objects.values_list('gmail_message_id', flat=True)), {'m1'})
+
+
+class EmailRecordTests(SimpleTestCase):
+    def test_create_truncates_body_and_keeps_original_length(self):
+        body = 'a' * (EmailRecord.BODY_MAX_LENGTH + 500)
+        record = EmailRecord.create(id=123, subject=float('nan'), sender=None, sender_email='ik@ornek.com',
+                                    date=datetime(2025, 3, 1), body=body, is_read=1)
+
+        self.assertEqual((record.id, record.subject, record.sender), ('123', '', ''))
+        self.assertEqual(len(record.body), EmailRecord.BODY_MAX_LENGTH)
+        self.assertEqual(record.body_length, len(body))
+        self.assertIs(record.is_read, True)
+        self.assertEqual(record.body_preview, 'a' * EmailRecord.PREVIEW_LENGTH + '...')
+        self.assertFalse(hasattr(record, '__dict__'))
+
+    def test_explicit_body_length_and_short_preview(self):
+        record = EmailRecord.create(id='m1', subject='Konu', sender='İK', sender_email='ik@ornek.com',
+                                    date=datetime(2025, 3, 1), body='Kısa gövde', is_read=False, body_length='9000')
+        self.assertEqual(record.body_length, 9000)
+        # Gövde CSV'ye kısaltılarak yazılmış; asıl metin daha uzun
+        self.assertEqual(record.body_preview, 'Kısa gövde...')
+
+        record = EmailRecord.create(id='m2', subject='Konu', sender='İK', sender_email='ik@ornek.com',
+                                    date=datetime(2025, 3, 1), body='Kısa gövde', is_read=False)
+        self.assertEqual(record.body_preview, 'Kısa gövde')
+
+
+class _FakeClock:
+    """time.monotonic / time.sleep yerine: sleep saati ilerletir"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class GeminiRateLimitTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = _FakeClock()
+        patcher = mock.patch.object(gemini_pool, 'time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_token_bucket_waits_for_refill(self):
+        bucket = gemini_pool.TokenBucket(capacity=2, refill_rate=1)
+        bucket.acquire()
+        bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [])
+
+        bucket.acquire()
+        self.assertEqual(self.clock.sleeps, [1.0])
+
+        # Kapasiteden büyük istek kapasiteye indirilir, iade kapasiteyi aşmaz
+        self.clock.now += 10
+        bucket.acquire(50)
+        self.assertEqual(bucket.tokens, 0)
+        bucket.adjust(10)
+        self.assertEqual(bucket.tokens, 2)
+
+    def test_limiter_applies_rpm_tpm_and_quota_pause(self):
+        limiter = gemini_pool.GeminiRateLimiter(rpm=60, tpm=600)
+        limiter.acquire(600)
+        limiter.acquire(60)  # TPM kovası boş: 60 token için 6 sn
+        self.assertEqual(self.clock.sleeps, [6.0])
+
+        # Tahmin 600, gerçek kullanım 100: fark iade edilir
+        limiter.settle(600, 100)
+        self.assertEqual(limiter.tokens.tokens, 500)
+
+        limiter.on_quota_error(30)
+        limiter.acquire(1)
+        self.assertEqual(self.clock.sleeps[1], 30)
+        self.assertEqual(limiter.quota_error_count, 1)
+
+    def test_generate_with_backoff_retries_quota_errors(self):
+        limiter = gemini_pool.GeminiRateLimiter(rpm=1000, tpm=100000)
+        request = mock.Mock(side_effect=[google_exceptions.ResourceExhausted('kota'),
+                                         google_exceptions.ServiceUnavailable('geçici'), 'yanıt'])
+
+        self.assertEqual(gemini_pool.generate_with_backoff(request, limiter, 10), 'yanıt')
+        self.assertEqual(request.call_count, 3)
+        self.assertEqual(limiter.quota_error_count, 1)
+
+        request = mock.Mock(side_effect=google_exceptions.InvalidArgument('hatalı istek'))
+        with self.assertRaises(google_exceptions.InvalidArgument):
+            gemini_pool.generate_with_backoff(request, limiter, 10)
+        self.assertEqual(request.call_count, 1)
+
+    def test_limiter_is_shared_per_api_key(self):
+        first = gemini_pool.get_rate_limiter('test-anahtar-1', 10, 1000)
+        self.assertIs(gemini_pool.get_rate_limiter('test-anahtar-1', 99, 99), first)
+        self.assertIsNot(gemini_pool.get_rate_limiter('test-anahtar-2', 10, 1000), first)
+
+
+class GeminiWorkerPoolTests(SimpleTestCase):
+    def test_each_thread_gets_its_own_service(self):
+        created = []
+
+        def factory():
+            service = object()
+            created.append(service)
+            return service
+
+        pool = gemini_pool.GeminiWorkerPool(factory, concurrency=3)
+        barrier = threading.Barrier(3)
+
+        def task(service, value):
+            barrier.wait(timeout=5)
+            return service, value * 2
+
+        try:
+            results = [future.result(timeout=5) for future in [pool.submit(task, value) for value in range(3)]]
+        finally:
+            pool.shutdown()
+
+        self.assertEqual([value for _, value in results], [0, 2, 4])
+        self.assertEqual(len(created), 3)
+        self.assertEqual({id(service) for service, _ in results}, {id(service) for service in created})
+
+
+def _model_response(payload):
+    """Gemini yanıtı yerine: .text alanı JSON (kod bloğu içinde) olan nesne"""
+    return types.SimpleNamespace(text=f"```json\n{json.dumps(payload, ensure_ascii=False)}\n```")
+
+
+def _analysis(is_job=True, company='Acme', status='interview', **extra):
+    return {
+        'is_job': is_job, 'status': status, 'company_name': company, 'position': 'Backend Geliştirici',
+        'location': 'İstanbul', 'application_source': 'Şirket Sitesi', **extra,
+    }
+
+
+class GeminiAnalysisTests(TestCase):
+    """Birleşik ve batch yanıtlarının ayrıştırılması, eksik yanıtlarda tekli model çağrısına dönüş"""
+
+    def setUp(self):
+        self.service = GeminiService(cache_ttl=0, use_templates=True)
+        self.service.analysis_mode = 'unified'
+        self.generate = mock.patch.object(self.service, '_generate').start()
+        self.rule_filters = mock.patch.object(
+            self.service, '_apply_rule_filters', wraps=self.service._apply_rule_filters).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def email(self, message_id, company):
+        return (
+            message_id, f'{company} başvurunuz hakkında',
+            f'Merhaba, {company} Backend Geliştirici pozisyonu için mülakat davetimizi iletiyoruz.',
+            f'{company} İK <ik@{company.lower()}.com>',
+        )
+
+    def test_unified_response_is_parsed(self):
+        self.generate.return_value = _model_response(_analysis(company='Acme'))
+        _, subject, body, sender = self.email('a', 'Acme')
+
+        is_job, job_info = self.service.analyze_email(subject, body, sender)
+
+        self.assertTrue(is_job)
+        self.assertEqual((job_info['company_name'], job_info['status']), ('Acme', 'interview'))
+        self.assertFalse(self.service.last_detection_failed)
+        self.assertEqual(self.generate.call_count, 1)
+
+    def test_unparseable_unified_response_marks_detection_failed(self):
+        self.generate.return_value = types.SimpleNamespace(text='bu bir JSON değil')
+        _, subject, body, sender = self.email('a', 'Acme')
+
+        self.assertEqual(self.service.analyze_email(subject, body, sender), (False, None))
+        self.assertTrue(self.service.last_detection_failed)
+
+    def test_batch_falls_back_to_single_model_call_for_missing_ids(self):
+        self.service.analysis_mode = 'batch'
+        items = [self.email('a', 'Acme'), self.email('b', 'Globex'), self.email('c', 'Initech')]
+        self.generate.side_effect = [
+            # 'c' yanıtta yok, 'b' iş başvurusu değil
+            _model_response([_analysis(id='a', company='Acme'), _analysis(id='b', is_job=False)]),
+            _model_response(_analysis(company='Initech', status='rejected')),
+        ]
+
+        results = self.service.analyze_batch(items)
+
+        self.assertEqual(results['a'][1]['company_name'], 'Acme')
+        self.assertEqual(results['b'], (False, None, False))
+        self.assertEqual((results['c'][1]['company_name'], results['c'][1]['status']), ('Initech', 'rejected'))
+        self.assertFalse(results['c'][2])
+        self.assertEqual(self.generate.call_count, 2)
+        # Tekli dönüş kuralları ve şablon aramasını tekrarlamaz
+        self.assertEqual(self.rule_filters.call_count, 3)
+        self.assertEqual(self.service.usage['template_lookups'], 3)
+
+    def test_broken_batch_response_analyzes_each_email(self):
+        self.service.analysis_mode = 'batch'
+        items = [self.email('a', 'Acme'), self.email('b', 'Globex')]
+        self.generate.side_effect = [
+            types.SimpleNamespace(text='[{"id": "a", "is_job": tr'),
+            _model_response(_analysis(company='Acme')),
+            Exception('kota'),
+        ]
+
+        results = self.service.analyze_batch(items)
+
+        self.assertEqual(results['a'][1]['company_name'], 'Acme')
+        self.assertEqual(results['b'], (False, None, True))
+        self.assertEqual(self.generate.call_count, 3)
+        self.assertEqual(self.rule_filters.call_count, 2)
+
+    @override_settings(GEMINI_CACHE_TTL=7)
+    def test_cache_ttl_comes_from_settings(self):
+        self.assertEqual(GeminiService().cache_ttl, 7)
+        self.assertEqual(SystemSettings._get_default_settings()['gemini_cache_ttl'], 7)
+
+
+class EmailTemplateTests(TestCase):
+    sender = 'no-reply@ats.example.com'
+
+    def setUp(self):
+        cache.clear()
+
+    def message(self, company, position, number=1234, location='İstanbul'):
+        subject = f'{company} - {position} başvurunuz alındı'
+        body = (
+            f'Merhaba,\n\n{company} bünyesindeki {position} ({location}) ilanına başvurunuz için teşekkürler.\n'
+            f'Başvuru numaranız: {number}\nDurumu https://ats.example.com/a/{number} adresinden izleyebilirsiniz.\n'
+        )
+        return subject, body
+
+    def job_info(self, company, position, location='İstanbul'):
+        return {'company_name': company, 'position': position, 'location': location,
+                'status': 'received', 'application_source': 'Şirket Sitesi'}
+
+    def test_learned_template_resolves_new_values(self):
+        subject, body = self.message('Acme', 'Backend Geliştirici')
+        self.assertIsNotNone(EmailTemplate.learn(self.sender, subject, body, self.job_info('Acme', 'Backend Geliştirici')))
+        # Aynı iskelet ikinci kez öğrenilmez
+        self.assertIsNone(EmailTemplate.learn(self.sender, subject, body, self.job_info('Acme', 'Backend Geliştirici')))
+
+        subject, body = self.message('Globex', 'Veri Mühendisi', number=98765, location='Ankara')
+        template, values = match_template(EmailTemplate.for_sender(self.sender), subject, body)
+
+        self.assertEqual(values, {'company_name': 'Globex', 'position': 'Veri Mühendisi', 'location': 'Ankara'})
+        self.assertEqual(template.status, 'received')
+        self.assertEqual(EmailTemplate.for_sender('baska@example.com'), [])
+
+    def test_no_template_without_literal_values(self):
+        subject, body = self.message('Acme', 'Backend Geliştirici')
+        self.assertIsNone(build_template(self.sender, subject, body, self.job_info('Bilinmiyor', 'Backend Geliştirici')))
+        self.assertIsNone(build_template(self.sender, subject, body, self.job_info('Initech', 'Backend Geliştirici')))
+        # Konuda yalnızca alan değerleri kalırsa şablon her maile uyar
+        self.assertIsNone(build_template(self.sender, 'Acme Backend', body, self.job_info('Acme', 'Backend')))
+
+    def test_changed_layout_does_not_match(self):
+        subject, body = self.message('Acme', 'Backend Geliştirici')
+        EmailTemplate.learn(self.sender, subject, body, self.job_info('Acme', 'Backend Geliştirici'))
+
+        subject, _ = self.message('Globex', 'Veri Mühendisi')
+        self.assertIsNone(match_template(EmailTemplate.for_sender(self.sender), subject, 'Tamamen farklı bir gövde.'))
+
+    def test_service_skips_model_for_matching_email(self):
+        service = GeminiService(cache_ttl=0, use_templates=True)
+        service.analysis_mode = 'unified'
+        generate = mock.patch.object(service, '_generate').start()
+        self.addCleanup(mock.patch.stopall)
+        generate.return_value = _model_response(_analysis(company='Acme', status='received'))
+
+        subject, body = self.message('Acme', 'Backend Geliştirici')
+        service.analyze_email(subject, body, f'Acme İK <{self.sender}>')
+
+        subject, body = self.message('Globex', 'Veri Mühendisi', number=555)
+        is_job, job_info = service.analyze_email(subject, body, f'Globex İK <{self.sender}>')
+
+        self.assertTrue(is_job)
+        self.assertEqual((job_info['company_name'], job_info['position']), ('Globex', 'Veri Mühendisi'))
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual((service.usage['template_lookups'], service.usage['template_hits']), (2, 1))
+        self.assertEqual(EmailTemplate.objects.get().hit_count, 1)
+
+
+class KeywordMatcherTests(SimpleTestCase):
+    """KeywordMatcher'lar eski `any(keyword in text ...)` taramasıyla aynı kararı vermeli"""
+
+    TEXTS = (
+        '',
+        'haftalık bülten: bu haftanın kampanyaları',
+        'başvurunuz alınmıştır, değerlendirme sonrası dönüş yapacağız',
+        'we would like to invite you to an interview for the position',
+        'size uygun iş ilanları bu hafta yayınlandı',
+        'new job alert: recommended jobs for you',
+        'deneme maili, lütfen dikkate almayın',
+        'siparişiniz kargoya verildi',
+        'the weekly report is ready',
+        'yeni başvuru güncellemeleribaşvurularınızın durumunu görün',
+        'congratulations! offer letter attached',
+    )
+
+    def test_matches_legacy_keyword_scan(self):
+        cases = (
+            (GeminiService.NOTIFICATION_MATCHER, GeminiService.NOTIFICATION_KEYWORDS),
+            (GeminiService.JOB_INDICATOR_MATCHER, GeminiService.JOB_APPLICATION_INDICATORS),
+            (GeminiService.TEST_PATTERN_MATCHER, GeminiService.TEST_PATTERNS),
+        )
+        for matcher, keywords in cases:
+            for text in self.TEXTS:
+                with self.subTest(text=text):
+                    expected = {keyword for keyword in keywords if keyword in text}
+                    found = matcher.search(text)
+                    self.assertEqual(found is not None, bool(expected))
+                    self.assertIn(found, expected | {None})
+                    self.assertEqual(set(matcher.findall(text)), expected)
+
+    def test_shortest_keyword_is_returned_first(self):
+        matcher = KeywordMatcher(['iş başvurusu', 'başvuru', 'cv'])
+        self.assertEqual(matcher.search('iş başvurusu ve cv'), 'cv')
+        self.assertEqual(matcher.search('iş başvurusu'), 'başvuru')
+        self.assertIsNone(matcher.search('fatura'))
+
+
+class PatternRegistryTests(TestCase):
+    """Önceden derlenen desenler, satır içi re çağrılarıyla yazılmış eski kodla aynı sonucu vermeli"""
+
+    def test_normalization_matches_legacy(self):
+        service = OfflineGmailService()
+        rng = random.Random(7)
+        texts = list(text_benchmark.EDGE_CASES)
+        texts += [service._simple_html_cleanup(text_benchmark._html_email(rng, 4096)) for _ in range(20)]
+
+        for text in texts:
+            with self.subTest(text=text[:60]):
+                self.assertEqual(
+                    service._clean_and_normalize_text(text), text_benchmark._legacy_clean_and_normalize_text(text))
+                expected = patterns.STOP_PHRASE_RE.search(text)
+                found = patterns.find_stop_phrase(text)
+                self.assertEqual(found and found.span(), expected and expected.span())
+
+    def test_job_sender_alternation_matches_pattern_list(self):
+        legacy_patterns = [
+            r'.*@.*\.com', r'.*careers@.*', r'.*hr@.*', r'.*hiring@.*', r'.*jobs@.*', r'.*recruitment@.*',
+            r'.*talent@.*', r'.*@peoplise\.com', r'.*@.*inside-pmi\.com', r'^noreply@.*',
+        ]
+        for sender in ('ik@acme.com', 'careers@acme.io', 'hr@firma.com.tr', 'noreply@ats.io', 'ayse@gmail.org',
+                       'talent@x.net', 'bilgi@okul.edu.tr', 'a@b.inside-pmi.com'):
+            with self.subTest(sender=sender):
+                self.assertEqual(patterns.JOB_SENDER_RE.match(sender) is not None,
+                                 any(re.match(pattern, sender) for pattern in legacy_patterns))
+
+    def test_gemini_text_helpers(self):
+        service = GeminiService(cache_ttl=0, use_templates=False)
+
+        self.assertEqual(service._extract_email_from_sender('Acme İK <IK@Acme.com>'), 'ik@acme.com')
+        self.assertEqual(service._clean_json_response('```json\n{"a": 1}\n```'), '{"a": 1}')
+        self.assertEqual(service._clean_position_name('Pozisyon: * Senior  Al Engineer (Al) →'),
+                         'Senior AI Engineer (AI)')
+        self.assertEqual(service._clean_company_name('Acme Teknoloji A.Ş.'), 'Acme Teknoloji')
+        self.assertEqual(service._clean_company_name('LinkedIn'), '')
+
+        job_info = service._post_process_linkedin_info(
+            {'company_name': 'Bilinmiyor', 'position': 'Bilinmiyor'},
+            'Data Scientist başvurunuz Chippin şirketine gönderildi', '', 'jobs-noreply@linkedin.com')
+        self.assertEqual(job_info, {'company_name': 'Chippin', 'position': 'Data Scientist',
+                                    'application_source': 'LinkedIn'})
+
+
+class HtmlTextExtractorTests(SimpleTestCase):
+    HTML = (
+        '<html><head><title>Başvuru</title><style>p { color: red; }</style>'
+        '<script type="text/javascript">var x = "<p>gizli</p>";</script></head>'
+        '<body><p>Merhaba&nbsp;Ay&#351;e &amp; ekibi,</p><div>Acme<br>Backend<br/>Geliştirici</div>'
+        '<table><tr><td>Konum</td><td>İstanbul</td></tr></table><SCRIPT>alert(1)</SCRIPT>Son &lt;satır&gt;</body></html>'
+    )
+
+    def test_skips_script_and_style_and_decodes_entities(self):
+        text = html_to_text(self.HTML)
+
+        self.assertNotIn('gizli', text)
+        self.assertNotIn('color', text)
+        self.assertNotIn('alert', text)
+        self.assertIn('Merhaba\xa0Ayşe & ekibi,', text)
+        self.assertTrue(text.rstrip().endswith('Son <satır>'))
+
+    def test_block_tags_become_line_breaks(self):
+        lines = [line.strip() for line in html_to_text(self.HTML).splitlines() if line.strip()]
+        self.assertEqual(lines, ['Başvuru', 'Merhaba\xa0Ayşe & ekibi,', 'Acme', 'Backend', 'Geliştirici',
+                                 'Konum  İstanbul', 'Son <satır>'])
+
+    def test_chunk_boundaries_inside_tags_and_entities(self):
+        expected = html_to_text(self.HTML)
+        for size in (1, 2, 3, 7, 16):
+            with self.subTest(size=size):
+                chunks = [self.HTML[start:start + size] for start in range(0, len(self.HTML), size)]
+                self.assertEqual(html_chunks_to_text(chunks), expected)
+
+    def test_max_chars_stops_consuming_chunks(self):
+        consumed = []
+
+        def chunks():
+            for index in range(100):
+                consumed.append(index)
+                yield f'<p>paragraf {index}</p>'
+
+        text = html_chunks_to_text(chunks(), max_chars=30)
+
+        self.assertIn('paragraf 0', text)
+        self.assertLess(len(consumed), 100)
+        self.assertNotIn('paragraf 99', text)
+
+
+class MimeBodyExtractionTests(TestCase):
+    """Gövde parçası seçimi ve parça parça çözme, eski (her parçayı çözen) extractor ile aynı metni vermeli"""
+
+    def setUp(self):
+        self.service = OfflineGmailService()
+        self.legacy = mime_benchmark.LegacyMimeExtractor(self.service)
+
+    def assertSameAsLegacy(self, payload):
+        body = self.service.extract_email_body(payload)
+        self.assertEqual(body, self.legacy.extract_email_body(payload))
+        return body
+
+    def test_multipart_alternative_prefers_plain_text(self):
+        payload = {'mimeType': 'multipart/alternative', 'parts': [
+            mime_benchmark._text_part('text/html', '<p>HTML gövde</p>'),
+            mime_benchmark._text_part('text/plain', 'Düz metin gövde https://x.com/a'),
+        ]}
+
+        part, is_html = self.service._select_body_part(payload)
+        self.assertEqual((part['mimeType'], is_html), ('text/plain', False))
+        self.assertEqual(self.assertSameAsLegacy(payload), 'Düz metin gövde')
+
+    def test_nested_multipart_mixed_uses_html_alternative(self):
+        payload = mime_benchmark._payload(random.Random(3), body_kb=8, plain=False)
+
+        part, is_html = self.service._select_body_part(payload)
+        self.assertEqual((part['mimeType'], is_html), ('text/html', True))
+        self.assertTrue(self.assertSameAsLegacy(payload))
+
+    def test_html_only_message(self):
+        payload = mime_benchmark._text_part('text/html', '<div>Mülakat&nbsp;daveti</div><script>x()</script>')
+        self.assertEqual(self.assertSameAsLegacy(payload), 'Mülakat daveti')
+
+    def test_multibyte_characters_split_across_decode_blocks(self):
+        text = 'Başvurunuz için teşekkürler, görüşme günü çarşamba. ' * 50
+        payload = mime_benchmark._text_part('text/plain', text)
+
+        with mock.patch.object(GmailService, 'DECODE_CHUNK_BYTES', 7):
+            self.assertEqual(''.join(self.service._iter_part_chunks(payload)), text)
+            self.assertSameAsLegacy(payload)
+
+    def test_base64url_without_padding(self):
+        text = 'Teklif mektubu ~ ü?>!'
+        payload = mime_benchmark._text_part('text/plain', text)
+        self.assertIn('=', payload['body']['data'])
+        self.assertSameAsLegacy(payload)
+
+        payload['body']['data'] = payload['body']['data'].rstrip('=')
+        self.assertEqual(self.service._read_text_part(payload), text)
+
+    def test_parts_without_data_are_skipped(self):
+        html_part = mime_benchmark._text_part('text/html', '<p>Yedek HTML</p>')
+        payload = {'mimeType': 'multipart/mixed', 'parts': [
+            {'mimeType': 'text/plain', 'body': {'size': 120, 'attachmentId': 'ek'}},
+            {'mimeType': 'text/plain', 'body': {'size': 0}},
+            {'mimeType': 'text/plain', 'filename': 'notlar.txt', 'body': {'size': 5, 'data': 'YWJjZGU='}},
+            html_part,
+        ]}
+
+        self.assertIs(self.service._select_body_part(payload)[0], html_part)
+        self.assertEqual(self.service._clean_html_part(html_part).strip(), 'Yedek HTML')
+        self.assertEqual(self.service.extract_email_body(payload), 'Yedek HTML')
+        self.assertEqual(self.service._select_body_part({'mimeType': 'text/plain', 'body': {'size': 0}}), (None, False))
+        self.assertSameAsLegacy({'mimeType': 'text/plain', 'body': {}})
+
+
+class BulkPersistTests(TestCase):
+    """persist aşamasının bulk_create yolu: çakışan satırlar sayılmaz, checkpoint tampon yazılana kadar bekler"""
+
+    job_info = {'company_name': 'Acme', 'position': 'Geliştirici', 'status': 'received'}
+
+    def setUp(self):
+        self.user = User.objects.create(username='ayse')
+        ApplicationStats.for_user(self.user)
+
+    def pipeline(self):
+        return EmailPipeline(self.user, service_factory=_FakeGeminiService)
+
+    def classified(self, *message_ids):
+        return [(_email_record(message_id, index), self.job_info, False) for index, message_id in enumerate(message_ids)]
+
+    def assertStatsConsistent(self):
+        self.assertEqual(ApplicationStats.for_user(self.user).total, JobApplication.objects.filter(user=self.user).count())
+
+    def test_existing_and_duplicate_messages_are_not_counted(self):
+        JobApplication.objects.create(user=self.user, company_name='Acme', position='Geliştirici',
+                                      application_date=timezone.now(), gmail_message_id='m0')
+        pipeline = self.pipeline()
+
+        saved = list(pipeline.persist(self.classified('m0', 'm1', 'm1')))
+
+        self.assertEqual([email_data.id for email_data in saved], ['m1'])
+        self.assertEqual(pipeline.job_applications_found, 1)
+        self.assertStatsConsistent()
+
+    def test_row_inserted_concurrently_is_not_counted(self):
+        bulk_create = QuerySet.bulk_create
+
+        def racing_bulk_create(queryset, objs, *args, **kwargs):
+            # Başka bir worker aynı mesajı mevcut kayıt kontrolünden sonra yazıyor
+            JobApplication.objects.create(user=self.user, company_name='Globex', position='Analist',
+                                          application_date=timezone.now(), gmail_message_id='m1')
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        pipeline = self.pipeline()
+        with mock.patch.object(QuerySet, 'bulk_create', racing_bulk_create):
+            saved = list(pipeline.persist(self.classified('m1', 'm2')))
+
+        self.assertEqual([email_data.id for email_data in saved], ['m2'])
+        self.assertEqual(pipeline.job_applications_found, 1)
+        self.assertEqual(JobApplication.objects.get(gmail_message_id='m1').company_name, 'Globex')
+        self.assertStatsConsistent()
+
+    @override_settings(JOB_APPLICATION_BULK_SIZE=2)
+    def test_checkpoint_waits_until_buffer_is_written(self):
+        pipeline = self.pipeline()
+        checkpoints = []
+        emails = [
+            (_email_record('m0', 0), self.job_info, False),
+            (_email_record('m1', 1), None, False),
+            (_email_record('m2', 2), self.job_info, False),
+            (_email_record('m3', 3), None, False),
+        ]
+
+        def classified():
+            for item in emails:
+                checkpoints.append((pipeline.last_message_id, JobApplication.objects.count()))
+                yield item
+
+        list(pipeline.persist(classified()))
+
+        # m0 ve m1 tamamlansa da m0 yazılmadan checkpoint ilerlemez; tampon m2 ile dolunca ikisi birden yazılır
+        self.assertEqual(checkpoints, [(None, 0), (None, 0), (None, 0), ('m2', 2)])
+        self.assertEqual(pipeline.last_message_id, 'm3')
+        self.assertStatsConsistent()
@@ -17,6 +17,7 @@ urlpatterns = [
     # E-posta senkronizasyonu
     path('sync-emails/', views.sync_emails, name='sync_emails'),
     path('process-from-csv/', views.process_from_csv, name='process_from_csv'),
+    path('api/email-jobs/<int:pk>/', views.email_job_status, name='email_job_status'),
 
     # CSV yönetimi
     path('csv-manager/', views.csv_manager, name='csv_manager'),
@@ -34,6 +35,7 @@ urlpatterns = [
     path('api/success-rate/', views.get_success_rate_by_company, name='api_success_rate'),
     path('api/weekly-activity/', views.get_weekly_activity, name='api_weekly_activity'),
     path('api/statistics/', views.get_application_statistics, name='api_statistics'),
+    path('api/applications/', views.get_applications, name='api_applications'),
 
     # Matplotlib grafikleri için (opsiyonel)
     path('api/chart/<str:chart_type>/', views.generate_matplotlib_chart, name='api_matplotlib_chart'),
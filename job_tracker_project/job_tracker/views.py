@@ -1,19 +1,23 @@
 from django.shortcuts import get_object_or_404, redirect
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.core.paginator import Paginator
 from .gmail_service import GmailService
 from .gemini_service import GeminiService
+from .email_jobs import enqueue_job, get_active_job
 import os
 from django.shortcuts import render
-from django.db.models import Count, Q
+from django.db.models.functions import Substr
 from django.utils import timezone
 from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 import pandas as pd
-from .models import JobApplication, EmailProcessingLog, UserProfile
+from .models import ApplicationStats, JobApplication, EmailProcessingLog, UserProfile
+from .pagination import KeysetPaginator
+from .search import get_search_backend
+import csv
 import io
 import base64
-from django.db.models.functions import TruncMonth, TruncWeek
+import zlib
 from .models import SystemSettings
 from .forms import SystemSettingsForm
 from .utils import get_system_setting, refresh_settings_cache
@@ -71,18 +75,13 @@ def analysis_dashboard(request):
     """Giriş yapan kullanıcıya özel analiz dashboard sayfası"""
     user = request.user
 
-    user_applications = JobApplication.objects.filter(user=user)
+    stats = ApplicationStats.for_user(user)
 
     context = {
-        'total_applications': user_applications.count(),
-        'companies_count': user_applications.values('company_name').distinct().count(),
-        'this_month_applications': user_applications.filter(
-            application_date__month=timezone.now().month,
-            application_date__year=timezone.now().year
-        ).count(),
-        'pending_applications': user_applications.filter(
-            status__in=['received', 'reviewing', 'interview', 'waiting']
-        ).count()
+        'total_applications': stats.total,
+        'companies_count': stats.companies_count,
+        'this_month_applications': stats.monthly_counts.get(timezone.localdate().strftime('%Y-%m'), 0),
+        'pending_applications': stats.pending_count
     }
 
     return render(request, 'jobs/analysis.html', context)
@@ -90,10 +89,12 @@ def analysis_dashboard(request):
 
 def get_status_distribution(request):
     """Kullanıcıya özel başvuru durumlarının dağılımını JSON olarak döndürür"""
-    # Giriş yapmış kullanıcının başvurularını filtrele
-    status_data = JobApplication.objects.filter(user=request.user).values('status').annotate(
-        count=Count('id')
-    ).order_by('-count')
+    # Giriş yapmış kullanıcının önceden hesaplanmış durum sayıları
+    stats = ApplicationStats.for_user(request.user)
+    status_data = [
+        {'status': status, 'count': count}
+        for status, count in sorted(stats.status_counts.items(), key=lambda item: -item[1])
+    ]
 
     # Türkçe etiketleri ekle
     status_labels = {
@@ -127,14 +128,8 @@ def get_monthly_trend(request):
     end_date = timezone.now()
     start_date = end_date - timedelta(days=365)
 
-    monthly_data = JobApplication.objects.filter(
-        user=request.user,  # Sadece oturum açan kullanıcının verileri
-        application_date__gte=start_date
-    ).annotate(
-        month=TruncMonth('application_date')
-    ).values('month').annotate(
-        count=Count('id')
-    ).order_by('month')
+    # Sadece oturum açan kullanıcının aylık sayıları
+    monthly_counts = ApplicationStats.for_user(request.user).monthly_counts
 
     # Eksik ayları 0 ile doldur
     months = {}
@@ -148,9 +143,8 @@ def get_monthly_trend(request):
             current_date = current_date.replace(month=current_date.month + 1)
 
     # Gerçek verileri ekle
-    for item in monthly_data:
-        key = item['month'].strftime('%Y-%m')
-        months[key] = item['count']
+    for key in months:
+        months[key] = monthly_counts.get(key, 0)
 
     data = {
         'labels': [datetime.strptime(month, '%Y-%m').strftime('%m/%Y') for month in sorted(months.keys())],
@@ -162,16 +156,12 @@ def get_monthly_trend(request):
 
 def get_top_companies(request):
     """Kullanıcının en çok başvuru yaptığı şirketleri döndürür"""
-    # Sadece oturum açmış kullanıcının başvurularını filtrele
-    company_data = JobApplication.objects.filter(
-        user=request.user
-    ).values('company_name').annotate(
-        count=Count('id')
-    ).order_by('-count')[:10]  # En çok başvuru yapılan ilk 10 şirket
+    # Sadece oturum açmış kullanıcının şirket sayıları
+    company_data = ApplicationStats.for_user(request.user).company_totals()[:10]  # En çok başvuru yapılan ilk 10 şirket
 
     data = {
-        'labels': [item['company_name'] for item in company_data],
-        'data': [item['count'] for item in company_data]
+        'labels': [company for company, _ in company_data],
+        'data': [count for _, count in company_data]
     }
 
     return JsonResponse(data)
@@ -179,30 +169,18 @@ def get_top_companies(request):
 
 def get_success_rate_by_company(request):
     """Kullanıcının şirketlere göre başarı oranını döndürür"""
-    # Sadece oturum açmış kullanıcının verilerini filtrele
-    companies = JobApplication.objects.filter(
-        user=request.user
-    ).values('company_name').annotate(
-        total=Count('id')
-    ).filter(total__gte=2).order_by('-total')[:10]  # En az 2 başvuru olan şirketler
+    # Sadece oturum açmış kullanıcının şirket bazında durum sayıları
+    stats = ApplicationStats.for_user(request.user)
+    companies = [
+        (company_name, total) for company_name, total in stats.company_totals() if total >= 2
+    ][:10]  # En az 2 başvuru olan şirketler
 
     company_success = []
 
-    for company in companies:
-        company_name = company['company_name']
-        total = company['total']
-
-        accepted = JobApplication.objects.filter(
-            user=request.user,
-            company_name=company_name,
-            status='accepted'
-        ).count()
-
-        interview = JobApplication.objects.filter(
-            user=request.user,
-            company_name=company_name,
-            status='interview'
-        ).count()
+    for company_name, total in companies:
+        statuses = stats.company_counts[company_name]
+        accepted = statuses.get('accepted', 0)
+        interview = statuses.get('interview', 0)
 
         # Başarı oranını hesapla (kabul + mülakat / toplam)
         success_rate = ((accepted + interview) / total) * 100 if total > 0 else 0
@@ -231,15 +209,8 @@ def get_weekly_activity(request):
     end_date = timezone.now()
     start_date = end_date - timedelta(weeks=8)
 
-    # Sadece oturum açmış kullanıcının başvurularını filtrele
-    weekly_data = JobApplication.objects.filter(
-        user=request.user,
-        application_date__gte=start_date
-    ).annotate(
-        week=TruncWeek('application_date')
-    ).values('week').annotate(
-        count=Count('id')
-    ).order_by('week')
+    # Sadece oturum açmış kullanıcının haftalık sayıları
+    weekly_counts = ApplicationStats.for_user(request.user).weekly_counts
 
     # Eksik haftaları 0 ile doldur
     weeks = {}
@@ -253,9 +224,8 @@ def get_weekly_activity(request):
         current_date += timedelta(weeks=1)
 
     # Gerçek verileri ekle
-    for item in weekly_data:
-        key = item['week'].strftime('%Y-%m-%d')
-        weeks[key] = item['count']
+    for key in weeks:
+        weeks[key] = weekly_counts.get(key, 0)
 
     data = {
         'labels': [datetime.strptime(week, '%Y-%m-%d').strftime('%d/%m') for week in sorted(weeks.keys())],
@@ -267,9 +237,9 @@ def get_weekly_activity(request):
 
 def get_application_statistics(request):
     """Kullanıcının kişisel başvuru istatistiklerini döndürür"""
-    # Sadece oturum açmış kullanıcının başvurularını filtrele
-    user_applications = JobApplication.objects.filter(user=request.user)
-    total = user_applications.count()
+    # Sadece oturum açmış kullanıcının önceden hesaplanmış istatistikleri
+    stats = ApplicationStats.for_user(request.user)
+    total = stats.total
 
     if total == 0:
         return JsonResponse({
@@ -282,11 +252,9 @@ def get_application_statistics(request):
             'response_rate': 0
         })
 
-    accepted = user_applications.filter(status='accepted').count()
-    rejected = user_applications.filter(status='rejected').count()
-    pending = user_applications.filter(
-        status__in=['received', 'reviewing', 'interview', 'waiting']
-    ).count()
+    accepted = stats.status_count('accepted')
+    rejected = stats.status_count('rejected')
+    pending = stats.pending_count
 
     # Oranları hesapla
     acceptance_rate = (accepted / total) * 100 if total > 0 else 0
@@ -314,17 +282,13 @@ def generate_matplotlib_chart(request, chart_type):
 
     if chart_type == 'status_pie':
         # Durum dağılımı pasta grafiği
-        status_data = JobApplication.objects.filter(
-            user=request.user
-        ).values('status').annotate(
-            count=Count('id')
-        )
+        status_counts = ApplicationStats.for_user(request.user).status_counts
 
-        if not status_data:
+        if not status_counts:
             return JsonResponse({'error': 'Veri bulunamadı'}, status=404)
 
-        labels = [item['status'] for item in status_data]
-        sizes = [item['count'] for item in status_data]
+        labels = list(status_counts)
+        sizes = list(status_counts.values())
 
         plt.figure(figsize=(10, 8))
         plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90)
@@ -333,20 +297,17 @@ def generate_matplotlib_chart(request, chart_type):
 
     elif chart_type == 'monthly_bar':
         # Aylık başvuru bar grafiği
-        monthly_data = JobApplication.objects.filter(
-            user=request.user,
-            application_date__gte=timezone.now() - timedelta(days=365)
-        ).annotate(
-            month=TruncMonth('application_date')
-        ).values('month').annotate(
-            count=Count('id')
-        ).order_by('month')
+        first_month = (timezone.localdate() - timedelta(days=365)).strftime('%Y-%m')
+        monthly_data = sorted(
+            (month, count) for month, count in ApplicationStats.for_user(request.user).monthly_counts.items()
+            if month >= first_month
+        )
 
         if not monthly_data:
             return JsonResponse({'error': 'Veri bulunamadı'}, status=404)
 
-        months = [item['month'].strftime('%m/%Y') for item in monthly_data]
-        counts = [item['count'] for item in monthly_data]
+        months = [datetime.strptime(month, '%Y-%m').strftime('%m/%Y') for month, _ in monthly_data]
+        counts = [count for _, count in monthly_data]
 
         plt.figure(figsize=(12, 6))
         plt.bar(months, counts, color='skyblue', alpha=0.7)
@@ -375,22 +336,23 @@ def dashboard(request):
     """User-specific dashboard view"""
     user = request.user
 
-    # Get all queries through the user's related manager
-    total_applications = JobApplication.objects.filter(user=user).count()
+    # Counters come from the precomputed per-user stats row
+    stats = ApplicationStats.for_user(user)
+    total_applications = stats.total
     recent_applications = JobApplication.objects.filter(user=user).order_by('-created_at')[:5]
 
     # Status statistics
     status_counts = {}
     for choice in JobApplication.STATUS_CHOICES:
-        status_counts[choice[1]] = JobApplication.objects.filter(
-            user=user,
-            status=choice[0]
-        ).count()
+        status_counts[choice[1]] = stats.status_count(choice[0])
 
     # Last processing record
-    last_processing = None
-    if hasattr(user, 'emailprocessinglog_set'):
-        last_processing = user.emailprocessinglog_set.order_by('-processed_at').first()
+    last_processing = user.email_processing_logs.filter(
+        status__in=[EmailProcessingLog.STATUS_COMPLETED, EmailProcessingLog.STATUS_FAILED]
+    ).order_by('-processed_at').first()
+
+    # Kuyrukta veya çalışmakta olan arka plan işi
+    active_job = get_active_job(user)
 
     # CSV files list - KULLANICIYA ÖZEL
     gmail_service = GmailService(user=user)  # Kullanıcı parametresi eklendi
@@ -400,17 +362,14 @@ def dashboard(request):
     csv_files.sort(key=lambda x: x['created_at'], reverse=True)
 
     # Recent trend (last 7 days)
-    last_week = timezone.now() - timedelta(days=7)
-    recent_trend = JobApplication.objects.filter(
-        user=user,
-        created_at__gte=last_week
-    ).count()
+    recent_trend = stats.last_days(7, field='daily_created_counts')
 
     context = {
         'total_applications': total_applications,
         'recent_applications': recent_applications,
         'status_counts': status_counts,
         'last_processing': last_processing,
+        'active_job': active_job,
         'csv_files': csv_files[:5],
         'recent_trend': recent_trend,
     }
@@ -418,45 +377,97 @@ def dashboard(request):
     return render(request, 'jobs/dashboard.html', context)
 
 
-def application_list(request):
-    """Kullanıcıya özel iş başvuruları listesi"""
-    # Sadece oturum açmış kullanıcının başvurularını al
-    applications = JobApplication.objects.filter(user=request.user).order_by('-created_at')
+APPLICATION_LIST_PAGE_SIZE = 20
+# Liste şablonunun kullandığı sütunlar; email_content yerine kısa önizlemesi, extracted_info hiç okunmaz
+APPLICATION_LIST_FIELDS = (
+    'company_name', 'position', 'email_sender', 'application_date', 'status', 'email_subject', 'created_at'
+)
+APPLICATION_PREVIEW_LENGTH = 100
 
-    # Filtreleme
+
+def _application_list_page(request):
+    """
+    Arama/durum filtreli başvuruların cursor ile sayfalanmış hali (HTML listesi ve JSON endpoint'i için).
+
+    Toplam ve durum filtreli sayılar ApplicationStats'tan okunur; COUNT(*) sadece
+    aramada, FTS indeksi üzerinden kullanıcının eşleşmeleri için çalışır.
+    """
+    user = request.user
     search = request.GET.get('search', '')
     status_filter = request.GET.get('status', '')
 
-    if search:
-        applications = applications.filter(
-            Q(company_name__icontains=search) |
-            Q(position__icontains=search) |
-            Q(email_sender__icontains=search)
-        )
-
+    applications = (
+        JobApplication.objects.filter(user=user)
+        .only(*APPLICATION_LIST_FIELDS)
+        .annotate(content_preview=Substr('email_content', 1, APPLICATION_PREVIEW_LENGTH + 1))
+        .order_by('-created_at', '-id')
+    )
     if status_filter:
         applications = applications.filter(status=status_filter)
+    if search:
+        applications = get_search_backend().search(applications, user, search)
 
-    # Sayfalama - sayfa başına 20 başvuru
-    paginator = Paginator(applications, 20)
-    page_number = request.GET.get('page')
-    applications = paginator.get_page(page_number)
+    page = KeysetPaginator(applications, APPLICATION_LIST_PAGE_SIZE).get_page(
+        after=request.GET.get('after'), before=request.GET.get('before')
+    )
 
-    # İstatistikler
-    total_count = JobApplication.objects.filter(user=request.user).count()
-    filtered_count = applications.paginator.count if hasattr(applications, 'paginator') else 0
+    stats = ApplicationStats.for_user(user)
+    if search:
+        filtered_count = applications.count()
+    elif status_filter:
+        filtered_count = stats.status_count(status_filter)
+    else:
+        filtered_count = stats.total
 
-    context = {
-        'applications': applications,
+    return page, {
         'search': search,
         'status_filter': status_filter,
-        'status_choices': JobApplication.STATUS_CHOICES,
-        'total_count': total_count,
+        'total_count': stats.total,
         'filtered_count': filtered_count,
     }
 
+
+@login_required(login_url='login')
+def application_list(request):
+    """Kullanıcıya özel iş başvuruları listesi"""
+    applications, counts = _application_list_page(request)
+
+    context = {
+        'applications': applications,
+        'status_choices': JobApplication.STATUS_CHOICES,
+        **counts,
+    }
+
     return render(request, 'jobs/application_list.html', context)
 
+
+@login_required(login_url='login')
+def get_applications(request):
+    """Başvuru listesi (JSON); application_list ile aynı filtreler ve after/before cursor'ları"""
+    page, counts = _application_list_page(request)
+
+    return JsonResponse({
+        'results': [
+            {
+                'id': application.pk,
+                'company_name': application.company_name,
+                'position': application.position,
+                'email_sender': application.email_sender,
+                'application_date': application.application_date,
+                'status': application.status,
+                'status_display': application.get_status_display(),
+                'email_subject': application.email_subject,
+                'content_preview': application.content_preview,
+                'created_at': application.created_at,
+            }
+            for application in page
+        ],
+        'next_cursor': page.next_cursor,
+        'previous_cursor': page.previous_cursor,
+        'total': counts['total_count'],
+        'filtered': counts['filtered_count'],
+    })
+
 @login_required(login_url='login')  # login_url ile giriş sayfasına yönlendir
 def application_detail(request, pk):
     """İş başvurusu detay"""
@@ -603,137 +614,19 @@ def test_settings(request):
 
 @login_required(login_url='login')
 def sync_emails(request):
-    """Gmail'den giriş yapan kullanıcıya ait e-postaları senkronize et ve CSV'ye kaydet"""
-    user = request.user
+    """Giriş yapan kullanıcı için Gmail senkronizasyonunu arka plan işi olarak başlat"""
+    job, created = enqueue_job(request.user, 'sync')
 
-    try:
-        # Kullanıcıya özel ayarları al
-        from .models import SystemSettings
-        settings_obj = SystemSettings.get_cached_user_settings(user)
-
-        if settings_obj:
-            scan_days = settings_obj.email_scan_days
-            scan_limit = settings_obj.email_scan_limit
-        else:
-            # Fallback değerler
-            scan_days = 5
-            scan_limit = 50000
-
-        gmail_service = GmailService(user=user)
-        gemini_service = GeminiService()
-
-
-        # E-postaları getir
-        emails, csv_filename = gmail_service.get_recent_emails(
-            days=scan_days,
-            max_results=scan_limit,
-            include_processed=True,
-            save_to_csv=True
-        )
-
-        if not emails:
-            messages.error(request, "E-posta bulunamadı veya CSV oluşturulamadı.")
-            return redirect('dashboard')
-
-        total_emails = len(emails)
-        job_applications_found = 0
-        already_processed = 0
-
-        print(f"Toplam {total_emails} e-posta CSV'den işlenecek...")
-
-        for i, email_data in enumerate(emails, 1):
-            print(f"İşleniyor {i}/{total_emails}: {email_data['subject'][:50]}...")
-
-            # Daha önce işlenmiş mi kontrol et (kullanıcı bazlı kontrol)
-            if JobApplication.objects.filter(user=user, gmail_message_id=email_data['id']).exists():
-                already_processed += 1
-                print(f"  → Zaten işlenmiş, atlanıyor")
-                continue
-
-            # E-postanın iş başvurusu olup olmadığını kontrol et
-            print(f"  → Gemini analiz ediyor...")
-            is_job_email = gemini_service.is_job_application_email(
-                email_data['subject'],
-                email_data['body'],
-                email_data['sender']
-            )
-
-            if is_job_email:
-                print(f"  → İş başvurusu tespit edildi!")
-
-                # İş başvurusu bilgilerini çıkar
-                job_info = gemini_service.extract_job_info(
-                    email_data['subject'],
-                    email_data['body'],
-                    email_data['sender']
-                )
-
-                # Veritabanına kaydet (user alanı da eklenmeli)
-                application = JobApplication.objects.create(
-                    user=user,
-                    company_name=job_info.get('company_name', 'Bilinmeyen Şirket'),
-                    position=job_info.get('position', 'Bilinmeyen Pozisyon'),
-                    email_sender=email_data['sender_email'],
-                    application_date=email_data['date'],
-                    status=job_info.get('status', 'received'),
-                    email_subject=email_data['subject'],
-                    email_content=email_data['body'][:1000],  # İlk 1000 karakter
-                    gmail_message_id=email_data['id'],
-                    extracted_info=job_info
-                )
-
-                job_applications_found += 1
-                print(f"  → Kaydedildi: {application.company_name} - {application.position}")
-            else:
-                print(f"  → İş başvurusu değil, atlanıyor")
-
-        # İşlem kaydı oluştur (kullanıcı ile birlikte)
-        EmailProcessingLog.objects.create(
-            user=user,
-            total_emails=total_emails,
-            job_applications_found=job_applications_found,
-            success=True
-        )
-
-        # Kullanıcı profilindeki istatistikleri güncelle
-        try:
-            profile, created = UserProfile.objects.get_or_create(user=user)
-            profile.update_application_count()
-            profile.last_email_sync = timezone.now()
-            profile.save(update_fields=['last_email_sync'])
-        except Exception as profile_error:
-            print(f"Profil güncelleme hatası: {str(profile_error)}")
-
-        success_message = (
-            f"{total_emails} e-posta tarandı, {job_applications_found} yeni iş başvurusu bulundu. "
-            f"({already_processed} zaten işlenmiş)"
-        )
-
-        if csv_filename:
-            success_message += f"\nE-postalar CSV'ye kaydedildi: {csv_filename}"
-
-        messages.success(request, success_message)
-        print(f"Senkronizasyon tamamlandı: {job_applications_found} yeni başvuru eklendi")
-
-    except Exception as e:
-        print(f"Senkronizasyon hatası: {str(e)}")
-
-        # Hata kaydı oluştur (kullanıcı ile birlikte)
-        EmailProcessingLog.objects.create(
-            user=user,
-            total_emails=0,
-            job_applications_found=0,
-            success=False,
-            error_message=str(e)
-        )
-
-        messages.error(request, f"E-posta senkronizasyonu başarısız: {str(e)}")
+    if created:
+        messages.info(request, "E-posta senkronizasyonu başlatıldı. İlerleme dashboard'da güncellenecek.")
+    else:
+        messages.info(request, "Devam eden bir senkronizasyon zaten var.")
 
     return redirect('dashboard')
 
 @login_required(login_url='login')
 def process_from_csv(request):
-    """Mevcut CSV dosyasından e-postaları işle"""
+    """Mevcut CSV dosyasındaki e-postaların işlenmesini arka plan işi olarak başlat"""
     if request.method == 'POST':
         csv_filename = request.POST.get('csv_filename')
 
@@ -741,159 +634,21 @@ def process_from_csv(request):
             messages.error(request, "CSV dosyası seçilmedi.")
             return redirect('dashboard')
 
-        user = request.user
-
-        try:
-            gmail_service = GmailService(user=user)
-            gemini_service = GeminiService()
-
-            # CSV'den e-postaları oku
-            emails = gmail_service.read_emails_from_csv(csv_filename)
-
-            # emails'in geçerli bir liste olduğunu kontrol et
-            if not isinstance(emails, (list, tuple)):
-                print(f"Hata: emails beklenen liste değil, tip: {type(emails)}, değer: {emails}")
-                messages.error(request, f"CSV okuma hatası: Beklenen veri formatı alınamadı")
-                return redirect('dashboard')
-
-            if not emails:
-                messages.error(request, f"CSV dosyası bulunamadı veya okunamadı: {csv_filename}")
-                return redirect('dashboard')
-
-            total_emails = len(emails)
-            job_applications_found = 0
-            already_processed = 0
-
-            print(f"CSV'den {total_emails} e-posta işlenecek: {csv_filename}")
-
-            for i, email_data in enumerate(emails, 1):
-                # email_data'nın dictionary olduğunu kontrol et
-                if not isinstance(email_data, dict):
-                    print(f"Uyarı: email_data dictionary değil, tip: {type(email_data)}, değer: {email_data}")
-                    continue
-
-                # Gerekli alanların varlığını kontrol et
-                required_fields = ['subject', 'body', 'sender', 'id', 'date', 'sender_email']
-                missing_fields = [field for field in required_fields if field not in email_data]
-
-                if missing_fields:
-                    print(f"Uyarı: Eksik alanlar: {missing_fields}, e-posta atlanıyor")
-                    continue
-
-                print(f"İşleniyor {i}/{total_emails}: {email_data['subject'][:50]}...")
-
-                # Daha önce işlenmiş mi kontrol et (KULLANICI BAZLI)
-                if JobApplication.objects.filter(user=user, gmail_message_id=email_data['id']).exists():
-                    already_processed += 1
-                    print(f"  → Zaten işlenmiş, atlanıyor")
-                    continue
-
-                # E-postanın iş başvurusu olup olmadığını kontrol et
-                print(f"  → Gemini analiz ediyor...")
-                try:
-                    is_job_email = gemini_service.is_job_application_email(
-                        email_data['subject'],
-                        email_data['body'],
-                        email_data['sender']
-                    )
-
-                    # is_job_email'in boolean olduğunu kontrol et
-                    if not isinstance(is_job_email, bool):
-                        print(f"Uyarı: is_job_email boolean değil, tip: {type(is_job_email)}, değer: {is_job_email}")
-                        is_job_email = bool(is_job_email)  # Boolean'a çevir
-
-                except Exception as gemini_error:
-                    print(f"  → Gemini analiz hatası: {str(gemini_error)}")
-                    continue
-
-                if is_job_email:
-                    print(f"  → İş başvurusu tespit edildi!")
-
-                    try:
-                        # İş başvurusu bilgilerini çıkar
-                        job_info = gemini_service.extract_job_info(
-                            email_data['subject'],
-                            email_data['body'],
-                            email_data['sender']
-                        )
-
-                        # job_info'nun dictionary olduğunu kontrol et
-                        if not isinstance(job_info, dict):
-                            print(f"Uyarı: job_info dictionary değil, tip: {type(job_info)}, değer: {job_info}")
-                            # Varsayılan değerlerle dictionary oluştur
-                            job_info = {
-                                'company_name': 'Bilinmeyen Şirket',
-                                'position': 'Bilinmeyen Pozisyon',
-                                'status': 'received'
-                            }
-
-                        # Veritabanına kaydet (USER ALANI EKLENDİ)
-                        application = JobApplication.objects.create(
-                            user=user,  # KULLANICI EKLENDİ
-                            company_name=job_info.get('company_name', 'Bilinmeyen Şirket'),
-                            position=job_info.get('position', 'Bilinmeyen Pozisyon'),
-                            email_sender=email_data['sender_email'],
-                            application_date=email_data['date'],
-                            status=job_info.get('status', 'received'),
-                            email_subject=email_data['subject'],
-                            email_content=email_data['body'][:1000] if email_data['body'] else '',
-                            gmail_message_id=email_data['id'],
-                            extracted_info=job_info
-                        )
-
-                        job_applications_found += 1
-                        print(f"  → Kaydedildi: {application.company_name} - {application.position}")
-
-                    except Exception as extraction_error:
-                        print(f"  → İş bilgisi çıkarma hatası: {str(extraction_error)}")
-                        continue
-                else:
-                    print(f"  → İş başvurusu değil, atlanıyor")
-
-            # İşlem kaydı oluştur (KULLANICI İLE BİRLİKTE)
-            EmailProcessingLog.objects.create(
-                user=user,  # KULLANICI EKLENDİ
-                total_emails=total_emails,
-                job_applications_found=job_applications_found,
-                success=True
-            )
-
-            # Kullanıcı profilindeki istatistikleri güncelle
-            try:
-                profile, created = UserProfile.objects.get_or_create(user=user)
-                profile.update_application_count()
-                profile.save()
-            except Exception as profile_error:
-                print(f"Profil güncelleme hatası: {str(profile_error)}")
-
-            messages.success(
-                request,
-                f"CSV'den {total_emails} e-posta işlendi, {job_applications_found} yeni iş başvurusu bulundu. "
-                f"({already_processed} zaten işlenmiş)"
-            )
+        job, created = enqueue_job(request.user, 'csv', csv_filename=csv_filename)
 
-            print(f"CSV işleme tamamlandı: {job_applications_found} yeni başvuru eklendi")
+        if created:
+            messages.info(request, f"CSV işleme başlatıldı: {csv_filename}")
+        else:
+            messages.info(request, f"Bu CSV dosyası zaten işleniyor: {csv_filename}")
 
-        except Exception as e:
-            print(f"CSV işleme hatası: {str(e)}")
-            print(f"Hata tipi: {type(e)}")
-
-            # Daha detaylı hata bilgisi
-            import traceback
-            print(f"Hata detayı: {traceback.format_exc()}")
-
-            # Hata kaydı oluştur (KULLANICI İLE BİRLİKTE)
-            EmailProcessingLog.objects.create(
-                user=user,  # KULLANICI EKLENDİ
-                total_emails=0,
-                job_applications_found=0,
-                success=False,
-                error_message=str(e)
-            )
+    return redirect('dashboard')
 
-            messages.error(request, f"CSV işleme başarısız: {str(e)}")
 
-    return redirect('dashboard')
+@login_required(login_url='login')
+def email_job_status(request, pk):
+    """Arka plan e-posta işinin ilerlemesini JSON olarak döndür (dashboard bu endpoint'i sorgular)"""
+    job = get_object_or_404(EmailProcessingLog, pk=pk, user=request.user)
+    return JsonResponse(job.to_progress_dict())
 
 
 @login_required(login_url='login')
@@ -1027,45 +782,79 @@ def csv_manager(request):
 
 @login_required(login_url='login')
 def export_applications_to_csv(request):
-    """İş başvurularını CSV'ye aktar (sadece giriş yapmış kullanıcının)"""
-    user = request.user
-
-    try:
-        # Sadece giriş yapmış kullanıcının başvurularını getir
-        applications = JobApplication.objects.filter(user=user).order_by('-created_at')
-
-        # CSV için veri hazırla
-        csv_data = []
-        for app in applications:
-            csv_row = {
-                'ID': app.id,
-                'Şirket': app.company_name,
-                'Pozisyon': app.position,
-                'Gönderen': app.email_sender,
-                'Başvuru Tarihi': app.application_date.strftime('%Y-%m-%d %H:%M:%S'),
-                'Durum': app.get_status_display(),
-                'E-posta Konusu': app.email_subject,
-                'Oluşturma Tarihi': app.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                'Gmail ID': app.gmail_message_id,
-            }
-            csv_data.append(csv_row)
-
-        # DataFrame oluştur ve CSV'ye çevir
-        df = pd.DataFrame(csv_data)
-
-        # HTTP response olarak CSV döndür
-        response = HttpResponse(content_type='text/csv')
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        response['Content-Disposition'] = f'attachment; filename="job_applications_{user.username}_{timestamp}.csv"'
-
-        # CSV'yi response'a yaz (Türkçe karakterler için)
-        df.to_csv(response, index=False, encoding='utf-8-sig')
-
-        return response
+    """
+    İş başvurularını CSV'ye aktar (sadece giriş yapmış kullanıcının).
 
-    except Exception as e:
-        messages.error(request, f"CSV aktarma hatası: {str(e)}")
-        return redirect('application_list')
+    Satırlar veritabanından parça parça okunup yazıldıkça gönderilir; bellek kullanımı
+    başvuru sayısından bağımsızdır. ?gzip=1 ile dosya sıkıştırılarak (.csv.gz) indirilir.
+    """
+    user = request.user
+    compress = request.GET.get('gzip') == '1'
+
+    # Sadece giriş yapmış kullanıcının başvurularını getir
+    applications = JobApplication.objects.filter(user=user).order_by('-created_at')
+    chunks = _iter_applications_csv(applications)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"job_applications_{user.username}_{timestamp}.csv"
+    if compress:
+        chunks = _gzip_chunks(chunks)
+        filename += '.gz'
+
+    response = StreamingHttpResponse(chunks, content_type='application/gzip' if compress else 'text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+EXPORT_COLUMNS = (
+    ('ID', 'id'),
+    ('Şirket', 'company_name'),
+    ('Pozisyon', 'position'),
+    ('Gönderen', 'email_sender'),
+    ('Başvuru Tarihi', 'application_date'),
+    ('Durum', 'status'),
+    ('E-posta Konusu', 'email_subject'),
+    ('Oluşturma Tarihi', 'created_at'),
+    ('Gmail ID', 'gmail_message_id'),
+)
+EXPORT_CHUNK_SIZE = 2000  # Veritabanından tek seferde okunan ve tek parça olarak gönderilen satır sayısı
+
+
+def _iter_applications_csv(applications, chunk_size=EXPORT_CHUNK_SIZE):
+    """Başvuruları UTF-8 BOM'lu CSV parçaları (bytes) olarak üret; her parça en fazla chunk_size satır"""
+    status_labels = dict(JobApplication.STATUS_CHOICES)
+    buffer = io.StringIO()
+    # Türkçe karakterler için BOM (Excel uyumluluğu)
+    buffer.write('\ufeff')
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow([header for header, _ in EXPORT_COLUMNS])
+
+    rows = applications.values_list(*[field for _, field in EXPORT_COLUMNS]).iterator(chunk_size=chunk_size)
+    for count, (pk, company, position, sender, applied, status, subject, created, message_id) in enumerate(rows, 1):
+        writer.writerow([
+            pk, company, position, sender,
+            applied.strftime('%Y-%m-%d %H:%M:%S'),
+            status_labels.get(status, status),
+            subject,
+            created.strftime('%Y-%m-%d %H:%M:%S'),
+            message_id,
+        ])
+        if count % chunk_size == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode('utf-8')
+
+
+def _gzip_chunks(chunks):
+    """Bytes parçalarını akış halinde gzip'le"""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
 
 
 @login_required(login_url='login')
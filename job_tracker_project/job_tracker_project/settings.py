@@ -136,7 +136,27 @@ GEMINI_API_KEY = config('GEMINI_API_KEY')
 
 
 GMAIL_CACHE_TTL = 300  # Gmail cache süresi (saniye)
-GEMINI_CACHE_TTL = 100  # Gemini cache süresi (dakika)
+GMAIL_FETCH_CONCURRENCY = 8  # Aynı anda uçuşta olan messages().get istek sayısı
+GMAIL_FETCH_MODE = 'concurrent'  # 'concurrent' veya 'batch' (email_batch_size mesaj/HTTP isteği)
+GMAIL_METADATA_PREFILTER = True  # Önce format='metadata' ile ön filtre, tam içerik sadece adaylar için
+GEMINI_CACHE_TTL = 100  # Gemini cache süresi (dakika); GeminiService ve yeni kullanıcı ayarlarının tek kaynağı
+GEMINI_CACHE_MAX_ENTRIES = 50000  # Kalıcı Gemini sonuç cache'inin en fazla kayıt sayısı (LRU); bayt değil, kayıt sayısı sınırıdır
+EMAIL_TEMPLATES_ENABLED = True  # Gemini'nin etiketlediği tekrar eden şablonlar (LinkedIn, ATS) model çağrılmadan çözülür
+JOB_APPLICATION_BULK_SIZE = 100  # Senkronizasyonda tek transaction'da bulk_create ile yazılan başvuru sayısı
+JOB_APPLICATION_SEARCH_BACKEND = None  # Başvuru araması (dotted path); None: veritabanına göre (SQLite'ta FTS5)
+GEMINI_CONCURRENCY = 4  # Aynı anda uçuşta olan Gemini isteği (1: seri)
+GEMINI_RPM = 10  # API anahtarı başına dakikalık istek kotası (modelin limitine göre ayarlayın)
+GEMINI_TPM = 1000000  # API anahtarı başına dakikalık token kotası
+GEMINI_MAX_RETRIES = 5  # Kota/geçici hatalarda tekrar deneme sayısı
+GEMINI_ANALYSIS_MODE = 'separate'  # 'separate': üç ayrı çağrı (varsayılan); isteğe bağlı 'unified': tek çağrıda tespit+durum+bilgi, 'batch': email_batch_size mail/çağrı
+
+# Arka plan e-posta işleri (sync_emails / process_from_csv)
+EMAIL_JOBS_RUN_IN_PROCESS = True  # True: web süreci içinde thread; False: ayrı `manage.py run_email_worker`
+EMAIL_JOB_POLL_INTERVAL = 2  # Worker'ın boş kuyrukta bekleme süresi (saniye)
+EMAIL_JOB_PROGRESS_INTERVAL = 2  # İlerlemenin veritabanına yazılma sıklığı (saniye)
+EMAIL_JOB_HEARTBEAT_INTERVAL = 15  # Çalışan işin heartbeat sıklığı (saniye)
+EMAIL_JOB_STALE_SECONDS = 120  # Bu süre heartbeat gelmeyen iş yeniden kuyruğa alınır
+EMAIL_JOB_MAX_ATTEMPTS = 3  # Yeniden kuyruğa alınma sınırı
 
 # Logging konfigürasyonu
 LOGGING = {